@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 import kagglehub
 import os
+import sys
 import json
+from pathlib import Path
+
+# Results are also recorded in the shared dataset catalog
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server" / "services"))
+from datasetCatalog import DatasetCatalog
 
 print("🔍 SEARCHING FOR ALL COMIC DATASETS ON KAGGLE...\n")
 
@@ -15,6 +21,7 @@ datasets_to_download = [
 ]
 
 downloaded = []
+catalog = DatasetCatalog()
 
 for dataset_name in datasets_to_download:
     try:
@@ -33,9 +40,11 @@ for dataset_name in datasets_to_download:
             "dataset": dataset_name,
             "path": path
         })
+        catalog.record_download(dataset_name, path, tags=["kaggle-downloads"])
         
     except Exception as e:
         print(f"❌ Failed: {e}")
+        catalog.record_failure(dataset_name, str(e)[:200], tags=["kaggle-downloads"])
 
 print(f"\n\n🏁 Downloaded {len(downloaded)} datasets!")
 
@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 import kagglehub
 import os
+import sys
 import json
+from pathlib import Path
+
+# Results are also recorded in the shared dataset catalog
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server" / "services"))
+from datasetCatalog import DatasetCatalog
 
 print("📥 DOWNLOADING COMIC COVER DATASETS\n")
 
@@ -19,6 +25,7 @@ datasets = [
 ]
 
 downloaded_paths = {}
+catalog = DatasetCatalog()
 
 for ds in datasets:
     print(f"\n{'='*60}")
@@ -30,6 +37,7 @@ for ds in datasets:
         path = kagglehub.dataset_download(ds['name'])
         print(f"✅ Downloaded to: {path}\n")
         downloaded_paths[ds['name']] = path
+        catalog.record_download(ds['name'], path, tags=["kaggle-cover-datasets"])
         
         # List files
         print("📁 Files:")
@@ -38,6 +46,7 @@ for ds in datasets:
         
     except Exception as e:
         print(f"❌ Error: {e}\n")
+        catalog.record_failure(ds['name'], str(e)[:200], tags=["kaggle-cover-datasets"])
 
 # Save paths
 with open('data/kaggle-cover-datasets.json', 'w') as f:
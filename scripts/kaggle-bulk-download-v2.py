@@ -12,28 +12,42 @@ Requirements:
 - KAGGLE_USERNAME and KAGGLE_KEY environment variables
 
 Usage:
-    python scripts/kaggle-bulk-download-v2.py
+    python scripts/kaggle-bulk-download-v2.py [--skip-search] [--format msgpack] [--jobs N] [--no-dedupe]
+                                                [--budget SIZE]
+                                                [--include GLOB ...] [--exclude GLOB ...] [--max-file-size SIZE]
+                                                [--parquet]
 
 Features:
 - Uses kagglehub.dataset_download() for direct API access
 - Two-phase strategy: known high-value datasets + search discovery
+- Concurrent, rate-limited search discovery with per-term timings
 - Automatic symlink creation for easy access
-- Progress tracking with comprehensive manifest
-- Resume capability with cache detection
+- Progress tracking with comprehensive manifest, journaled so no interruption loses progress
+- Resume capability with version-aware cache checks: only datasets Kaggle has changed are re-downloaded
+- Record counts cached per file fingerprint, so unchanged files are never re-read
+- Duplicate files across datasets and versions hardlinked to one blob (--no-dedupe to disable)
 - Error handling with exponential backoff retry
+- Concurrent downloads with a bounded worker pool (--jobs N)
+- Disk-budget admission from advertised sizes, best value per byte first (--budget SIZE)
+- File-level mode: fetch only files matching --include/--exclude globs and --max-file-size,
+  extracting zipped files as they stream (stored under data/kaggle-files instead of the kagglehub cache)
+- Optional record batch output of dataset details (--format msgpack)
+- Optional typed Parquet copy of every CSV/JSON table, recorded in the manifest (--parquet)
+- Every dataset, version and file recorded in the SQLite dataset catalog (data/dataset-catalog.db)
 """
 
 import os
 import sys
+import argparse
 import json
 import time
-import subprocess
-import csv
-import io
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Set, Tuple, Optional
 import shutil
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 try:
     import kagglehub
@@ -41,6 +55,20 @@ except ImportError:
     print("❌ Error: kagglehub not installed. Run: pip install kagglehub")
     sys.exit(1)
 
+# The record batch format is shared with the Metron service
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server" / "services"))
+from recordBatches import write_record_batches, require_msgpack
+from kaggleClient import get_client, select_files
+from kaggleDiscovery import discover, timing_summary
+from blobStore import BlobStore
+from datasetCatalog import DatasetCatalog
+from datasetVersions import (FRESH, MISSING, STALE, MetadataCache, check_freshness, dataset_cache_dir,
+                             mark_complete, version_from_path)
+from diskBudget import ADMIT, SKIP, DiskBudget, format_size, parse_size, rank_by_value, tree_bytes
+from manifestJournal import ManifestJournal
+from parquetCache import PARQUET_ROOT, convert_dataset, require_pyarrow
+from recordCounter import CountCache, count_csv_rows, count_json_records
+
 # Known high-value datasets (Phase A)
 KNOWN_HIGH_VALUE_DATASETS = [
     "arunasivapragasam/dc-comics",  # 6,897 DC characters
@@ -68,22 +96,59 @@ SEARCH_TERMS = [
 # Configuration
 BASE_DIR = Path("data/kaggle")
 MANIFEST_FILE = Path("data/kaggle-manifest.json")
+MANIFEST_JOURNAL = Path("data/kaggle-manifest.journal.jsonl")
 ERROR_LOG = BASE_DIR / "download-errors-v2.log"
 SUMMARY_REPORT = Path("data/kaggle-summary.json")
+SUMMARY_BATCHES = Path("data/kaggle-summary.msgpack")
+STATS_CACHE = Path("data/kaggle-stats-cache.json")
 KAGGLE_CACHE = Path.home() / ".cache" / "kagglehub"
+FILES_CACHE = Path("data/kaggle-files")  # File-level downloads, one tree per file filter
 MAX_RETRIES = 3
 BACKOFF_FACTOR = 2
 RETRY_DELAY = 5  # Base delay in seconds
+DEFAULT_JOBS = 1  # Concurrent downloads; 1 keeps the original serial order
+COMPACT_EVERY = 50  # Rewrite the manifest snapshot after this many journal records
 
 
 class KaggleHubDownloader:
     """Enhanced Kaggle downloader using kagglehub library"""
     
-    def __init__(self):
-        self.manifest = self.load_manifest()
+    def __init__(self, output_format: str = "json", jobs: int = DEFAULT_JOBS, dedupe: bool = True,
+                 budget: Optional[int] = None, file_filter: Optional[Dict] = None, parquet: bool = False):
+        self.output_format = output_format
+        self.parquet = parquet
+        self.jobs = max(1, jobs)
+        # File-level mode (include/exclude/max_file_bytes) keeps a kagglehub-style tree per filter
+        self.file_filter = file_filter
+        self.cache_root = KAGGLE_CACHE
+        if file_filter:
+            filter_key = hashlib.sha1(json.dumps(file_filter, sort_keys=True).encode("utf-8")).hexdigest()[:12]
+            self.cache_root = FILES_CACHE / filter_key
+        # Guards the manifest, counters and error log when downloads run concurrently
+        self.lock = threading.RLock()
+        self.journal = ManifestJournal(MANIFEST_FILE, MANIFEST_JOURNAL)
+        self.manifest, journal_records = self.load_manifest()
         self.downloaded_datasets: Set[str] = set(self.manifest.get("downloaded", []))
         self.dataset_paths: Dict[str, str] = self.manifest.get("dataset_paths", {})
+        self.dataset_versions: Dict[str, int] = self.manifest.setdefault("dataset_versions", {})
+        self.parquet_tables: Dict[str, List[Dict]] = self.manifest.setdefault("parquet_tables", {})
         self.failed_downloads: List[Dict] = self.manifest.get("failed", [])
+        # Set views of datasets_by_category for O(1) membership checks
+        self.category_index: Dict[str, Set[str]] = {
+            category: set(refs) for category, refs in self.manifest["datasets_by_category"].items()
+        }
+        # Changes journaled after the last snapshot was written
+        for record in journal_records:
+            self.apply_record(record)
+        self.stats_cache = CountCache(STATS_CACHE)
+        # Content-addressed store that hardlinks duplicate downloaded files
+        self.blob_store = BlobStore() if dedupe else None
+        # Admission control against the disk budget (KAGGLE_DISK_BUDGET or --budget)
+        self.disk_budget = DiskBudget([self.cache_root / "datasets"], budget)
+        # Kaggle metadata (version, advertised size, votes), fetched at most once per run
+        self.metadata = MetadataCache(lambda dataset_ref: get_client().view(dataset_ref))
+        # Queryable record of datasets, versions and files shared with the search scripts
+        self.catalog = DatasetCatalog(cache_root=self.cache_root)
         self.total_downloaded = 0
         self.total_failed = 0
         self.session_start = datetime.now().isoformat()
@@ -91,12 +156,9 @@ class KaggleHubDownloader:
         # Ensure directories exist
         BASE_DIR.mkdir(parents=True, exist_ok=True)
         
-    def load_manifest(self) -> Dict:
-        """Load existing manifest or create new one"""
-        if MANIFEST_FILE.exists():
-            with open(MANIFEST_FILE, 'r') as f:
-                return json.load(f)
-        return {
+    def load_manifest(self) -> Tuple[Dict, List[Dict]]:
+        """Load the manifest snapshot (or a new one) and the journal records after it"""
+        return self.journal.load({
             "downloaded": [],
             "dataset_paths": {},
             "failed": [],
@@ -105,98 +167,143 @@ class KaggleHubDownloader:
             "total_records_estimated": 0,
             "last_updated": None,
             "version": "2.0"
-        }
+        })
     
     def save_manifest(self):
-        """Save current manifest state"""
-        self.manifest["downloaded"] = list(self.downloaded_datasets)
-        self.manifest["dataset_paths"] = self.dataset_paths
-        self.manifest["failed"] = self.failed_downloads
-        self.manifest["last_updated"] = datetime.now().isoformat()
-        
-        with open(MANIFEST_FILE, 'w') as f:
-            json.dump(self.manifest, indent=2, fp=f)
+        """Compact the journal into a new manifest snapshot (atomic rename)"""
+        with self.lock:
+            self.manifest["downloaded"] = list(self.downloaded_datasets)
+            self.manifest["dataset_paths"] = self.dataset_paths
+            self.manifest["failed"] = self.failed_downloads
+            self.manifest["last_updated"] = datetime.now().isoformat()
+            self.journal.compact(self.manifest)
+        
+        self.stats_cache.save()
+        if self.blob_store:
+            self.blob_store.save()
+    
+    def apply_record(self, record: Dict):
+        """Apply one journal record to the in-memory manifest"""
+        dataset_ref = record["dataset"]
+        if record["op"] == "downloaded":
+            self.downloaded_datasets.add(dataset_ref)
+            self.dataset_paths[dataset_ref] = record["path"]
+            if record.get("version") is not None:
+                self.dataset_versions[dataset_ref] = record["version"]
+            
+            # Update category
+            category = record["category"]
+            if category not in self.category_index:
+                self.category_index[category] = set()
+                self.manifest["datasets_by_category"][category] = []
+            if dataset_ref not in self.category_index[category]:
+                self.category_index[category].add(dataset_ref)
+                self.manifest["datasets_by_category"][category].append(dataset_ref)
+        elif record["op"] == "parquet":
+            self.parquet_tables[dataset_ref] = record["tables"]
+        elif record["op"] == "failed":
+            self.failed_downloads.append({
+                "dataset": dataset_ref,
+                "error": record["error"],
+                "timestamp": record["timestamp"]
+            })
     
     def log_error(self, dataset_ref: str, error: str):
         """Log download error"""
-        with open(ERROR_LOG, 'a') as f:
-            timestamp = datetime.now().isoformat()
-            f.write(f"[{timestamp}] {dataset_ref}: {error}\n")
-        
-        self.failed_downloads.append({
-            "dataset": dataset_ref,
-            "error": error,
-            "timestamp": timestamp
-        })
+        with self.lock:
+            with open(ERROR_LOG, 'a') as f:
+                timestamp = datetime.now().isoformat()
+                f.write(f"[{timestamp}] {dataset_ref}: {error}\n")
+            
+            record = {"op": "failed", "dataset": dataset_ref, "error": error, "timestamp": timestamp}
+            self.apply_record(self.journal.append(record))
+            self.total_failed += 1
+        self.catalog.record_failure(dataset_ref, error, tags=["kaggle-manifest"])
+    
+    def record_download(self, dataset_ref: str, path_str: str, category: str, version: Optional[int] = None):
+        """Record a downloaded (or cached) dataset in the manifest journal"""
+        with self.lock:
+            record = {"op": "downloaded", "dataset": dataset_ref, "path": path_str,
+                      "category": category, "version": version}
+            self.apply_record(self.journal.append(record))
+            self.total_downloaded += 1
     
-    def check_if_cached(self, dataset_ref: str) -> Optional[Path]:
-        """Check if dataset is already in kagglehub cache"""
+    def check_if_cached(self, dataset_ref: str) -> Tuple[str, Optional[int], Optional[Path]]:
+        """Compare the newest complete kagglehub cache version with Kaggle's current version"""
         # kagglehub stores datasets in ~/.cache/kagglehub/datasets/{owner}/{dataset-name}/versions/{version}
-        parts = dataset_ref.split('/')
-        if len(parts) != 2:
+        if len(dataset_ref.split('/')) != 2:
+            return MISSING, None, None
+        return check_freshness(dataset_ref, self.metadata, self.cache_root)
+    
+    def download_dataset_with_kagglehub(self, dataset_ref: str, category: str = "general") -> Optional[str]:
+        """Download dataset using kagglehub library, unless an up-to-date copy is cached"""
+        
+        # Only a complete copy of the current version counts as cached
+        status, version, cached_path = self.check_if_cached(dataset_ref)
+        if status == FRESH:
+            path_str = str(cached_path)
+            if self.dataset_paths.get(dataset_ref) == path_str:
+                print(f"  ⏭️  Skipping {dataset_ref} (v{version} already in manifest)")
+            else:
+                print(f"  ♻️  Found in cache: {dataset_ref} (v{version})")
+                self.record_download(dataset_ref, path_str, category, version)
+            return path_str
+        if status == STALE:
+            print(f"  🔄 {dataset_ref}: Kaggle has published v{version}, refreshing cached copy")
+        
+        # Pre-flight: only start downloads that fit the budget and free space
+        size_bytes = self.advertised_size(dataset_ref)
+        decision = self.disk_budget.admit(dataset_ref, size_bytes)
+        if decision != ADMIT:
+            action = "Skipping" if decision == SKIP else "Deferring"
+            print(f"  💾 {action} {dataset_ref}: {format_size(size_bytes)} does not fit the disk budget")
             return None
         
-        owner, dataset_name = parts
-        dataset_cache_dir = KAGGLE_CACHE / "datasets" / owner / dataset_name / "versions"
+        versions_dir = dataset_cache_dir(dataset_ref, self.cache_root) / "versions"
+        existing_versions = set(versions_dir.iterdir()) if versions_dir.exists() else set()
+        path = None
+        try:
+            # Pin the version that was checked, so the sentinel matches what was fetched
+            handle = f"{dataset_ref}/versions/{version}" if version else dataset_ref
+            path = self.fetch_with_kagglehub(handle)
+        finally:
+            if path is None:
+                # Failed or interrupted: drop whatever this attempt left in the cache
+                self.remove_partial_download(versions_dir, existing_versions)
+            self.disk_budget.release(dataset_ref, tree_bytes([path]) if path else 0)
+        if path is None:
+            return None
         
-        if dataset_cache_dir.exists():
-            # Find the latest version
-            versions = list(dataset_cache_dir.iterdir())
-            if versions:
-                # Get the most recent version
-                latest_version = max(versions, key=lambda p: p.stat().st_mtime)
-                return latest_version
+        # Sentinel: this version is complete and need not be fetched again. File-level
+        # downloads without a known version land in versions/0 and are marked too
+        version = version or version_from_path(path)
+        if version is not None:
+            mark_complete(dataset_ref, version, self.cache_root)
         
-        return None
-    
-    def download_dataset_with_kagglehub(self, dataset_ref: str, category: str = "general", retry_count: int = 0) -> Optional[str]:
-        """Download dataset using kagglehub library"""
-        
-        # Check if already downloaded
-        if dataset_ref in self.downloaded_datasets:
-            print(f"  ⏭️  Skipping {dataset_ref} (already in manifest)")
-            cached_path = self.dataset_paths.get(dataset_ref)
-            if cached_path and Path(cached_path).exists():
-                return cached_path
-        
-        # Check cache first
-        cached_path = self.check_if_cached(dataset_ref)
-        if cached_path and cached_path.exists():
-            print(f"  ♻️  Found in cache: {dataset_ref}")
-            path_str = str(cached_path)
-            self.downloaded_datasets.add(dataset_ref)
-            self.dataset_paths[dataset_ref] = path_str
-            self.total_downloaded += 1
-            
-            # Update category
-            if category not in self.manifest["datasets_by_category"]:
-                self.manifest["datasets_by_category"][category] = []
-            if dataset_ref not in self.manifest["datasets_by_category"][category]:
-                self.manifest["datasets_by_category"][category].append(dataset_ref)
-            
-            return path_str
+        # Record success
+        self.record_download(dataset_ref, path, category, version)
         
+        # Create symlink for easy access
+        self.create_symlink(dataset_ref, path)
+        
+        return path
+    
+    def fetch_with_kagglehub(self, dataset_ref: str, retry_count: int = 0) -> Optional[str]:
+        """Fetch a dataset (optionally .../versions/N) with retries; returns its path or None after logging the error"""
         try:
             print(f"  ⬇️  Downloading {dataset_ref}...")
             
-            # Use kagglehub to download
-            path = kagglehub.dataset_download(dataset_ref)
+            # Use kagglehub to download, or only the selected files in file-level mode
+            if self.file_filter:
+                path = self.fetch_selected_files(dataset_ref)
+            else:
+                path = kagglehub.dataset_download(dataset_ref)
             
             print(f"  ✅ Downloaded to: {path}")
             
-            # Record success
-            self.downloaded_datasets.add(dataset_ref)
-            self.dataset_paths[dataset_ref] = path
-            self.total_downloaded += 1
-            
-            # Update category
-            if category not in self.manifest["datasets_by_category"]:
-                self.manifest["datasets_by_category"][category] = []
-            if dataset_ref not in self.manifest["datasets_by_category"][category]:
-                self.manifest["datasets_by_category"][category].append(dataset_ref)
-            
-            # Create symlink for easy access
-            self.create_symlink(dataset_ref, path)
+            # Replace files already stored by other datasets/versions with hardlinks
+            if self.blob_store:
+                self.blob_store.ingest_tree(path)
             
             return path
             
@@ -209,16 +316,49 @@ class KaggleHubDownloader:
                 print(f"  ⏳ Error (retry {retry_count + 1}/{MAX_RETRIES}): {error_str[:100]}")
                 print(f"     Waiting {wait_time}s before retry...")
                 time.sleep(wait_time)
-                return self.download_dataset_with_kagglehub(dataset_ref, category, retry_count + 1)
+                return self.fetch_with_kagglehub(dataset_ref, retry_count + 1)
             
             # Permanent failure
             error_msg = error_str[:200]
             print(f"  ❌ Failed: {dataset_ref}")
             print(f"     Error: {error_msg}")
             self.log_error(dataset_ref, error_msg)
-            self.total_failed += 1
             return None
     
+    def advertised_size(self, dataset_ref: str) -> int:
+        """Bytes Kaggle says a download will bring down (only the selected files in file-level mode)"""
+        if self.file_filter:
+            try:
+                return sum(record["size_bytes"] for record in select_files(get_client().list_files(dataset_ref),
+                                                                           **self.file_filter))
+            except Exception as e:
+                print(f"  ⚠️  Could not list files of {dataset_ref}: {str(e)[:100]}")
+        return (self.metadata.get(dataset_ref) or {}).get("size_bytes") or 0
+    
+    def fetch_selected_files(self, handle: str) -> str:
+        """Download the files passing the file filter into a kagglehub-style version directory"""
+        parts = handle.split("/")
+        dataset_ref = "/".join(parts[:2])
+        version = parts[3] if len(parts) == 4 else "0"
+        path = dataset_cache_dir(dataset_ref, self.cache_root) / "versions" / version
+        result = get_client().download_files(dataset_ref, path, **self.file_filter)
+        print(f"  📄 {len(result['selected'])}/{result['files']} files selected, "
+              f"{format_size(result['skipped_bytes'])} not downloaded")
+        return str(path)
+    
+    def remove_partial_download(self, versions_dir: Path, existing_versions: Set[Path]):
+        """Remove cache entries created by a download that did not complete"""
+        if not versions_dir.exists():
+            return
+        for entry in versions_dir.iterdir():
+            if entry in existing_versions:
+                continue
+            print(f"  🧹 Removing partial download: {entry}")
+            if entry.is_dir() and not entry.is_symlink():
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                entry.unlink(missing_ok=True)
+    
     def create_symlink(self, dataset_ref: str, source_path: str):
         """Create symlink in data/kaggle/ for easy access"""
         try:
@@ -238,26 +378,6 @@ class KaggleHubDownloader:
         except Exception as e:
             print(f"  ⚠️  Could not create symlink: {e}")
     
-    def search_datasets_cli(self, search_term: str) -> List[str]:
-        """Search Kaggle for datasets using CLI (for discovery)"""
-        try:
-            cmd = ["kaggle", "datasets", "list", "-s", search_term, "--csv"]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True, timeout=30)
-            
-            # Parse CSV output
-            csv_reader = csv.DictReader(io.StringIO(result.stdout))
-            datasets = []
-            
-            for row in csv_reader:
-                if 'ref' in row:
-                    datasets.append(row['ref'])
-            
-            return datasets
-            
-        except Exception as e:
-            print(f"  ⚠️  Search error for '{search_term}': {e}")
-            return []
-    
     def analyze_dataset_files(self, dataset_path: str) -> Dict:
         """Analyze files in a dataset directory"""
         path = Path(dataset_path)
@@ -284,17 +404,16 @@ class KaggleHubDownloader:
                 size = csv_file.stat().st_size
                 stats["total_size_bytes"] += size
                 
-                # Count rows (quick estimate)
-                with open(csv_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    row_count = sum(1 for _ in f) - 1  # Subtract header
-                    if row_count > 0:
-                        stats["estimated_records"] += row_count
-                        stats["csv_files"].append({
-                            "name": csv_file.name,
-                            "path": str(csv_file.relative_to(path)),
-                            "size_bytes": size,
-                            "records": row_count
-                        })
+                # Count rows with a streaming, quote-aware scan
+                row_count = self.stats_cache.count(csv_file, count_csv_rows) - 1  # Subtract header
+                if row_count > 0:
+                    stats["estimated_records"] += row_count
+                    stats["csv_files"].append({
+                        "name": csv_file.name,
+                        "path": str(csv_file.relative_to(path)),
+                        "size_bytes": size,
+                        "records": row_count
+                    })
             except Exception as e:
                 print(f"    ⚠️  Error analyzing {csv_file.name}: {e}")
         
@@ -305,30 +424,113 @@ class KaggleHubDownloader:
                 size = json_file.stat().st_size
                 stats["total_size_bytes"] += size
                 
-                with open(json_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        record_count = len(data)
-                        stats["estimated_records"] += record_count
-                        stats["json_files"].append({
-                            "name": json_file.name,
-                            "path": str(json_file.relative_to(path)),
-                            "size_bytes": size,
-                            "records": record_count
-                        })
-                    else:
-                        stats["json_files"].append({
-                            "name": json_file.name,
-                            "path": str(json_file.relative_to(path)),
-                            "size_bytes": size,
-                            "records": 1
-                        })
-                        stats["estimated_records"] += 1
+                # Top-level array elements, or 1 for any other document
+                record_count = self.stats_cache.count(json_file, count_json_records)
+                stats["estimated_records"] += record_count
+                stats["json_files"].append({
+                    "name": json_file.name,
+                    "path": str(json_file.relative_to(path)),
+                    "size_bytes": size,
+                    "records": record_count
+                })
             except Exception as e:
                 print(f"    ⚠️  Error analyzing {json_file.name}: {e}")
         
         return stats
     
+    def download_and_analyze(self, dataset_ref: str, category: str) -> Tuple[Optional[str], Optional[Dict]]:
+        """Download one dataset and analyze its files"""
+        path = self.download_dataset_with_kagglehub(dataset_ref, category=category)
+        stats = self.analyze_dataset_files(path) if path else None
+        if path:
+            self.catalog_dataset(dataset_ref, path, category, stats)
+        if path and self.parquet:
+            self.convert_to_parquet(dataset_ref, path)
+        return path, stats
+    
+    def catalog_dataset(self, dataset_ref: str, dataset_path: str, category: str, stats: Dict):
+        """Record a dataset's version, files and record counts in the dataset catalog"""
+        record = self.metadata.get(dataset_ref)
+        if record:
+            self.catalog.upsert_metadata(record)
+        records = {entry["path"]: entry["records"] for entry in stats["csv_files"] + stats["json_files"]}
+        self.catalog.record_download(dataset_ref, dataset_path, self.dataset_versions.get(dataset_ref),
+                                     category=category, tags=["kaggle-manifest"], records=records)
+    
+    def convert_to_parquet(self, dataset_ref: str, dataset_path: str):
+        """Write typed Parquet copies of a dataset's tables and journal them with the dataset"""
+        tables = convert_dataset(dataset_ref, dataset_path)
+        failed = [table for table in tables if "error" in table]
+        print(f"    🧱 Parquet: {len(tables) - len(failed)} tables" +
+              (f" ({len(failed)} could not be converted)" if failed else ""))
+        with self.lock:
+            if tables != self.parquet_tables.get(dataset_ref):
+                record = {"op": "parquet", "dataset": dataset_ref, "tables": tables}
+                self.apply_record(self.journal.append(record))
+    
+    def download_all(self, items: List[Tuple[str, str, str]]):
+        """Download (dataset_ref, category, label) items, up to self.jobs at a time"""
+        # A dataset found by several search terms is only fetched once
+        unique = {}
+        for dataset_ref, category, label in items:
+            unique.setdefault(dataset_ref, (dataset_ref, category, label))
+        items = self.admission_order(list(unique.values()))
+        total = len(items)
+        
+        def analyze(dataset_ref: str, category: str) -> Optional[Dict]:
+            # One failing job is logged like any other failed download and never ends the run
+            try:
+                return self.download_and_analyze(dataset_ref, category)[1]
+            except Exception as e:
+                print(f"  ❌ {dataset_ref}: {e}")
+                self.log_error(dataset_ref, f"{type(e).__name__}: {str(e)[:200]}")
+                return None
+        
+        def report(stats: Optional[Dict]):
+            if stats is not None:
+                print(f"    📊 Files: {stats['total_files']} | Records: {stats['estimated_records']:,}")
+            print()
+            
+            # Progress is already journaled; compact it now and then
+            if self.journal.pending >= COMPACT_EVERY:
+                self.save_manifest()
+        
+        if self.jobs == 1:
+            for i, (dataset_ref, category, label) in enumerate(items, 1):
+                print(f"[{i}/{total}] {label}")
+                report(analyze(dataset_ref, category))
+        else:
+            print(f"🧵 Downloading with {self.jobs} parallel jobs")
+            print()
+            pool = ThreadPoolExecutor(max_workers=self.jobs)
+            try:
+                futures = {
+                    pool.submit(analyze, dataset_ref, category): label
+                    for dataset_ref, category, label in items
+                }
+                for i, future in enumerate(as_completed(futures), 1):
+                    label = futures[future]
+                    stats = future.result()
+                    print(f"[{i}/{total}] {label} done")
+                    report(stats)
+            finally:
+                # On interrupt, let running downloads finish but drop queued ones
+                pool.shutdown(wait=True, cancel_futures=True)
+        
+        self.save_manifest()
+    
+    def admission_order(self, items: List[Tuple[str, str, str]]) -> List[Tuple[str, str, str]]:
+        """Order items so new downloads are admitted best value per byte first"""
+        new_refs = [dataset_ref for dataset_ref, _, _ in items if dataset_ref not in self.downloaded_datasets]
+        rank = {
+            record["ref"]: i
+            for i, record in enumerate(rank_by_value(
+                self.metadata.get(dataset_ref) or {"ref": dataset_ref, "size_bytes": 0} for dataset_ref in new_refs
+            ))
+        }
+        # Already downloaded datasets need no admission and keep their place up front
+        return sorted(items, key=lambda item: rank.get(item[0], -1))
+    
     def run_phase_a(self):
         """Phase A: Download known high-value datasets"""
         print("=" * 80)
@@ -337,22 +539,10 @@ class KaggleHubDownloader:
         print(f"📋 {len(KNOWN_HIGH_VALUE_DATASETS)} curated datasets to download")
         print()
         
-        for i, dataset_ref in enumerate(KNOWN_HIGH_VALUE_DATASETS, 1):
-            print(f"[{i}/{len(KNOWN_HIGH_VALUE_DATASETS)}] {dataset_ref}")
-            path = self.download_dataset_with_kagglehub(dataset_ref, category="high-value")
-            
-            if path:
-                # Analyze files
-                stats = self.analyze_dataset_files(path)
-                print(f"    📊 Files: {stats['total_files']} | Records: {stats['estimated_records']:,}")
-            
-            print()
-            
-            # Save progress periodically
-            if i % 5 == 0:
-                self.save_manifest()
-        
-        self.save_manifest()
+        self.download_all([
+            (dataset_ref, "high-value", dataset_ref)
+            for dataset_ref in KNOWN_HIGH_VALUE_DATASETS
+        ])
     
     def run_phase_b(self, max_datasets_per_term: int = 5):
         """Phase B: Search and discover additional datasets"""
@@ -362,24 +552,36 @@ class KaggleHubDownloader:
         print(f"🔍 Searching {len(SEARCH_TERMS)} terms for additional datasets")
         print()
         
-        discovered_datasets = []
-        
-        for term in SEARCH_TERMS:
-            print(f"🔍 Searching: '{term}'")
-            results = self.search_datasets_cli(term)
-            
-            if results:
-                print(f"   Found {len(results)} datasets")
-                # Take top N results per term
-                for dataset_ref in results[:max_datasets_per_term]:
-                    if dataset_ref not in self.downloaded_datasets:
-                        discovered_datasets.append((dataset_ref, term))
+        unique_discovered: List[Tuple[str, str]] = []
+        seen: Set[str] = set(self.downloaded_datasets)
+        search_results = []
+        started = time.monotonic()
+        
+        # Terms are searched concurrently; results arrive in completion order
+        for result in discover(SEARCH_TERMS):
+            search_results.append(result)
+            term = result["term"]
+            self.metadata.seed(result["datasets"])
+            if result["error"]:
+                print(f"  ⚠️  Search error for '{term}' ({result['seconds']:.1f}s): {result['error']}")
+            elif result["refs"]:
+                print(f"🔍 '{term}': found {len(result['refs'])} datasets ({result['seconds']:.1f}s)")
             else:
-                print(f"   No results")
-            print()
+                print(f"🔍 '{term}': no results ({result['seconds']:.1f}s)")
+            
+            # Take top N results per term; the first term to find a dataset keeps it
+            for dataset_ref in result["refs"][:max_datasets_per_term]:
+                if dataset_ref not in seen:
+                    seen.add(dataset_ref)
+                    unique_discovered.append((dataset_ref, term))
         
-        # Remove duplicates
-        unique_discovered = list(set(discovered_datasets))
+        timings = timing_summary(search_results, time.monotonic() - started)
+        print()
+        print(f"⏱️  {timings['terms']} searches in {timings['wall_seconds']:.1f}s "
+              f"({timings['search_seconds']:.1f}s of search time, {timings['failed']} failed)")
+        for term, seconds in timings["slowest"]:
+            print(f"   - '{term}': {seconds:.1f}s")
+        print()
         print(f"📊 Discovered {len(unique_discovered)} unique new datasets")
         print()
         
@@ -390,21 +592,10 @@ class KaggleHubDownloader:
         print("⬇️  Downloading discovered datasets...")
         print()
         
-        for i, (dataset_ref, search_term) in enumerate(unique_discovered, 1):
-            print(f"[{i}/{len(unique_discovered)}] {dataset_ref} (from '{search_term}')")
-            path = self.download_dataset_with_kagglehub(dataset_ref, category=f"search-{search_term}")
-            
-            if path:
-                stats = self.analyze_dataset_files(path)
-                print(f"    📊 Files: {stats['total_files']} | Records: {stats['estimated_records']:,}")
-            
-            print()
-            
-            # Save progress periodically
-            if i % 5 == 0:
-                self.save_manifest()
-        
-        self.save_manifest()
+        self.download_all([
+            (dataset_ref, f"search-{search_term}", f"{dataset_ref} (from '{search_term}')")
+            for dataset_ref, search_term in unique_discovered
+        ])
     
     def generate_summary(self):
         """Generate comprehensive summary report"""
@@ -447,7 +638,9 @@ class KaggleHubDownloader:
                     "estimated_records": stats["estimated_records"],
                     "size_bytes": stats["total_size_bytes"],
                     "size_mb": stats["total_size_bytes"] / 1024 / 1024,
-                    "file_list": stats["csv_files"] + stats["json_files"]
+                    "file_list": stats["csv_files"] + stats["json_files"],
+                    "parquet_tables": [table["parquet"] for table in self.parquet_tables.get(dataset_ref, [])
+                                       if "parquet" in table]
                 })
         
         # Category breakdown
@@ -460,10 +653,17 @@ class KaggleHubDownloader:
         # Sort datasets by record count
         summary["dataset_details"].sort(key=lambda x: x["estimated_records"], reverse=True)
         summary["largest_datasets"] = summary["dataset_details"][:10]
+        summary["disk_budget"] = self.disk_budget.report()
         
         # Save summary
         with open(SUMMARY_REPORT, 'w') as f:
             json.dump(summary, indent=2, fp=f)
+        self.stats_cache.save()
+        if self.blob_store:
+            self.blob_store.save()
+        
+        if self.output_format == "msgpack":
+            write_record_batches(SUMMARY_BATCHES, summary["dataset_details"], source="kaggle-datasets")
         
         # Print summary
         print()
@@ -475,6 +675,15 @@ class KaggleHubDownloader:
         print(f"📁 Total files: {summary['total_files']}")
         print(f"📝 Total records: {summary['total_records']:,}")
         print(f"💾 Total size: {summary['total_size_gb']:.2f} GB")
+        print(f"♻️  Stats cache: {self.stats_cache.hits} files reused, {self.stats_cache.misses} counted")
+        if self.blob_store:
+            dedupe = self.blob_store.report()
+            print(f"🔗 Dedupe: {dedupe['duplicates']} duplicate files linked, "
+                  f"{dedupe['bytes_reclaimed'] / 1024 / 1024:.1f} MB reclaimed")
+        disk_budget = summary["disk_budget"]
+        if disk_budget["deferred"] or disk_budget["skipped"]:
+            print(f"💾 Disk budget: {len(disk_budget['deferred'])} deferred to a later run, "
+                  f"{len(disk_budget['skipped'])} skipped as too large")
         print()
         print("📦 Datasets by category:")
         for category, count in sorted(summary["datasets_by_category"].items()):
@@ -487,6 +696,11 @@ class KaggleHubDownloader:
         print()
         print(f"📋 Manifest saved: {MANIFEST_FILE}")
         print(f"📊 Full summary: {SUMMARY_REPORT}")
+        print(f"🗂️  Dataset catalog: {self.catalog.path}")
+        if self.output_format == "msgpack":
+            print(f"📦 Record batches: {SUMMARY_BATCHES}")
+        if self.parquet:
+            print(f"🧱 Parquet tables: {PARQUET_ROOT}")
         print(f"🔗 Symlinks created in: {BASE_DIR}")
         print("=" * 80)
     
@@ -506,7 +720,13 @@ class KaggleHubDownloader:
         
         print(f"📁 Base directory: {BASE_DIR.absolute()}")
         print(f"📋 Manifest: {MANIFEST_FILE}")
-        print(f"💾 Cache directory: {KAGGLE_CACHE}")
+        print(f"💾 Cache directory: {self.cache_root}")
+        if self.file_filter:
+            print(f"📄 File filter: {self.file_filter}")
+        headroom = self.disk_budget.headroom()
+        if headroom["budget"] is not None:
+            print(f"💾 Disk budget headroom: {format_size(headroom['budget'])}")
+        print(f"💾 Free space (after reserve): {format_size(headroom['free'])}")
         print(f"📦 Previously downloaded: {len(self.downloaded_datasets)}")
         print()
         
@@ -524,13 +744,63 @@ class KaggleHubDownloader:
         print("✅ Download complete!")
 
 
+def size_argument(value: str) -> int:
+    """argparse type for sizes such as 500M or 20G"""
+    try:
+        return parse_size(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a size such as 500M or 20G, got {value!r}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Download comic/collectible Kaggle datasets")
+    parser.add_argument("--skip-search", action="store_true", help="Phase A only (known datasets)")
+    parser.add_argument("--format", choices=("json", "msgpack"), default="json",
+                        help="dataset details output format")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="concurrent downloads")
+    parser.add_argument("--no-dedupe", action="store_true", help="do not hardlink duplicate files")
+    parser.add_argument("--budget", type=size_argument, help="disk budget, e.g. 500M or 20G")
+    parser.add_argument("--include", action="append", metavar="GLOB", help="fetch only matching files")
+    parser.add_argument("--exclude", action="append", metavar="GLOB", help="skip matching files")
+    parser.add_argument("--max-file-size", type=size_argument, metavar="SIZE", help="skip larger files")
+    parser.add_argument("--parquet", action="store_true", help="write typed Parquet copies of tables")
+    return parser
+
+
 def main():
     """Main entry point"""
-    downloader = KaggleHubDownloader()
+    args = build_parser().parse_args()
+    output_format = args.format
+    if output_format == "msgpack":
+        try:
+            require_msgpack()
+        except RuntimeError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+    
+    parquet = args.parquet
+    if parquet:
+        try:
+            require_pyarrow()
+        except RuntimeError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+    
+    file_filter = {}
+    if args.include:
+        file_filter["include"] = args.include
+    if args.exclude:
+        file_filter["exclude"] = args.exclude
+    if args.max_file_size is not None:
+        file_filter["max_file_bytes"] = args.max_file_size
+    
+    downloader = KaggleHubDownloader(output_format=output_format, jobs=args.jobs,
+                                     dedupe=not args.no_dedupe, budget=args.budget,
+                                     file_filter=file_filter or None, parquet=parquet)
     
     try:
         # Check command line arguments
-        skip_phase_b = "--skip-search" in sys.argv
+        skip_phase_b = args.skip_search
         
         if skip_phase_b:
             print("🔧 Running with --skip-search (Phase A only)")
@@ -8,32 +8,46 @@ Designed to acquire millions of records for comprehensive market analysis.
 
 Requirements:
 - Python 3.7+
-- kaggle package (pip install kaggle)
+- requests package (Kaggle REST API via server/services/kaggleClient.py)
 - KAGGLE_USERNAME and KAGGLE_KEY environment variables
 
 Usage:
-    python scripts/kaggle-bulk-download.py
+    python scripts/kaggle-bulk-download.py [--parquet]
 
 Features:
 - Downloads from 70+ search terms across comics, collectibles, and pop culture
+- Searches all terms concurrently under a shared rate limit
 - Automatic retry with exponential backoff for rate limits
 - Resume capability (skips already downloaded datasets)
+- Disk-budget admission from advertised sizes, best value per byte first (KAGGLE_DISK_BUDGET)
 - Progress tracking with manifest and error logs
+- Duplicate files across datasets hardlinked to one content-addressed blob
 - Comprehensive summary report after completion
+- Optional typed Parquet copy of every CSV/JSON table, recorded in the manifest (--parquet, needs pyarrow)
+- Every dataset and file recorded in the SQLite dataset catalog (data/dataset-catalog.db)
 """
 
 import os
 import sys
+import argparse
 import json
 import time
-import subprocess
-import csv
+import requests
 import zipfile
 import shutil
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Set, Tuple
-import io
+
+# Shared Kaggle discovery helpers live with the Python services
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server" / "services"))
+from blobStore import BlobStore
+from datasetCatalog import DatasetCatalog
+from diskBudget import ADMIT, SKIP, DiskBudget, format_size, rank_by_value, tree_bytes
+from kaggleClient import get_client
+from kaggleDiscovery import discover, timing_summary
+from parquetCache import convert_dataset, require_pyarrow
+from recordCounter import count_csv_rows, count_json_records, is_json_array
 
 # Search terms organized by category
 SEARCH_TERMS = {
@@ -98,10 +112,16 @@ BACKOFF_FACTOR = 2
 
 
 class KaggleDownloader:
-    def __init__(self):
+    def __init__(self, parquet: bool = False):
+        self.parquet = parquet
         self.manifest = self.load_manifest()
         self.downloaded_datasets: Set[str] = set(self.manifest.get("downloaded", []))
         self.failed_downloads: List[Dict] = self.manifest.get("failed", [])
+        self.blob_store = BlobStore()
+        self.catalog = DatasetCatalog()
+        self.disk_budget = DiskBudget([BASE_DIR])
+        # Kaggle metadata (advertised size, votes) by dataset ref
+        self.dataset_info: Dict[str, Dict] = {}
         self.total_downloaded = 0
         self.total_failed = 0
         self.session_start = datetime.now().isoformat()
@@ -127,6 +147,7 @@ class KaggleDownloader:
         
         with open(MANIFEST_FILE, 'w') as f:
             json.dump(self.manifest, indent=2, fp=f)
+        self.blob_store.save()
     
     def log_error(self, dataset_ref: str, error: str):
         """Log download error"""
@@ -140,95 +161,110 @@ class KaggleDownloader:
             "timestamp": timestamp
         })
     
-    def search_datasets(self, search_term: str) -> List[str]:
-        """Search Kaggle for datasets matching term"""
-        try:
-            cmd = ["kaggle", "datasets", "list", "-s", search_term, "--csv"]
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            
-            # Parse CSV output
-            csv_reader = csv.DictReader(io.StringIO(result.stdout))
-            datasets = []
-            
-            for row in csv_reader:
-                if 'ref' in row:
-                    datasets.append(row['ref'])
-            
-            print(f"  Found {len(datasets)} datasets for '{search_term}'")
-            return datasets
-            
-        except subprocess.CalledProcessError as e:
-            print(f"  Error searching for '{search_term}': {e}")
-            self.log_error(search_term, f"Search failed: {e}")
-            return []
+    def record_failure(self, dataset_ref: str, error: str):
+        """Log a failed dataset download and mark it failed in the dataset catalog"""
+        self.log_error(dataset_ref, error)
+        self.catalog.record_failure(dataset_ref, error, tags=["kaggle-manifest"])
+        self.total_failed += 1
     
-    def download_dataset(self, dataset_ref: str, category: str, search_term: str, retry_count: int = 0) -> bool:
-        """Download and extract a single dataset"""
+    def download_dataset(self, dataset_ref: str, category: str, search_term: str) -> bool:
+        """Download and extract a single dataset, if the disk budget admits it"""
         # Skip if already downloaded
         if dataset_ref in self.downloaded_datasets:
             print(f"  ⏭️  Skipping {dataset_ref} (already downloaded)")
             return True
         
+        # Pre-flight: only start downloads that fit the budget and free space
+        size_bytes = self.dataset_info.get(dataset_ref, {}).get("size_bytes") or 0
+        decision = self.disk_budget.admit(dataset_ref, size_bytes)
+        if decision != ADMIT:
+            action = "Skipping" if decision == SKIP else "Deferring"
+            print(f"  💾 {action} {dataset_ref}: {format_size(size_bytes)} does not fit the disk budget")
+            return False
+        
         # Create download directory
         safe_term = search_term.replace(" ", "_").replace("/", "_")
         dataset_name = dataset_ref.split("/")[-1]
         download_path = BASE_DIR / safe_term / dataset_name
         download_path.mkdir(parents=True, exist_ok=True)
         
+        success = False
+        try:
+            success = self.fetch_dataset(dataset_ref, category, download_path)
+        finally:
+            if not success:
+                # Failed or interrupted: leave no partial archive or extraction behind
+                shutil.rmtree(download_path, ignore_errors=True)
+            self.disk_budget.release(dataset_ref, tree_bytes([download_path]) if success else 0)
+        return success
+    
+    def fetch_dataset(self, dataset_ref: str, category: str, download_path: Path, retry_count: int = 0) -> bool:
+        """Fetch a dataset into download_path with retries; logs the error on failure"""
         try:
-            # Download dataset
-            cmd = ["kaggle", "datasets", "download", "-d", dataset_ref, "-p", str(download_path), "--unzip"]
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+            # Download dataset and extract it in place
+            get_client().download(dataset_ref, download_path, unzip=True)
             
-            if result.returncode == 0:
-                print(f"  ✅ Downloaded: {dataset_ref}")
-                self.downloaded_datasets.add(dataset_ref)
-                self.total_downloaded += 1
-                
-                # Update category stats
-                if category not in self.manifest["datasets_by_category"]:
-                    self.manifest["datasets_by_category"][category] = []
-                self.manifest["datasets_by_category"][category].append(dataset_ref)
-                
-                # Calculate size
-                total_size = sum(f.stat().st_size for f in download_path.rglob('*') if f.is_file())
-                self.manifest["total_size_bytes"] = self.manifest.get("total_size_bytes", 0) + total_size
-                
-                return True
+            print(f"  ✅ Downloaded: {dataset_ref}")
+            self.downloaded_datasets.add(dataset_ref)
+            self.total_downloaded += 1
+            
+            # Update category stats
+            if category not in self.manifest["datasets_by_category"]:
+                self.manifest["datasets_by_category"][category] = []
+            self.manifest["datasets_by_category"][category].append(dataset_ref)
+            
+            # Calculate size
+            total_size = sum(f.stat().st_size for f in download_path.rglob('*') if f.is_file())
+            self.manifest["total_size_bytes"] = self.manifest.get("total_size_bytes", 0) + total_size
             
+            # Hardlink files other datasets already brought down
+            self.blob_store.ingest_tree(download_path)
+            
+            # Dataset, version and files in the catalog
+            info = self.dataset_info.get(dataset_ref)
+            if info:
+                self.catalog.upsert_metadata(info)
+            self.catalog.record_download(dataset_ref, str(download_path), (info or {}).get("version"),
+                                         category=category, tags=["kaggle-manifest"])
+            
+            # Typed Parquet copies of the tables, listed with the dataset
+            if self.parquet:
+                tables = convert_dataset(dataset_ref, download_path)
+                self.manifest.setdefault("parquet_tables", {})[dataset_ref] = tables
+                print(f"  🧱 Parquet: {sum(1 for table in tables if 'parquet' in table)} tables")
+            
+            return True
+        
+        except requests.HTTPError as e:
             # Handle rate limiting
-            elif "429" in result.stderr or "rate limit" in result.stderr.lower():
+            if e.response is not None and e.response.status_code == 429:
                 if retry_count < MAX_RETRIES:
                     wait_time = DOWNLOAD_DELAY * (BACKOFF_FACTOR ** retry_count)
                     print(f"  ⏳ Rate limited. Waiting {wait_time}s before retry {retry_count + 1}/{MAX_RETRIES}")
                     time.sleep(wait_time)
-                    return self.download_dataset(dataset_ref, category, search_term, retry_count + 1)
+                    return self.fetch_dataset(dataset_ref, category, download_path, retry_count + 1)
                 else:
                     error_msg = f"Rate limit exceeded after {MAX_RETRIES} retries"
                     print(f"  ❌ {dataset_ref}: {error_msg}")
-                    self.log_error(dataset_ref, error_msg)
-                    self.total_failed += 1
+                    self.record_failure(dataset_ref, error_msg)
                     return False
             
             else:
-                error_msg = result.stderr[:200] if result.stderr else "Unknown error"
+                error_msg = str(e)[:200]
                 print(f"  ❌ Failed: {dataset_ref} - {error_msg}")
-                self.log_error(dataset_ref, error_msg)
-                self.total_failed += 1
+                self.record_failure(dataset_ref, error_msg)
                 return False
                 
-        except subprocess.TimeoutExpired:
-            error_msg = "Download timeout (>5 min)"
+        except requests.Timeout:
+            error_msg = "Download timeout (>5 min without data)"
             print(f"  ❌ {dataset_ref}: {error_msg}")
-            self.log_error(dataset_ref, error_msg)
-            self.total_failed += 1
+            self.record_failure(dataset_ref, error_msg)
             return False
             
         except Exception as e:
             error_msg = str(e)[:200]
             print(f"  ❌ {dataset_ref}: {error_msg}")
-            self.log_error(dataset_ref, error_msg)
-            self.total_failed += 1
+            self.record_failure(dataset_ref, error_msg)
             return False
     
     def run(self):
@@ -255,16 +291,48 @@ class KaggleDownloader:
         print("🔍 PHASE 1: Searching for datasets...")
         print()
         
-        for category, terms in SEARCH_TERMS.items():
-            print(f"Category: {category}")
-            for term in terms:
-                datasets = self.search_datasets(term)
-                for dataset_ref in datasets:
+        term_categories = {
+            term: category
+            for category, terms in SEARCH_TERMS.items()
+            for term in terms
+        }
+        seen: Set[str] = set()
+        search_results = []
+        started = time.monotonic()
+        
+        # Terms are searched concurrently; results arrive in completion order
+        for result in discover(term_categories):
+            search_results.append(result)
+            term = result["term"]
+            category = term_categories[term]
+            for dataset in result["datasets"]:
+                self.dataset_info.setdefault(dataset["ref"], dataset)
+            if result["error"]:
+                print(f"  Error searching for '{term}': {result['error']}")
+                self.log_error(term, f"Search failed: {result['error']}")
+                continue
+            print(f"  Found {len(result['refs'])} datasets for '{term}' [{category}] ({result['seconds']:.1f}s)")
+            
+            # Same dataset may match multiple terms; the first term to find it keeps it
+            for dataset_ref in result["refs"]:
+                if dataset_ref not in seen:
+                    seen.add(dataset_ref)
                     all_datasets.append((dataset_ref, category, term))
-            print()
         
-        # Remove duplicates (same dataset may match multiple terms)
-        unique_datasets = list(set(all_datasets))
+        timings = timing_summary(search_results, time.monotonic() - started)
+        print()
+        print(f"⏱️  {timings['terms']} searches in {timings['wall_seconds']:.1f}s "
+              f"({timings['search_seconds']:.1f}s of search time, {timings['failed']} failed)")
+        for term, seconds in timings["slowest"]:
+            print(f"   - '{term}': {seconds:.1f}s")
+        print()
+        
+        # New datasets are admitted best value per advertised byte first
+        rank = {
+            record["ref"]: i
+            for i, record in enumerate(rank_by_value(self.dataset_info[dataset_ref] for dataset_ref, _, _ in all_datasets))
+        }
+        unique_datasets = sorted(all_datasets, key=lambda item: rank[item[0]])
         total_datasets = len(unique_datasets)
         
         print(f"📊 Found {total_datasets} unique datasets across {len(SEARCH_TERMS)} categories")
@@ -310,6 +378,10 @@ class KaggleDownloader:
         print("=" * 80)
         print(f"✅ Successfully downloaded: {self.total_downloaded}")
         print(f"❌ Failed: {self.total_failed}")
+        disk_budget = self.disk_budget.report()
+        if disk_budget["deferred"] or disk_budget["skipped"]:
+            print(f"💾 Disk budget: {len(disk_budget['deferred'])} deferred to a later run, "
+                  f"{len(disk_budget['skipped'])} skipped as too large")
         print(f"📋 Manifest saved: {MANIFEST_FILE}")
         print()
         
@@ -351,18 +423,17 @@ class KaggleDownloader:
         csv_records = 0
         for csv_file in csv_files:
             try:
-                with open(csv_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    row_count = sum(1 for _ in f) - 1  # Subtract header
-                    if row_count > 0:
-                        csv_records += row_count
-                        file_size = csv_file.stat().st_size
-                        file_sizes.append({
-                            "file": str(csv_file.relative_to(BASE_DIR)),
-                            "size_bytes": file_size,
-                            "size_mb": file_size / 1024 / 1024,
-                            "records": row_count
-                        })
-                        summary["ready_files"].append(str(csv_file.relative_to(BASE_DIR)))
+                row_count = count_csv_rows(csv_file) - 1  # Subtract header
+                if row_count > 0:
+                    csv_records += row_count
+                    file_size = csv_file.stat().st_size
+                    file_sizes.append({
+                        "file": str(csv_file.relative_to(BASE_DIR)),
+                        "size_bytes": file_size,
+                        "size_mb": file_size / 1024 / 1024,
+                        "records": row_count
+                    })
+                    summary["ready_files"].append(str(csv_file.relative_to(BASE_DIR)))
             except Exception as e:
                 print(f"⚠️  Error reading {csv_file}: {e}")
         
@@ -376,19 +447,17 @@ class KaggleDownloader:
                 continue
             
             try:
-                with open(json_file, 'r', encoding='utf-8', errors='ignore') as f:
-                    data = json.load(f)
-                    if isinstance(data, list):
-                        record_count = len(data)
-                        json_records += record_count
-                        file_size = json_file.stat().st_size
-                        file_sizes.append({
-                            "file": str(json_file.relative_to(BASE_DIR)),
-                            "size_bytes": file_size,
-                            "size_mb": file_size / 1024 / 1024,
-                            "records": record_count
-                        })
-                        summary["ready_files"].append(str(json_file.relative_to(BASE_DIR)))
+                if is_json_array(json_file):
+                    record_count = count_json_records(json_file)
+                    json_records += record_count
+                    file_size = json_file.stat().st_size
+                    file_sizes.append({
+                        "file": str(json_file.relative_to(BASE_DIR)),
+                        "size_bytes": file_size,
+                        "size_mb": file_size / 1024 / 1024,
+                        "records": record_count
+                    })
+                    summary["ready_files"].append(str(json_file.relative_to(BASE_DIR)))
             except Exception as e:
                 print(f"⚠️  Error reading {json_file}: {e}")
         
@@ -415,6 +484,9 @@ class KaggleDownloader:
         print(f"   - CSV records: {summary['records_by_file_type'].get('csv', 0):,}")
         print(f"   - JSON records: {summary['records_by_file_type'].get('json', 0):,}")
         print(f"💾 Total storage used: {summary['total_size_gb']:.2f} GB")
+        dedupe = self.blob_store.report()
+        print(f"🔗 Dedupe: {dedupe['duplicates']} duplicate files linked, "
+              f"{dedupe['bytes_reclaimed'] / 1024 / 1024:.1f} MB reclaimed")
         print()
         print("📦 Datasets by category:")
         for category, count in sorted(summary["datasets_by_category"].items()):
@@ -432,12 +504,28 @@ class KaggleDownloader:
         print("=" * 80)
 
 
-if __name__ == "__main__":
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Download every Kaggle dataset matching comic/collectible terms")
+    parser.add_argument("--parquet", action="store_true", help="write typed Parquet copies of tables")
+    return parser
+
+
+def main():
+    """Main entry point"""
+    args = build_parser().parse_args()
+    
     # Ensure base directory exists
     BASE_DIR.mkdir(parents=True, exist_ok=True)
     
+    if args.parquet:
+        try:
+            require_pyarrow()
+        except RuntimeError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+    
     # Run downloader
-    downloader = KaggleDownloader()
+    downloader = KaggleDownloader(parquet=args.parquet)
     try:
         downloader.run()
     except KeyboardInterrupt:
@@ -450,3 +538,7 @@ if __name__ == "__main__":
         print(f"\n\n❌ Fatal error: {e}")
         downloader.save_manifest()
         sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
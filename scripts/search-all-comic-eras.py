@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 import kagglehub
 import os
+import sys
 import json
+from pathlib import Path
+
+# Results are also recorded in the shared dataset catalog
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server" / "services"))
+from datasetCatalog import DatasetCatalog
 
 print("🔍 SEARCHING KAGGLE FOR ALL COMIC BOOK ERAS...\n")
 print("📚 Golden Age (1938-1956)")
@@ -26,6 +32,7 @@ datasets_to_try = [
 ]
 
 downloaded = []
+catalog = DatasetCatalog()
 failed = []
 
 for dataset_name in datasets_to_try:
@@ -52,15 +59,18 @@ for dataset_name in datasets_to_try:
             "files": files_found,
             "total_size_mb": round(total_size, 2)
         })
+        catalog.record_download(dataset_name, path, tags=["all-comic-eras"])
         
     except Exception as e:
         error_msg = str(e)
         if "403" in error_msg or "Permission" in error_msg:
             print(f"❌ Private or restricted")
             failed.append({"dataset": dataset_name, "reason": "private/restricted"})
+            catalog.record_failure(dataset_name, "private/restricted", tags=["all-comic-eras"])
         else:
             print(f"❌ Not found")
             failed.append({"dataset": dataset_name, "reason": "not_found"})
+            catalog.record_failure(dataset_name, "not_found", tags=["all-comic-eras"])
 
 print(f"\n\n🏁 SEARCH COMPLETE!")
 print(f"   ✅ Downloaded: {len(downloaded)} datasets")
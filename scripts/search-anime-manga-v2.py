@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 import kagglehub
 import os
+import sys
 import json
+from pathlib import Path
+
+# Results are also recorded in the shared dataset catalog
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server" / "services"))
+from datasetCatalog import DatasetCatalog
 
 print("🎌 SEARCHING FOR ANIME/MANGA DATASETS (V2)...\n")
 
@@ -18,6 +24,7 @@ datasets_to_try = [
 
 # Also try known working ones
 working_datasets = []
+catalog = DatasetCatalog()
 
 print("Trying known working anime datasets...\n")
 
@@ -42,6 +49,7 @@ for dataset in datasets_to_try:
             "files": files_found,
             "size_mb": round(total_size, 2)
         })
+        catalog.record_download(dataset, path, tags=["anime-manga-found"])
         
         print(f"   SUCCESS!\n")
         
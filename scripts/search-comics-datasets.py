@@ -1,7 +1,17 @@
 #!/usr/bin/env python3
-import kagglehub
 import os
+import sys
 import json
+from pathlib import Path
+
+# Only the CSVs are scanned, so fetch just those with the shared Kaggle client
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server" / "services"))
+from kaggleClient import get_client
+from contentClassifier import COMIC, ContentClassifier
+from datasetCatalog import DatasetCatalog
+from datasetVersions import FRESH, MetadataCache, check_freshness, dataset_cache_dir, mark_complete
+
+CSV_CACHE = Path("data/kaggle-files/csv")
 
 print("📚 SEARCHING KAGGLE FOR COMIC BOOK DATASETS...\n")
 
@@ -21,37 +31,52 @@ datasets_to_try = [
 
 downloaded = []
 failed = []
+# The client is built on first use, so missing credentials are reported per dataset
+metadata = MetadataCache(lambda dataset_ref: get_client().view(dataset_ref))
+catalog = DatasetCatalog(cache_root=CSV_CACHE)
+classifier = ContentClassifier(catalog)
 
 for dataset_name in datasets_to_try:
     try:
         print(f"\n📦 Trying: {dataset_name}...")
-        path = kagglehub.dataset_download(dataset_name)
+        status, version, cached_path = check_freshness(dataset_name, metadata, CSV_CACHE)
+        if status == FRESH:
+            path = str(cached_path)
+        else:
+            version = version or 0
+            path = str(dataset_cache_dir(dataset_name, CSV_CACHE) / "versions" / str(version))
+            result = get_client().download_files(dataset_name, Path(path), include=["*.csv"])
+            print(f"   ⬇️  {len(result['selected'])}/{result['files']} files (CSV only), "
+                  f"skipped {result['skipped_bytes'] / (1024 * 1024):.1f} MB")
+            # An unknown version is stored as version 0 and marked too, so the next run finds it FRESH
+            mark_complete(dataset_name, version, CSV_CACHE)
+        
+        # Catalog the CSVs, then label them from their headers and column values
+        catalog.record_download(dataset_name, path, version)
+        classifier.classify(dataset_name)
+        comic_labels = {labelled['path']: labelled
+                        for labelled in classifier.labelled_files(COMIC, dataset_ref=dataset_name)}
         
-        files_found = []
         comic_files = []
         total_size = 0
         
-        for root, dirs, files in os.walk(path):
-            for file in files:
-                full_path = os.path.join(root, file)
-                size = os.path.getsize(full_path) / (1024 * 1024)
-                total_size += size
-                files_found.append(file)
-                
-                if file.endswith('.csv'):
-                    # Check if it's comic data
-                    with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        first_line = f.readline().lower()
-                        
-                        if any(term in first_line for term in ['comic', 'issue', 'title', 'series', 'volume']):
-                            comic_files.append({
-                                'file': file,
-                                'path': full_path,
-                                'size_mb': round(size, 2),
-                                'columns': first_line.strip()[:200]
-                            })
-                            print(f"   ✅ {file} ({size:.2f} MB)")
-                            print(f"      Columns: {first_line.strip()[:150]}...")
+        for csv_file in catalog.find_files(dataset_ref=dataset_name):
+            size = csv_file['size_bytes'] / (1024 * 1024)
+            total_size += size
+            
+            labelled = comic_labels.get(csv_file['path'])
+            if labelled:
+                file = os.path.basename(csv_file['path'])
+                columns = (csv_file['columns'] or '').lower()
+                comic_files.append({
+                    'file': file,
+                    'path': csv_file['path'],
+                    'size_mb': round(size, 2),
+                    'columns': columns[:200],
+                    'confidence': labelled['confidence']
+                })
+                print(f"   ✅ {file} ({size:.2f} MB, confidence {labelled['confidence']:.2f})")
+                print(f"      Columns: {columns[:150]}...")
         
         if comic_files:
             print(f"   SUCCESS: {len(comic_files)} comic files, {total_size:.2f} MB total")
@@ -61,18 +86,22 @@ for dataset_name in datasets_to_try:
                 "files": comic_files,
                 "total_size_mb": round(total_size, 2)
             })
+            catalog.add_tags(dataset_name, ["comic-datasets"])
         
     except Exception as e:
         error_msg = str(e)
         if "403" in error_msg or "Permission" in error_msg:
             print(f"   ❌ Private/restricted")
             failed.append({"dataset": dataset_name, "reason": "private"})
+            catalog.record_failure(dataset_name, "private", tags=["comic-datasets"])
         elif "122" in error_msg or "Disk quota" in error_msg:
             print(f"   ❌ Disk quota exceeded")
             failed.append({"dataset": dataset_name, "reason": "disk_quota"})
+            catalog.record_failure(dataset_name, "disk_quota", tags=["comic-datasets"])
         else:
             print(f"   ❌ Not found or error")
             failed.append({"dataset": dataset_name, "reason": "not_found"})
+            catalog.record_failure(dataset_name, "not_found", tags=["comic-datasets"])
 
 print(f"\n\n🏁 SEARCH COMPLETE!")
 print(f"   ✅ Downloaded: {len(downloaded)} datasets")
@@ -1,83 +1,75 @@
 #!/usr/bin/env python3
 import os
+import sys
 import json
-from csv import DictReader
+from pathlib import Path
+
+# Dataset paths and files come from the shared dataset catalog
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server" / "services"))
+from contentClassifier import CREATOR, ContentClassifier
+from datasetCatalog import DatasetCatalog
 
 print("✍️ SEARCHING FOR COMIC BOOK CREATORS...\n")
 
-# Check existing datasets for creator data
+# Check existing datasets for creator data (local paths come from the dataset catalog)
 existing_datasets = [
     {
-        "path": "/home/runner/.cache/kagglehub/datasets/fivethirtyeight/fivethirtyeight-comic-characters-dataset/versions/111",
+        "dataset": "fivethirtyeight/fivethirtyeight-comic-characters-dataset",
         "name": "FiveThirtyEight"
     },
     {
-        "path": "/home/runner/.cache/kagglehub/datasets/dannielr/marvel-superheroes/versions/3",
+        "dataset": "dannielr/marvel-superheroes",
         "name": "Marvel Superheroes"
     },
     {
-        "path": "/home/runner/.cache/kagglehub/datasets/claudiodavi/superhero-set/versions/1",
+        "dataset": "claudiodavi/superhero-set",
         "name": "Superhero Set"
     },
     {
-        "path": "/home/runner/.cache/kagglehub/datasets/csanhueza/the-marvel-universe-social-network/versions/1",
+        "dataset": "csanhueza/the-marvel-universe-social-network",
         "name": "Marvel Network"
     }
 ]
 
-creator_files = []
+catalog = DatasetCatalog()
+# Load JSON manifests written outside the catalog (files unchanged since their last import are skipped)
+catalog.import_legacy()
 
+# Label files from their columns: creator role headers (writer, penciller_name, ...) over text values.
+# Every local dataset is classified in one pass; only new or changed files are read
+local_datasets = []
 for dataset in existing_datasets:
-    if not os.path.exists(dataset['path']):
-        continue
-        
+    path = catalog.dataset_path(dataset['dataset'])
+    if path and os.path.exists(path):
+        local_datasets.append(dataset)
+classifier = ContentClassifier(catalog)
+classifier.classify([dataset['dataset'] for dataset in local_datasets])
+creator_labels = {labelled['path']: labelled for labelled in classifier.labelled_files(CREATOR)}
+
+creator_files = []
+
+for dataset in local_datasets:
     print(f"🔍 Checking: {dataset['name']}")
     
-    for root, dirs, files in os.walk(dataset['path']):
-        for file in files:
-            if not file.endswith('.csv'):
-                continue
-                
-            full_path = os.path.join(root, file)
-            
-            try:
-                # Read first 1000 chars to check columns
-                with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                    sample = f.read(2000).lower()
-                    
-                    # Look for creator-related columns
-                    creator_indicators = [
-                        'writer', 'artist', 'creator', 'author', 
-                        'penciller', 'inker', 'colorist', 'letterer',
-                        'staff', 'contributor'
-                    ]
-                    
-                    has_creators = any(ind in sample for ind in creator_indicators)
-                    
-                    if has_creators:
-                        size = os.path.getsize(full_path) / (1024 * 1024)
-                        creator_files.append({
-                            'dataset': dataset['name'],
-                            'file': file,
-                            'path': full_path,
-                            'size_mb': round(size, 2)
-                        })
-                        print(f"   ✅ {file} ({size:.2f} MB) - Has creator data!")
-                        
-                        # Sample the data
-                        with open(full_path, 'r', encoding='utf-8', errors='ignore') as cf:
-                            reader = DictReader(cf)
-                            rows = []
-                            for i, row in enumerate(reader):
-                                if i >= 5:
-                                    break
-                                rows.append(row)
-                            
-                            if rows:
-                                print(f"      Columns: {', '.join(rows[0].keys())[:100]}...")
-                                
-            except Exception as e:
-                pass
+    for csv_file in catalog.find_files(extension='csv', dataset_ref=dataset['dataset']):
+        labelled = creator_labels.get(csv_file['path'])
+        if not labelled:
+            continue
+        
+        full_path = csv_file['path']
+        file = os.path.basename(full_path)
+        size = csv_file['size_bytes'] / (1024 * 1024)
+        catalog.add_tags(dataset['dataset'], ['creator-datasets'], [csv_file['name']])
+        creator_files.append({
+            'dataset': dataset['name'],
+            'file': file,
+            'path': full_path,
+            'size_mb': round(size, 2),
+            'confidence': labelled['confidence']
+        })
+        print(f"   ✅ {file} ({size:.2f} MB) - Has creator data! (confidence {labelled['confidence']:.2f})")
+        print(f"      Creator columns: {', '.join(dict.fromkeys(column for column, _ in labelled['evidence']))}")
+        print(f"      Columns: {', '.join(column['name'] for column in classifier.index.columns(full_path))[:100]}...")
 
 print(f"\n\n🏁 FOUND {len(creator_files)} FILES WITH CREATOR DATA!\n")
 
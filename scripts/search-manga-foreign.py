@@ -1,7 +1,13 @@
 #!/usr/bin/env python3
 import kagglehub
 import os
+import sys
 import json
+from pathlib import Path
+
+# Results are also recorded in the shared dataset catalog
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server" / "services"))
+from datasetCatalog import DatasetCatalog
 
 print("🌏 SEARCHING KAGGLE FOR MANGA & FOREIGN COMICS...\n")
 print("🇯🇵 Manga (Japanese)")
@@ -30,6 +36,7 @@ datasets_to_try = [
 ]
 
 downloaded = []
+catalog = DatasetCatalog()
 failed = []
 
 for dataset_name in datasets_to_try:
@@ -56,15 +63,18 @@ for dataset_name in datasets_to_try:
             "files": files_found,
             "total_size_mb": round(total_size, 2)
         })
+        catalog.record_download(dataset_name, path, tags=["manga-foreign-comics"])
         
     except Exception as e:
         error_msg = str(e)
         if "403" in error_msg or "Permission" in error_msg:
             print(f"❌ Private/restricted")
             failed.append({"dataset": dataset_name, "reason": "private"})
+            catalog.record_failure(dataset_name, "private", tags=["manga-foreign-comics"])
         else:
             print(f"❌ Not found")
             failed.append({"dataset": dataset_name, "reason": "not_found"})
+            catalog.record_failure(dataset_name, "not_found", tags=["manga-foreign-comics"])
 
 print(f"\n\n🏁 SEARCH COMPLETE!")
 print(f"   ✅ Downloaded: {len(downloaded)} datasets")
@@ -1,7 +1,14 @@
 #!/usr/bin/env python3
 import kagglehub
 import os
+import sys
 import json
+from pathlib import Path
+
+# Downloaded datasets and their files come from the shared dataset catalog
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "server" / "services"))
+from contentClassifier import VILLAIN, ContentClassifier
+from datasetCatalog import DatasetCatalog
 
 print("😈 SEARCHING KAGGLE FOR SUPERVILLAINS...\n")
 
@@ -19,62 +26,48 @@ datasets_to_try = [
 
 print("🔍 Searching existing datasets for villain data...\n")
 
-# Check what we already have
-manifest_files = [
-    'data/kaggle-downloads.json',
-    'data/all-comic-eras.json'
-]
+# Check what we already have: the datasets the download scripts catalogued
+manifest_tags = ['kaggle-downloads', 'all-comic-eras', 'kaggle-manifest']
+catalog = DatasetCatalog()
+# Load JSON manifests written outside the catalog (files unchanged since their last import are skipped)
+catalog.import_legacy()
 
-existing_datasets = []
-for manifest_file in manifest_files:
-    try:
-        if os.path.exists(manifest_file):
-            with open(manifest_file, 'r') as f:
-                data = json.load(f)
-                if 'downloaded' in data:
-                    existing_datasets.extend(data['downloaded'])
-                elif isinstance(data, list):
-                    existing_datasets.extend(data)
-    except:
-        pass
+existing_datasets = [dataset['ref'] for tag in manifest_tags for dataset in catalog.datasets(tag=tag)]
+existing_datasets = list(dict.fromkeys(existing_datasets))
 
 print(f"📦 Already have {len(existing_datasets)} datasets downloaded\n")
 
-# Check for villain data in existing datasets
+# Check for villain data in existing datasets: the content classifier parses each new or changed
+# CSV in a process pool and scores its headers and column values (an alignment column whose values
+# read good/bad, villain roles), instead of matching substrings anywhere in a file
+classifier = ContentClassifier(catalog)
+classifier.classify(existing_datasets)
+
+villain_files = {labelled['path']: labelled for labelled in classifier.labelled_files(VILLAIN)}
+
 villain_data = []
 
 for dataset in existing_datasets:
-    path = dataset.get('path', '')
-    if not path:
-        continue
-        
-    print(f"🔍 Checking: {dataset.get('dataset', 'unknown')}")
+    print(f"🔍 Checking: {dataset}")
     
-    try:
-        for root, dirs, files in os.walk(path):
-            for file in files:
-                if file.endswith('.csv'):
-                    full_path = os.path.join(root, file)
-                    
-                    # Read first few lines to check for villain data
-                    with open(full_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read(5000)  # Read first 5KB
-                        
-                        # Look for villain indicators
-                        villain_indicators = ['villain', 'evil', 'bad', 'alignment', 'hero']
-                        has_villains = any(indicator.lower() in content.lower() for indicator in villain_indicators)
-                        
-                        if has_villains:
-                            size = os.path.getsize(full_path) / (1024 * 1024)
-                            villain_data.append({
-                                'dataset': dataset.get('dataset'),
-                                'file': file,
-                                'path': full_path,
-                                'size_mb': round(size, 2)
-                            })
-                            print(f"   ✅ {file} ({size:.2f} MB) - Contains villain data!")
-    except Exception as e:
-        print(f"   ❌ Error: {str(e)[:50]}")
+    for csv_file in catalog.find_files(extension='csv', dataset_ref=dataset):
+        labelled = villain_files.get(csv_file['path'])
+        if not labelled:
+            continue
+        
+        file = os.path.basename(csv_file['path'])
+        size = csv_file['size_bytes'] / (1024 * 1024)
+        villain_data.append({
+            'dataset': dataset,
+            'file': file,
+            'path': csv_file['path'],
+            'size_mb': round(size, 2),
+            'confidence': labelled['confidence']
+        })
+        catalog.add_tags(dataset, ['villain-datasets'], [csv_file['name']])
+        columns = ', '.join(dict.fromkeys(column for column, _ in labelled['evidence']))
+        print(f"   ✅ {file} ({size:.2f} MB) - Contains villain data! "
+              f"(confidence {labelled['confidence']:.2f}, columns: {columns})")
 
 print(f"\n\n🏁 FOUND {len(villain_data)} FILES WITH VILLAIN DATA!\n")
 
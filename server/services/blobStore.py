@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Blob Store
+Deduplicates downloaded dataset files: every file is hashed (SHA-256) once,
+the first copy of each content becomes the blob, and later copies are
+replaced with hardlinks to it (or reflinks, on filesystems that support
+them), reclaiming their bytes
+
+Blobs live under the store as <aa>/<sha256>. An index of (device, inode) ->
+digest means files that are already links to a blob are skipped without
+being read again. Hardlinked copies share one inode, so they must be
+treated as read-only; reflinked copies are copy-on-write and independent.
+Files on a different filesystem from the store are left alone.
+
+Usage:
+    python blobStore.py dedupe DIR [DIR ...] [--store DIR] [--reflink]
+    python blobStore.py gc [--store DIR]       # drop blobs nothing links to
+"""
+
+import os
+import sys
+import json
+import errno
+import hashlib
+import argparse
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Union
+
+BLOB_STORE = Path(os.getenv("KAGGLE_BLOB_STORE", "data/blobs"))
+INDEX_FILE = "index.json"
+CHUNK_SIZE = 1024 * 1024
+FICLONE = 0x40049409  # Linux ioctl: share extents copy-on-write
+
+
+def file_digest(path: Union[str, Path]) -> str:
+    """SHA-256 of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def reflink(source: Path, target: Path):
+    """Create target as a copy-on-write clone of source (raises OSError if unsupported)"""
+    import fcntl
+    with open(source, "rb") as src, open(target, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+class BlobStore:
+    """Content-addressed store that replaces duplicate files with links"""
+
+    def __init__(self, root: Union[str, Path] = BLOB_STORE, mode: str = "hardlink"):
+        self.root = Path(root)
+        self.mode = mode
+        self.lock = threading.Lock()
+        self.index: Dict[str, str] = {}
+        self.dirty = False
+        self.stats = {
+            "files": 0,
+            "already_linked": 0,
+            "hashed_bytes": 0,
+            "new_blobs": 0,
+            "duplicates": 0,
+            "bytes_reclaimed": 0,
+            "skipped": 0,
+        }
+        self.root.mkdir(parents=True, exist_ok=True)
+        index_path = self.root / INDEX_FILE
+        if index_path.exists():
+            with open(index_path, "r") as f:
+                self.index = json.load(f)
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    def count(self, name: str, amount: int = 1):
+        with self.lock:
+            self.stats[name] += amount
+
+    def remember(self, stat: os.stat_result, digest: str):
+        with self.lock:
+            self.index[f"{stat.st_dev}:{stat.st_ino}"] = digest
+            self.dirty = True
+
+    def ingest(self, path: Union[str, Path]):
+        """Store one file, replacing it with a link if its content is already stored"""
+        path = Path(path)
+        stat = path.lstat()
+        self.count("files")
+        if f"{stat.st_dev}:{stat.st_ino}" in self.index:
+            self.count("already_linked")
+            return
+
+        digest = file_digest(path)
+        self.count("hashed_bytes", stat.st_size)
+        blob = self.blob_path(digest)
+        blob.parent.mkdir(exist_ok=True)
+        try:
+            # The first copy of any content becomes the blob itself
+            os.link(path, blob)
+            self.count("new_blobs")
+            self.remember(stat, digest)
+            return
+        except FileExistsError:
+            pass
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            self.count("skipped")
+            return
+
+        # Duplicate: swap the file for a link to the blob via a temp name
+        tmp_path = path.with_name(f".{path.name}.blob")
+        try:
+            if self.mode == "reflink":
+                reflink(blob, tmp_path)
+            else:
+                os.link(blob, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            self.count("skipped")
+            return
+        self.remember(path.lstat(), digest)
+        self.count("duplicates")
+        # Other hardlinks to the old inode keep its bytes alive
+        if stat.st_nlink == 1:
+            self.count("bytes_reclaimed", stat.st_size)
+
+    def ingest_tree(self, root: Union[str, Path]):
+        """Ingest every regular file under root (symlinks are not followed)"""
+        store = self.root.resolve()
+        for directory, subdirectories, files in os.walk(root):
+            # Never ingest the store's own blobs and index
+            subdirectories[:] = [name for name in subdirectories
+                                 if (Path(directory) / name).resolve() != store]
+            for name in files:
+                path = Path(directory) / name
+                if path.is_symlink() or not path.is_file():
+                    continue
+                try:
+                    self.ingest(path)
+                except OSError as e:
+                    print(f"  ⚠️  Could not dedupe {path}: {e}", file=sys.stderr)
+                    self.count("skipped")
+
+    def gc(self) -> int:
+        """Remove blobs that no file links to any more; returns bytes freed"""
+        freed = 0
+        with self.lock:
+            live = set(self.index.values())
+            for blob in self.root.glob("??/*"):
+                stat = blob.stat()
+                if stat.st_nlink == 1:
+                    freed += stat.st_size
+                    blob.unlink()
+                    live.discard(blob.name)
+            self.index = {key: digest for key, digest in self.index.items() if digest in live}
+            self.dirty = True
+        self.save()
+        return freed
+
+    def save(self):
+        """Write the inode index atomically if it changed"""
+        with self.lock:
+            if not self.dirty:
+                return
+            index_path = self.root / INDEX_FILE
+            tmp_path = index_path.with_name(INDEX_FILE + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(self.index, f, separators=(",", ":"))
+            os.replace(tmp_path, index_path)
+            self.dirty = False
+
+    def report(self) -> Dict:
+        with self.lock:
+            return dict(self.stats, mode=self.mode, store=str(self.root))
+
+
+def dedupe(paths: Iterable[Union[str, Path]], store: Union[str, Path] = BLOB_STORE, mode: str = "hardlink") -> Dict:
+    """Deduplicate every file under paths into the store and return the report"""
+    blobs = BlobStore(store, mode)
+    try:
+        for path in paths:
+            blobs.ingest_tree(path)
+    finally:
+        blobs.save()
+    return blobs.report()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Content-addressed dataset blob store")
+    parser.add_argument("--store", default=str(BLOB_STORE), help=f"blob store directory (default: {BLOB_STORE})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    dedupe_parser = subparsers.add_parser("dedupe", help="hash files and link duplicates to blobs")
+    dedupe_parser.add_argument("paths", nargs="+")
+    dedupe_parser.add_argument("--reflink", action="store_true", help="clone duplicates copy-on-write instead of hardlinking")
+    subparsers.add_parser("gc", help="remove blobs no file links to")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    if args.command == "dedupe":
+        report = dedupe(args.paths, args.store, "reflink" if args.reflink else "hardlink")
+        print(f"Reclaimed {report['bytes_reclaimed'] / 1024 / 1024:.1f} MB from "
+              f"{report['duplicates']} duplicate files ({report['files']} scanned)", file=sys.stderr)
+        print(json.dumps(report, indent=2))
+    else:
+        freed = BlobStore(args.store).gc()
+        print(json.dumps({"bytes_freed": freed}))
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+CSV Column Index
+Persistent inverted index from tokens to the CSV columns they appear in,
+built from each column's header and a reservoir sample of its values, so
+"which files have creator / villain / issue columns" is an indexed lookup
+with column-level precision instead of a substring match over the first
+few KB of every file on every run
+
+Headers are split on punctuation and camelCase and lower-cased; plural
+tokens are reduced to their singular. Values are sampled per column with
+reservoir sampling over the first SCAN_ROWS rows, and each column keeps its
+most frequent value tokens plus simple statistics (nulls, numeric share,
+distinct values) for the content classifier. The index lives in the dataset
+catalog database and covers the CSVs the catalog knows about; an update
+only re-reads files whose size or mtime changed and drops files that are
+gone.
+
+Usage:
+    python columnIndex.py update [--workers N]        # index new and changed CSVs
+    python columnIndex.py search TERM [...] [--values] [--prefix]
+"""
+
+import os
+import re
+import csv
+import json
+import random
+import argparse
+import multiprocessing
+from datetime import datetime
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from datasetCatalog import DatasetCatalog
+
+SAMPLE_SIZE = 64  # Values kept per column
+SCAN_ROWS = 50000  # Rows read per file; the reservoir is drawn from these
+VALUE_TOKENS = 100  # Most frequent value tokens indexed per column
+MAX_VALUE_LENGTH = 200  # Longer values are truncated in the stored sample
+DELIMITERS = ",;\t|"
+HEADER, VALUE = "header", "value"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS indexed_files (
+    path TEXT PRIMARY KEY,
+    ref TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    rows_scanned INTEGER NOT NULL,
+    error TEXT,
+    indexed_at TEXT
+);
+CREATE TABLE IF NOT EXISTS csv_columns (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    sampled INTEGER NOT NULL,   -- Values in the reservoir
+    nulls INTEGER NOT NULL,
+    numeric INTEGER NOT NULL,
+    distinct_values INTEGER NOT NULL,
+    sample TEXT NOT NULL,       -- JSON list of the sampled values
+    UNIQUE (path, position)
+);
+CREATE TABLE IF NOT EXISTS column_postings (
+    token TEXT NOT NULL,
+    field TEXT NOT NULL,        -- 'header' or 'value'
+    column_id INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (token, field, column_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS column_postings_column ON column_postings (column_id);
+"""
+
+# Plural acronyms (IDs), acronyms, capitalized or lower-case words, numbers
+WORD = re.compile(r"[A-Z]{2,}s(?![a-z])|[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+NULL_VALUES = {"", "na", "n/a", "nan", "null", "none", "-"}
+SINGULAR_AS_IS = {"series", "species", "news", "alias", "gas"}
+
+
+def normalize(token: str) -> str:
+    """Lower-case a token and reduce a plural to its singular"""
+    token = token.lower()
+    if token in SINGULAR_AS_IS:
+        return token
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Words of a header or value, split on punctuation and camelCase, normalized"""
+    return [normalize(word) for word in WORD.findall(text) if not word.isdigit()]
+
+
+def is_number(value: str) -> bool:
+    try:
+        float(value.replace(",", ""))
+        return True
+    except ValueError:
+        return False
+
+
+def profile_csv(path: str, sample_size: int = SAMPLE_SIZE, scan_rows: int = SCAN_ROWS) -> Dict:
+    """Header and per-column value sample and statistics of one CSV file.
+
+    Returns {"rows_scanned", "columns": [{"position", "name", "sampled",
+    "nulls", "numeric", "distinct_values", "sample", "tokens"}]}, where
+    tokens counts the value tokens of the sample. Raises OSError or
+    csv.Error for unreadable files.
+    """
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        head = f.read(64 * 1024)
+        f.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(head.split("\n", 1)[0], delimiters=DELIMITERS)
+        except csv.Error:
+            dialect = csv.excel
+        reader = csv.reader(f, dialect)
+        header = next(reader, [])
+        # Seeded per file, so re-indexing an unchanged file gives the same sample
+        rng = random.Random(path)
+        reservoirs: List[List[str]] = [[] for _ in header]
+        rows = 0
+        for row in reader:
+            if rows >= scan_rows:
+                break
+            rows += 1
+            for position, reservoir in enumerate(reservoirs):
+                value = row[position].strip() if position < len(row) else ""
+                if len(reservoir) < sample_size:
+                    reservoir.append(value)
+                else:
+                    slot = rng.randrange(rows)
+                    if slot < sample_size:
+                        reservoir[slot] = value
+
+    columns = []
+    for position, (name, sample) in enumerate(zip(header, reservoirs)):
+        present = [value for value in sample if value.lower() not in NULL_VALUES]
+        numeric = sum(1 for value in present if is_number(value))
+        tokens = Counter(token for value in present if not is_number(value) for token in tokenize(value))
+        columns.append({
+            "position": position,
+            "name": name.strip(),
+            "sampled": len(sample),
+            "nulls": len(sample) - len(present),
+            "numeric": numeric,
+            "distinct_values": len(set(present)),
+            "sample": [value[:MAX_VALUE_LENGTH] for value in sample],
+            "tokens": dict(tokens.most_common(VALUE_TOKENS)),
+        })
+    return {"rows_scanned": rows, "columns": columns}
+
+
+def ref_list(dataset_refs: Union[str, Iterable[str], None]) -> Optional[List[str]]:
+    """One ref or several as a de-duplicated list; None (every dataset) stays None"""
+    if dataset_refs is None:
+        return None
+    return [dataset_refs] if isinstance(dataset_refs, str) else list(dict.fromkeys(dataset_refs))
+
+
+def run_profile(task: Tuple[Callable[[str], Dict], str]) -> Tuple[Dict, Optional[str]]:
+    """Profile one file, returning (profile, error) instead of raising (runs in pool workers)"""
+    profile, path = task
+    try:
+        return profile(path), None
+    except (OSError, csv.Error) as e:
+        return {"rows_scanned": 0, "columns": []}, str(e)[:200]
+
+
+class ColumnIndex:
+    """Inverted index of CSV headers and sampled values, kept in the dataset catalog"""
+
+    def __init__(self, catalog: DatasetCatalog):
+        self.catalog = catalog
+        with catalog.lock:
+            catalog.db.executescript(SCHEMA)
+
+    def update(self, dataset_refs: Union[str, Iterable[str], None] = None, workers: int = 1,
+               profile: Callable[[str], Dict] = profile_csv,
+               on_indexed: Optional[Callable[[Dict, Dict], None]] = None) -> Dict:
+        """Index catalogued CSVs that are new or changed; drop files no longer catalogued.
+
+        The catalog's file lists are rescanned first. With dataset_refs (one
+        ref or several) only those datasets' files are considered, all in one
+        pass. With workers > 1 files are
+        profiled in a process pool (profile must then be a module-level
+        function); on_indexed(csv_file, profile) runs here after each store.
+        """
+        report = {"files": 0, "indexed": 0, "unchanged": 0, "removed": 0, "errors": 0}
+        # Bring the catalog's file lists up to date first (a stat per file)
+        refs = ref_list(dataset_refs)
+        for ref in (refs if refs is not None else [record["ref"] for record in self.catalog.datasets()]):
+            self.catalog.refresh(ref)
+        known = {
+            row["path"]: row for row in self.catalog.query(
+                "SELECT path, ref, size_bytes, mtime_ns FROM indexed_files" +
+                (f" WHERE ref IN ({', '.join('?' * len(refs))})" if refs is not None else ""), refs or ())
+        }
+        csv_files = self.catalog.find_files(extension="csv") if refs is None else [
+            csv_file for ref in refs for csv_file in self.catalog.find_files(extension="csv", dataset_ref=ref)
+        ]
+        current = set()
+        stale = []
+        for csv_file in csv_files:
+            try:
+                stat = os.stat(csv_file["path"])
+            except OSError:
+                continue
+            current.add(csv_file["path"])
+            report["files"] += 1
+            previous = known.get(csv_file["path"])
+            if previous and previous["size_bytes"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns:
+                report["unchanged"] += 1
+                continue
+            stale.append((csv_file, stat))
+
+        tasks = [(profile, csv_file["path"]) for csv_file, _ in stale]
+        # Forked workers inherit the loaded modules; spawned ones would re-run a calling script's top level
+        context = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else None)
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=context) \
+            if workers > 1 and len(tasks) > 1 else None
+        try:
+            results = pool.map(run_profile, tasks, chunksize=max(1, len(tasks) // (workers * 4))) \
+                if pool else map(run_profile, tasks)
+            # Results arrive in order, and are stored while the pool works on the rest
+            for (csv_file, stat), (result, error) in zip(stale, results):
+                if error:
+                    report["errors"] += 1
+                self.store(csv_file["dataset"], csv_file["path"], stat, result, error)
+                report["indexed"] += 1
+                if on_indexed and not error:
+                    on_indexed(csv_file, result)
+        finally:
+            if pool:
+                pool.shutdown(cancel_futures=True)
+        for path in set(known) - current:
+            self.remove(path)
+            report["removed"] += 1
+        return report
+
+    def store(self, dataset_ref: str, path: str, stat: os.stat_result, profile: Dict, error: Optional[str] = None):
+        """Replace a file's columns and postings with a fresh profile"""
+        with self.catalog.transaction() as db:
+            self.delete(db, path)
+            db.execute("INSERT INTO indexed_files (path, ref, size_bytes, mtime_ns, rows_scanned, error, indexed_at) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       (path, dataset_ref, stat.st_size, stat.st_mtime_ns, profile["rows_scanned"], error,
+                        datetime.now().isoformat()))
+            for column in profile["columns"]:
+                column_id = db.execute(
+                    "INSERT INTO csv_columns (path, position, name, sampled, nulls, numeric, distinct_values, sample) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (path, column["position"], column["name"], column["sampled"], column["nulls"],
+                     column["numeric"], column["distinct_values"], json.dumps(column["sample"]))
+                ).lastrowid
+                postings = [(token, HEADER, column_id, count)
+                            for token, count in Counter(tokenize(column["name"])).items()]
+                postings += [(token, VALUE, column_id, count) for token, count in column["tokens"].items()]
+                db.executemany("INSERT INTO column_postings (token, field, column_id, count) VALUES (?, ?, ?, ?)",
+                               postings)
+
+    def delete(self, db, path: str):
+        db.execute("DELETE FROM column_postings WHERE column_id IN (SELECT id FROM csv_columns WHERE path = ?)",
+                   (path,))
+        db.execute("DELETE FROM csv_columns WHERE path = ?", (path,))
+        db.execute("DELETE FROM indexed_files WHERE path = ?", (path,))
+
+    def remove(self, path: str):
+        with self.catalog.transaction() as db:
+            self.delete(db, path)
+
+    def search(self, terms: Iterable[str], field: str = HEADER, prefix: bool = False,
+               dataset_ref: Optional[str] = None) -> List[Dict]:
+        """Columns matching any term, best first.
+
+        A term matches a column when every token of the term appears in the
+        column's header (field="header") or sampled values (field="value");
+        with prefix, a token also matches longer tokens it starts
+        (e.g. "issue" matches the header "issuenumber").
+        """
+        hits: Dict[int, Dict] = {}
+        for term in terms:
+            tokens = tokenize(term)
+            if not tokens:
+                continue
+            conditions, params = [], []
+            for token in tokens:
+                if prefix:
+                    conditions.append("(p.token >= ? AND p.token < ?)")
+                    params += [token, token + "\uffff"]
+                else:
+                    conditions.append("p.token = ?")
+                    params.append(token)
+            params.append(field)
+            where_dataset = ""
+            if dataset_ref:
+                where_dataset = " AND f.ref = ?"
+            rows = self.catalog.query(
+                "SELECT c.id, c.path, c.position, c.name, f.ref, "
+                "COUNT(DISTINCT p.token) AS matched, SUM(p.count) AS count "
+                "FROM column_postings p JOIN csv_columns c ON c.id = p.column_id "
+                "JOIN indexed_files f ON f.path = c.path "
+                f"WHERE ({' OR '.join(conditions)}) AND p.field = ?{where_dataset} "
+                "GROUP BY c.id",
+                params + ([dataset_ref] if dataset_ref else [])
+            )
+            for row in rows:
+                # With prefixes one query token can match several index tokens; require one per query token
+                if not prefix and row["matched"] < len(tokens):
+                    continue
+                if prefix and not self.covers(row["id"], tokens, field):
+                    continue
+                hit = hits.setdefault(row["id"], {
+                    "dataset": row["ref"], "path": row["path"], "position": row["position"],
+                    "column": row["name"], "field": field, "terms": [], "count": 0,
+                })
+                hit["terms"].append(term)
+                hit["count"] += row["count"]
+        return sorted(hits.values(), key=lambda hit: (-len(hit["terms"]), -hit["count"], hit["path"], hit["position"]))
+
+    def covers(self, column_id: int, tokens: List[str], field: str) -> bool:
+        """Whether every query token prefixes some token of a column"""
+        column_tokens = [row["token"] for row in self.catalog.query(
+            "SELECT token FROM column_postings WHERE column_id = ? AND field = ?", (column_id, field))]
+        return all(any(candidate.startswith(token) for candidate in column_tokens) for token in tokens)
+
+    def files_with(self, terms: Iterable[str], field: str = HEADER, prefix: bool = False,
+                   dataset_ref: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """Matching columns grouped by file path"""
+        files: Dict[str, List[Dict]] = {}
+        for hit in self.search(terms, field, prefix, dataset_ref):
+            files.setdefault(hit["path"], []).append(hit)
+        return files
+
+    def columns(self, path: str) -> List[Dict]:
+        """Every indexed column of a file with its statistics and sample"""
+        rows = self.catalog.query("SELECT * FROM csv_columns WHERE path = ? ORDER BY position", (path,))
+        for row in rows:
+            row["sample"] = json.loads(row["sample"])
+        return rows
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Inverted index of CSV headers and sampled values")
+    parser.add_argument("--db", help="catalog database (default: the dataset catalog)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    update_parser = subparsers.add_parser("update", help="index new and changed CSVs")
+    update_parser.add_argument("--dataset", action="append", help="only this dataset (repeatable)")
+    update_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="profiling processes")
+    search_parser = subparsers.add_parser("search", help="columns matching any term")
+    search_parser.add_argument("terms", nargs="+")
+    search_parser.add_argument("--values", action="store_true", help="match sampled values instead of headers")
+    search_parser.add_argument("--prefix", action="store_true", help="match tokens by prefix")
+    search_parser.add_argument("--dataset")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    with (DatasetCatalog(args.db) if args.db else DatasetCatalog()) as catalog:
+        index = ColumnIndex(catalog)
+        if args.command == "update":
+            result = index.update(args.dataset, args.workers)
+        else:
+            result = index.search(args.terms, VALUE if args.values else HEADER, args.prefix, args.dataset)
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Content Classifier
+Labels dataset CSV files as villain, creator or comic data with a
+confidence, scoring parsed headers and per-column value statistics rather
+than matching keywords anywhere in a raw prefix of the file (where "bad" in
+any description made a file villain data)
+
+Each column contributes weighted evidence: a villain/alignment header whose
+low-cardinality values read good/bad/neutral, creator role headers (writer,
+penciller, ...) over text values, issue/series/publisher headers and
+numeric issue numbers. Evidence is combined per label as a noisy-OR, so
+several independent signals raise the confidence and one weak hit stays
+low. Files are parsed and scored in a process pool (one worker per core by
+default) while the parent stores each result: profiles go to the column
+index and labels to the dataset catalog, both incrementally, so only new or
+changed files are read again. Files indexed earlier are scored from their
+stored column statistics without being read.
+
+Usage:
+    python contentClassifier.py classify [--dataset OWNER/DATASET ...] [--workers N]
+    python contentClassifier.py files LABEL [--min-confidence 0.5]
+    python contentClassifier.py explain PATH
+"""
+
+import os
+import json
+import argparse
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Union
+
+from columnIndex import ColumnIndex, is_number, profile_csv, ref_list, tokenize
+from datasetCatalog import DatasetCatalog
+
+CLASSIFIER_VERSION = 1  # Bump when scoring changes, so stored labels are recomputed
+MIN_CONFIDENCE = 0.5
+VILLAIN, CREATOR, COMIC = "villain", "creator", "comic"
+LABELS = (VILLAIN, CREATOR, COMIC)
+
+VILLAIN_HEADERS = {"villain", "align", "alignment", "nemesis", "archenemy", "antagonist", "henchman"}
+VILLAIN_VALUES = {"villain", "evil", "bad", "antagonist", "criminal"}
+ALIGNMENT_VALUES = {"good", "bad", "evil", "neutral", "hero", "villain", "reformed"}
+CHARACTER_HEADERS = {"name", "character", "hero", "superhero", "alias", "identity"}
+CREATOR_ROLES = {"writer", "artist", "penciller", "penciler", "pencil", "inker", "ink", "colorist", "letterer",
+                 "creator", "author", "editor", "illustrator", "script"}
+CREATOR_GROUPS = {"staff", "contributor", "credit", "crew"}
+COMIC_PREFIXES = ("comic", "issue", "series", "volume", "publisher", "imprint")
+COMIC_HEADERS = {"printing", "variant", "cover", "arc"}
+COMIC_VALUES = {"comic", "vol", "volume", "issue", "annual", "omnibus"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS file_labels (
+    path TEXT NOT NULL,
+    ref TEXT NOT NULL,
+    label TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    evidence TEXT NOT NULL,         -- JSON [[column, weight], ...]
+    classifier_version INTEGER NOT NULL,
+    indexed_at TEXT NOT NULL,       -- indexed_files.indexed_at of the profile that was scored
+    PRIMARY KEY (path, label)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS file_labels_label ON file_labels (label, confidence);
+"""
+
+
+def column_features(column: Dict) -> Dict:
+    """Header tokens, value tokens and value statistics of one profiled column"""
+    present = max(column["sampled"] - column["nulls"], 0)
+    tokens = column.get("tokens")
+    if tokens is None:
+        # Columns read back from the index carry the sample instead of its tokens
+        tokens = Counter(token for value in column["sample"]
+                         if value.strip() and not is_number(value) for token in tokenize(value))
+    return {
+        "header": set(tokenize(column["name"])),
+        "values": set(tokens),
+        "numeric": column["numeric"] / present if present else 0.0,
+        # Few distinct values relative to the sample: a category such as an alignment
+        "categorical": 0 < column["distinct_values"] <= max(8, present // 4),
+    }
+
+
+def has_prefix(tokens: Set[str], prefixes: Iterable[str]) -> bool:
+    return any(token.startswith(prefix) for token in tokens for prefix in prefixes)
+
+
+def column_evidence(features: Dict) -> Dict[str, float]:
+    """Evidence weights one column contributes to each label"""
+    header, values = features["header"], features["values"]
+    text = features["numeric"] < 0.5
+    evidence = {}
+
+    if header & VILLAIN_HEADERS or has_prefix(header, ("villain", "align")):
+        evidence[VILLAIN] = 0.9 if features["categorical"] and values & ALIGNMENT_VALUES else 0.6
+    elif values & VILLAIN_VALUES:
+        # Villain words as a category (a role column) count; in free text they barely do
+        evidence[VILLAIN] = 0.55 if features["categorical"] else 0.1
+
+    if header & CREATOR_ROLES or has_prefix(header, ("writer", "penciller", "colorist", "letterer")):
+        evidence[CREATOR] = 0.6 if text else 0.35
+    elif header & CREATOR_GROUPS:
+        evidence[CREATOR] = 0.35 if text else 0.2
+
+    if has_prefix(header, ("comic",)):
+        evidence[COMIC] = 0.5
+    elif has_prefix(header, ("issue",)):
+        evidence[COMIC] = 0.5 if features["numeric"] >= 0.8 else 0.35
+    elif has_prefix(header, COMIC_PREFIXES) or header & COMIC_HEADERS:
+        evidence[COMIC] = 0.3
+    elif "title" in header:
+        evidence[COMIC] = 0.15
+    elif text and values & COMIC_VALUES:
+        evidence[COMIC] = 0.2
+    return evidence
+
+
+def score_columns(columns: List[Dict]) -> Dict[str, Dict]:
+    """{label: {"confidence", "evidence": [[column, weight], ...]}} for a file's columns"""
+    scores = {label: {"confidence": 0.0, "evidence": []} for label in LABELS}
+    has_characters = False
+    for column in columns:
+        features = column_features(column)
+        has_characters = has_characters or bool(features["header"] & CHARACTER_HEADERS)
+        for label, weight in column_evidence(features).items():
+            scores[label]["evidence"].append([column["name"], weight])
+
+    for label, score in scores.items():
+        # Noisy-OR: independent pieces of evidence each close part of the remaining gap
+        missing = 1.0
+        for _, weight in score["evidence"]:
+            missing *= 1.0 - weight
+        confidence = 1.0 - missing
+        if label == VILLAIN and not has_characters:
+            # Alignment without any named character is weaker evidence
+            confidence *= 0.75
+        score["confidence"] = round(confidence, 3)
+    return scores
+
+
+def analyze_csv(path: str) -> Dict:
+    """Profile and score one CSV (runs in pool workers); the profile gains "labels" """
+    profile = profile_csv(path)
+    profile["labels"] = score_columns(profile["columns"])
+    return profile
+
+
+class ContentClassifier:
+    """Scores indexed CSV files and keeps their labels in the dataset catalog"""
+
+    def __init__(self, catalog: DatasetCatalog):
+        self.catalog = catalog
+        self.index = ColumnIndex(catalog)
+        with catalog.lock:
+            catalog.db.executescript(SCHEMA)
+
+    def classify(self, dataset_refs: Union[str, Iterable[str], None] = None,
+                 workers: Optional[int] = None) -> Dict:
+        """Index and label new or changed CSVs, then label any indexed file still unlabelled.
+
+        dataset_refs is one ref, several, or None for every catalogued
+        dataset; pass them all in one call so their files share one pool.
+        Returns the index update report plus "rescored" (files scored from
+        stored statistics) and "labelled" (files per label at MIN_CONFIDENCE).
+        """
+        refs = ref_list(dataset_refs)
+        workers = workers or os.cpu_count() or 1
+        report = self.index.update(refs, workers, analyze_csv,
+                                   lambda csv_file, profile: self.store(csv_file["path"], csv_file["dataset"],
+                                                                        profile["labels"]))
+        report["rescored"] = self.rescore(refs)
+        labelled = self.catalog.query(
+            "SELECT label, COUNT(*) AS files FROM file_labels WHERE confidence >= ?" +
+            (f" AND ref IN ({', '.join('?' * len(refs))})" if refs is not None else "") + " GROUP BY label",
+            [MIN_CONFIDENCE] + (refs or [])
+        )
+        report["labelled"] = dict.fromkeys(LABELS, 0)
+        report["labelled"].update((row["label"], row["files"]) for row in labelled)
+        return report
+
+    def store(self, path: str, dataset_ref: str, labels: Dict[str, Dict]):
+        """Replace a file's labels, stamped with the index entry they were scored from"""
+        with self.catalog.transaction() as db:
+            db.execute("DELETE FROM file_labels WHERE path = ?", (path,))
+            db.executemany(
+                "INSERT INTO file_labels (path, ref, label, confidence, evidence, classifier_version, indexed_at) "
+                "SELECT ?, ?, ?, ?, ?, ?, indexed_at FROM indexed_files WHERE path = ?",
+                [(path, dataset_ref, label, score["confidence"], json.dumps(score["evidence"]), CLASSIFIER_VERSION,
+                  path) for label, score in labels.items()]
+            )
+
+    def rescore(self, dataset_refs: Union[str, Iterable[str], None] = None) -> int:
+        """Label indexed files whose labels are missing or stale, from their stored columns"""
+        refs = ref_list(dataset_refs)
+        with self.catalog.transaction() as db:
+            db.execute("DELETE FROM file_labels WHERE path NOT IN (SELECT path FROM indexed_files)")
+        pending = self.catalog.query(
+            "SELECT f.path, f.ref FROM indexed_files f WHERE f.error IS NULL" +
+            (f" AND f.ref IN ({', '.join('?' * len(refs))})" if refs is not None else "") +
+            " AND NOT EXISTS (SELECT 1 FROM file_labels l WHERE l.path = f.path "
+            "AND l.classifier_version = ? AND l.indexed_at = f.indexed_at)",
+            (refs or []) + [CLASSIFIER_VERSION]
+        )
+        for row in pending:
+            self.store(row["path"], row["ref"], score_columns(self.index.columns(row["path"])))
+        return len(pending)
+
+    def labelled_files(self, label: str, min_confidence: float = MIN_CONFIDENCE,
+                       dataset_ref: Optional[str] = None) -> List[Dict]:
+        """Catalogued files carrying a label at min_confidence or above, most confident first"""
+        return [
+            dict(row, evidence=json.loads(row["evidence"])) for row in self.catalog.query(
+                "SELECT l.ref AS dataset, f.name, l.path, f.size_bytes, l.confidence, l.evidence "
+                "FROM file_labels l JOIN files f ON f.path = l.path "
+                "JOIN datasets d ON d.ref = f.ref AND d.version = f.version "
+                "WHERE l.label = ? AND l.confidence >= ?" + (" AND l.ref = ?" if dataset_ref else "") +
+                " ORDER BY l.confidence DESC, l.path",
+                [label, min_confidence] + ([dataset_ref] if dataset_ref else [])
+            )
+        ]
+
+    def labels(self, path: str) -> Dict[str, Dict]:
+        """Every label of one file with its confidence and evidence"""
+        return {
+            row["label"]: {"confidence": row["confidence"], "evidence": json.loads(row["evidence"])}
+            for row in self.catalog.query("SELECT label, confidence, evidence FROM file_labels WHERE path = ?",
+                                          (path,))
+        }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Label dataset CSV files as villain, creator or comic data")
+    parser.add_argument("--db", help="catalog database (default: the dataset catalog)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    classify_parser = subparsers.add_parser("classify", help="index and label new or changed CSVs")
+    classify_parser.add_argument("--dataset", action="append", help="only this dataset (repeatable)")
+    classify_parser.add_argument("--workers", type=int, help="worker processes (default: one per core)")
+    files_parser = subparsers.add_parser("files", help="files carrying a label")
+    files_parser.add_argument("label", choices=LABELS)
+    files_parser.add_argument("--min-confidence", type=float, default=MIN_CONFIDENCE)
+    files_parser.add_argument("--dataset")
+    explain_parser = subparsers.add_parser("explain", help="labels and evidence of one file")
+    explain_parser.add_argument("path")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    with (DatasetCatalog(args.db) if args.db else DatasetCatalog()) as catalog:
+        classifier = ContentClassifier(catalog)
+        if args.command == "classify":
+            result = classifier.classify(args.dataset, args.workers)
+        elif args.command == "files":
+            result = classifier.labelled_files(args.label, args.min_confidence, args.dataset)
+        else:
+            result = classifier.labels(os.path.abspath(args.path))
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,612 @@
+#!/usr/bin/env python3
+"""
+Dataset Catalog
+One SQLite catalog of every dataset the download and search scripts have
+seen: datasets, their versions and paths, files with sizes and CSV headers,
+categories and tags, so questions like "all CSVs in category X over 1 MB"
+are indexed queries instead of walks over the cache and a pile of JSON files
+
+Each script tags what it records with the name of the JSON file it used to
+write (e.g. all-comic-eras), and export_legacy() rebuilds those JSON shapes
+from the catalog, so existing readers keep working. import_legacy() loads
+the JSON files that already exist; it is cheap to call on every run, since
+files unchanged since their last import are skipped. Paths recorded on another machine (such
+as /home/runner/.cache/kagglehub/...) are resolved against the local
+kagglehub cache. File rescans are incremental: unchanged files (same size
+and mtime) keep their stored header and record count.
+
+The database runs in WAL mode, so readers never block the writer.
+
+Usage:
+    python datasetCatalog.py import [DATA_DIR]                 # load the legacy JSON manifests
+    python datasetCatalog.py files [--ext csv] [--category C] [--tag T] [--min-size 1M]
+    python datasetCatalog.py export NAME [OUT]                 # legacy JSON shape (see LEGACY_FILES)
+    python datasetCatalog.py stats
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+from datetime import datetime
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Union
+
+from datasetVersions import KAGGLE_CACHE, cached_versions, latest_complete_version, version_from_path
+from diskBudget import parse_size
+
+CATALOG_DB = Path(os.getenv("DATASET_CATALOG", "data/dataset-catalog.db"))
+DATA_DIR = Path("data")
+HEADER_BYTES = 64 * 1024  # Longest CSV header line stored
+MB = 1024 * 1024
+
+DOWNLOADED, FAILED, KNOWN = "downloaded", "failed", "known"
+
+# Legacy JSON files, by the tag their entries carry in the catalog
+LEGACY_FILES = {
+    "kaggle-manifest": "kaggle-manifest.json",
+    "kaggle-downloads": "kaggle-downloads.json",
+    "all-comic-eras": "all-comic-eras.json",
+    "comic-datasets": "comic-datasets.json",
+    "villain-datasets": "villain-datasets.json",
+    "creator-datasets": "creator-datasets.json",
+    "manga-foreign-comics": "manga-foreign-comics.json",
+    "kaggle-cover-datasets": "kaggle-cover-datasets.json",
+    "anime-manga-found": "anime-manga-found.json",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    ref TEXT PRIMARY KEY,
+    title TEXT,
+    status TEXT NOT NULL DEFAULT 'known',
+    version INTEGER,            -- Version whose files are catalogued
+    path TEXT,
+    advertised_bytes INTEGER,   -- Kaggle metadata
+    votes INTEGER,
+    downloads INTEGER,
+    usability REAL,
+    license TEXT,
+    last_updated TEXT,
+    error TEXT,
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS versions (
+    ref TEXT NOT NULL,
+    version INTEGER NOT NULL,   -- 0 when the version is unknown
+    path TEXT NOT NULL,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    file_count INTEGER NOT NULL DEFAULT 0,
+    recorded_at TEXT,
+    PRIMARY KEY (ref, version)
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    ref TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    name TEXT NOT NULL,         -- Relative to the version directory
+    path TEXT NOT NULL,
+    extension TEXT NOT NULL,    -- Lower case, without the dot
+    size_bytes INTEGER NOT NULL,
+    mtime_ns INTEGER,
+    records INTEGER,
+    columns TEXT,               -- CSV header line
+    UNIQUE (ref, version, name)
+);
+CREATE TABLE IF NOT EXISTS categories (
+    ref TEXT NOT NULL,
+    category TEXT NOT NULL,
+    PRIMARY KEY (ref, category)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS tags (
+    ref TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    file TEXT NOT NULL DEFAULT '',  -- '' tags the whole dataset
+    PRIMARY KEY (ref, tag, file)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS legacy_imports (
+    source TEXT PRIMARY KEY,        -- absolute path of the legacy JSON file
+    size_bytes INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    imported_at TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS files_extension_size ON files (extension, size_bytes);
+CREATE INDEX IF NOT EXISTS files_path ON files (path);
+CREATE INDEX IF NOT EXISTS categories_category ON categories (category, ref);
+CREATE INDEX IF NOT EXISTS tags_tag ON tags (tag, ref);
+CREATE INDEX IF NOT EXISTS datasets_status ON datasets (status);
+"""
+
+METADATA_FIELDS = {
+    "title": "title", "size_bytes": "advertised_bytes", "votes": "votes", "downloads": "downloads",
+    "usability": "usability", "license": "license", "last_updated": "last_updated",
+}
+
+
+def file_extension(name: str) -> str:
+    return os.path.splitext(name)[1].lower().lstrip(".")
+
+
+def read_header(path: Union[str, Path]) -> Optional[str]:
+    """First line of a CSV file, or None if it cannot be read"""
+    try:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            return f.readline(HEADER_BYTES).strip() or None
+    except OSError:
+        return None
+
+
+def resolve_path(dataset_ref: str, path: Optional[str], cache_root: Path = KAGGLE_CACHE) -> Optional[str]:
+    """A recorded dataset path, or the same version in the local kagglehub cache if it moved"""
+    if not path or os.path.isdir(path) or len(dataset_ref.split("/")) != 2:
+        return path
+    version = version_from_path(path)
+    local = cached_versions(dataset_ref, cache_root).get(version) if version is not None else None
+    if local is None:
+        latest = latest_complete_version(dataset_ref, cache_root)
+        local = latest[1] if latest else None
+    return str(local) if local else path
+
+
+def size_mb(size_bytes: int) -> float:
+    return round(size_bytes / MB, 2)
+
+
+class DatasetCatalog:
+    """SQLite catalog of datasets, versions, files, categories and tags"""
+
+    def __init__(self, path: Union[str, Path] = CATALOG_DB, cache_root: Path = KAGGLE_CACHE):
+        self.path = Path(path)
+        self.cache_root = cache_root
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # One connection shared by the download threads, serialized by the lock
+        self.lock = threading.RLock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @contextmanager
+    def transaction(self):
+        """Run a block of statements as one transaction"""
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.db
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+
+    def query(self, sql: str, params: Iterable = ()) -> List[Dict]:
+        with self.lock:
+            return [dict(row) for row in self.db.execute(sql, tuple(params))]
+
+    # Recording
+
+    def ensure_dataset(self, db: sqlite3.Connection, dataset_ref: str):
+        db.execute("INSERT OR IGNORE INTO datasets (ref, updated_at) VALUES (?, ?)",
+                   (dataset_ref, datetime.now().isoformat()))
+
+    def upsert_metadata(self, record: Dict):
+        """Store Kaggle metadata (a kaggleClient dataset record) for a dataset"""
+        fields = {column: record.get(key) for key, column in METADATA_FIELDS.items() if record.get(key) is not None}
+        with self.transaction() as db:
+            self.ensure_dataset(db, record["ref"])
+            if fields:
+                assignments = ", ".join(f"{column} = ?" for column in fields)
+                db.execute(f"UPDATE datasets SET {assignments} WHERE ref = ?", (*fields.values(), record["ref"]))
+
+    def add_categories(self, dataset_ref: str, categories: Iterable[str]):
+        with self.transaction() as db:
+            self.ensure_dataset(db, dataset_ref)
+            db.executemany("INSERT OR IGNORE INTO categories (ref, category) VALUES (?, ?)",
+                           [(dataset_ref, category) for category in categories])
+
+    def add_tags(self, dataset_ref: str, tags: Iterable[str], files: Iterable[str] = ("",)):
+        """Tag a dataset, or with files, individual files (names relative to the dataset path)"""
+        with self.transaction() as db:
+            self.ensure_dataset(db, dataset_ref)
+            db.executemany("INSERT OR IGNORE INTO tags (ref, tag, file) VALUES (?, ?, ?)",
+                           [(dataset_ref, tag, name) for tag in tags for name in files])
+
+    def record_download(self, dataset_ref: str, path: str, version: Optional[int] = None,
+                        category: Optional[str] = None, tags: Iterable[str] = (),
+                        files: Optional[List[Dict]] = None, records: Optional[Dict[str, int]] = None) -> int:
+        """Record a downloaded dataset version and its files; returns the file count.
+
+        Files are scanned from path; pass files ([{"name", "size_bytes",
+        "columns"}]) instead when path is not on this machine. records maps
+        relative file names to known record counts. A dataset keeps one
+        catalogued copy: another path with an older or the same version
+        only adds its category and tags.
+        """
+        path = resolve_path(dataset_ref, str(path), self.cache_root)
+        if os.path.isdir(path):
+            path = os.path.abspath(path)
+        if version is None:
+            version = version_from_path(path) or 0
+        current = self.dataset(dataset_ref)
+        if current and current["status"] == DOWNLOADED and current["path"] != path and \
+                os.path.isdir(current["path"] or "") and (current["version"] or 0) >= version:
+            # Another local copy of this version (or a newer one) is already catalogued: keep it
+            if category:
+                self.add_categories(dataset_ref, [category])
+            self.add_tags(dataset_ref, tags)
+            return 0
+        scanned = self.scan_files(dataset_ref, version, path) if files is None else [
+            {"name": entry["name"], "path": os.path.join(path, entry["name"]),
+             "extension": file_extension(entry["name"]), "size_bytes": entry.get("size_bytes") or 0,
+             "mtime_ns": None, "records": None, "columns": entry.get("columns")}
+            for entry in files
+        ]
+        for entry in scanned:
+            if records and entry["name"] in records:
+                entry["records"] = records[entry["name"]]
+        now = datetime.now().isoformat()
+        with self.transaction() as db:
+            self.ensure_dataset(db, dataset_ref)
+            db.execute("UPDATE datasets SET status = ?, version = ?, path = ?, error = NULL, updated_at = ? "
+                       "WHERE ref = ?", (DOWNLOADED, version, path, now, dataset_ref))
+            if files is None:
+                # A scan is authoritative: files no longer on disk are dropped
+                db.execute("DELETE FROM files WHERE ref = ? AND version = ?", (dataset_ref, version))
+            # Several legacy files may describe the same version: merge what each knows
+            db.executemany(
+                "INSERT INTO files (ref, version, name, path, extension, size_bytes, mtime_ns, records, columns) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (ref, version, name) DO UPDATE SET "
+                "path = excluded.path, size_bytes = MAX(size_bytes, excluded.size_bytes), "
+                "mtime_ns = COALESCE(excluded.mtime_ns, mtime_ns), records = COALESCE(excluded.records, records), "
+                "columns = COALESCE(excluded.columns, columns)",
+                [(dataset_ref, version, entry["name"], entry["path"], entry["extension"], entry["size_bytes"],
+                  entry["mtime_ns"], entry["records"], entry["columns"]) for entry in scanned]
+            )
+            db.execute(
+                "INSERT OR REPLACE INTO versions (ref, version, path, size_bytes, file_count, recorded_at) "
+                "SELECT ?, ?, ?, COALESCE(SUM(size_bytes), 0), COUNT(*), ? FROM files WHERE ref = ? AND version = ?",
+                (dataset_ref, version, path, now, dataset_ref, version)
+            )
+            if category:
+                db.execute("INSERT OR IGNORE INTO categories (ref, category) VALUES (?, ?)", (dataset_ref, category))
+            db.executemany("INSERT OR IGNORE INTO tags (ref, tag, file) VALUES (?, ?, '')",
+                           [(dataset_ref, tag) for tag in tags])
+        return len(scanned)
+
+    def refresh(self, dataset_ref: str) -> bool:
+        """Rescan a downloaded dataset's files, following a path that moved; False if it is not on disk"""
+        record = self.dataset(dataset_ref)
+        if not record or record["status"] != DOWNLOADED:
+            return False
+        path = resolve_path(dataset_ref, record["path"], self.cache_root)
+        if not path or not os.path.isdir(path):
+            return False
+        self.record_download(dataset_ref, path, record["version"] if path == record["path"] else None)
+        return True
+
+    def scan_files(self, dataset_ref: str, version: int, path: str) -> List[Dict]:
+        """File entries under path, reusing stored headers and counts of unchanged files"""
+        known = {
+            row["name"]: row for row in self.query(
+                "SELECT name, size_bytes, mtime_ns, records, columns FROM files WHERE ref = ? AND version = ?",
+                (dataset_ref, version))
+        }
+        scanned = []
+        for directory, _, names in os.walk(path):
+            for name in names:
+                full_path = os.path.join(directory, name)
+                try:
+                    stat = os.stat(full_path)
+                except OSError:
+                    continue
+                relative = os.path.relpath(full_path, path)
+                extension = file_extension(name)
+                previous = known.get(relative)
+                unchanged = previous and previous["size_bytes"] == stat.st_size and \
+                    previous["mtime_ns"] == stat.st_mtime_ns
+                scanned.append({
+                    "name": relative,
+                    "path": full_path,
+                    "extension": extension,
+                    "size_bytes": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "records": previous["records"] if unchanged else None,
+                    "columns": previous["columns"] if unchanged else
+                               read_header(full_path) if extension == "csv" else None,
+                })
+        return scanned
+
+    def record_failure(self, dataset_ref: str, error: str, tags: Iterable[str] = ()):
+        """Record a failed download; a dataset already downloaded keeps its files and status"""
+        with self.transaction() as db:
+            self.ensure_dataset(db, dataset_ref)
+            db.execute("UPDATE datasets SET status = CASE WHEN status = ? THEN status ELSE ? END, "
+                       "error = ?, updated_at = ? WHERE ref = ?",
+                       (DOWNLOADED, FAILED, error, datetime.now().isoformat(), dataset_ref))
+            db.executemany("INSERT OR IGNORE INTO tags (ref, tag, file) VALUES (?, ?, '')",
+                           [(dataset_ref, tag) for tag in tags])
+
+    # Queries
+
+    def dataset(self, dataset_ref: str) -> Optional[Dict]:
+        rows = self.query("SELECT * FROM datasets WHERE ref = ?", (dataset_ref,))
+        return rows[0] if rows else None
+
+    def dataset_path(self, dataset_ref: str) -> Optional[str]:
+        """Local path of the catalogued version of a downloaded dataset"""
+        record = self.dataset(dataset_ref)
+        return record["path"] if record and record["status"] == DOWNLOADED else None
+
+    def datasets(self, category: Optional[str] = None, tag: Optional[str] = None,
+                 status: Optional[str] = DOWNLOADED) -> List[Dict]:
+        """Dataset rows filtered by category, tag and status"""
+        conditions, params = [], []
+        if status:
+            conditions.append("d.status = ?")
+            params.append(status)
+        if category:
+            conditions.append("d.ref IN (SELECT ref FROM categories WHERE category = ?)")
+            params.append(category)
+        if tag:
+            conditions.append("d.ref IN (SELECT ref FROM tags WHERE tag = ?)")
+            params.append(tag)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return self.query(f"SELECT d.* FROM datasets d {where} ORDER BY d.ref", params)
+
+    def find_files(self, extension: Optional[str] = None, category: Optional[str] = None,
+                   tag: Optional[str] = None, min_bytes: Optional[int] = None,
+                   max_bytes: Optional[int] = None, dataset_ref: Optional[str] = None) -> List[Dict]:
+        """Files of the catalogued versions of downloaded datasets, filtered.
+
+        A tag matches files tagged directly or whose whole dataset carries it.
+        """
+        conditions, params = ["d.status = ?"], [DOWNLOADED]
+        if extension:
+            conditions.append("f.extension = ?")
+            params.append(extension.lower().lstrip("."))
+        if min_bytes is not None:
+            conditions.append("f.size_bytes >= ?")
+            params.append(min_bytes)
+        if max_bytes is not None:
+            conditions.append("f.size_bytes <= ?")
+            params.append(max_bytes)
+        if dataset_ref:
+            conditions.append("f.ref = ?")
+            params.append(dataset_ref)
+        if category:
+            conditions.append("f.ref IN (SELECT ref FROM categories WHERE category = ?)")
+            params.append(category)
+        if tag:
+            conditions.append("EXISTS (SELECT 1 FROM tags t WHERE t.tag = ? AND t.ref = f.ref "
+                              "AND t.file IN ('', f.name))")
+            params.append(tag)
+        return self.query(
+            "SELECT f.ref AS dataset, f.version, f.name, f.path, f.extension, f.size_bytes, f.records, f.columns "
+            "FROM files f JOIN datasets d ON d.ref = f.ref AND d.version = f.version "
+            f"WHERE {' AND '.join(conditions)} ORDER BY f.ref, f.name",
+            params
+        )
+
+    def stats(self) -> Dict:
+        with self.lock:
+            def scalar(sql):
+                return self.db.execute(sql).fetchone()[0]
+
+            return {
+                "datasets": scalar("SELECT COUNT(*) FROM datasets WHERE status = 'downloaded'"),
+                "failed": scalar("SELECT COUNT(*) FROM datasets WHERE status = 'failed'"),
+                "versions": scalar("SELECT COUNT(*) FROM versions"),
+                "files": scalar("SELECT COUNT(*) FROM files f JOIN datasets d "
+                                "ON d.ref = f.ref AND d.version = f.version"),
+                "size_bytes": scalar("SELECT COALESCE(SUM(f.size_bytes), 0) FROM files f JOIN datasets d "
+                                     "ON d.ref = f.ref AND d.version = f.version"),
+                "categories": scalar("SELECT COUNT(DISTINCT category) FROM categories"),
+                "tags": scalar("SELECT COUNT(DISTINCT tag) FROM tags"),
+            }
+
+    # Legacy JSON import
+
+    def import_legacy(self, data_dir: Union[str, Path] = DATA_DIR) -> Dict[str, int]:
+        """Load the legacy JSON manifests in data_dir that are new or changed since their last import.
+
+        Returns entries imported per file. Imports merge into what is already
+        catalogued, so each script can call this on every run.
+        """
+        imported = {}
+        for tag, filename in LEGACY_FILES.items():
+            source = (Path(data_dir) / filename).resolve()
+            try:
+                stat = source.stat()
+            except OSError:
+                continue
+            previous = self.query("SELECT size_bytes, mtime_ns FROM legacy_imports WHERE source = ?", (str(source),))
+            if previous and (previous[0]["size_bytes"], previous[0]["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            with open(source, "r") as f:
+                data = json.load(f)
+            if tag == "kaggle-manifest":
+                imported[filename] = self.import_manifest(data)
+            else:
+                imported[filename] = self.import_entries(tag, data)
+            with self.transaction() as db:
+                db.execute("INSERT OR REPLACE INTO legacy_imports (source, size_bytes, mtime_ns, imported_at) "
+                           "VALUES (?, ?, ?, ?)", (str(source), stat.st_size, stat.st_mtime_ns,
+                                                   datetime.now().isoformat()))
+        return imported
+
+    def import_manifest(self, manifest: Dict) -> int:
+        """Load the downloader's manifest (datasets, paths, versions, categories, failures)"""
+        versions = manifest.get("dataset_versions", {})
+        paths = manifest.get("dataset_paths", {})
+        for dataset_ref in manifest.get("downloaded", []):
+            if paths.get(dataset_ref):
+                self.record_download(dataset_ref, paths[dataset_ref], versions.get(dataset_ref),
+                                     tags=["kaggle-manifest"])
+        for category, refs in manifest.get("datasets_by_category", {}).items():
+            for dataset_ref in refs:
+                self.add_categories(dataset_ref, [category])
+        for failure in manifest.get("failed", []):
+            if failure.get("dataset") not in manifest.get("downloaded", []):
+                self.record_failure(failure["dataset"], failure.get("error", ""), ["kaggle-manifest"])
+        return len(manifest.get("downloaded", [])) + len(manifest.get("failed", []))
+
+    def import_entries(self, tag: str, data: Union[Dict, List]) -> int:
+        """Load one of the per-script JSON shapes, tagging its entries"""
+        if isinstance(data, dict) and "downloaded" not in data:
+            # {dataset_ref: path}
+            data = [{"dataset": dataset_ref, "path": path} for dataset_ref, path in data.items()]
+        failed = data.get("failed", []) if isinstance(data, dict) else []
+        entries = data.get("downloaded", []) if isinstance(data, dict) else data
+
+        # Entries describing single files ({"dataset", "file", "path"}) tag those files
+        for entry in entries:
+            # creator-datasets.json names datasets by title rather than ref
+            if "file" not in entry or "/" not in entry["dataset"]:
+                continue
+            if self.dataset_path(entry["dataset"]) is None:
+                self.record_download(entry["dataset"], os.path.dirname(entry["path"]), files=[
+                    {"name": entry["file"], "size_bytes": int((entry.get("size_mb") or 0) * MB)}
+                ])
+            # The recorded path may be from another machine: match the file by name within the dataset
+            files = [row for row in self.find_files(dataset_ref=entry["dataset"])
+                     if os.path.basename(row["name"]) == entry["file"]]
+            with self.transaction() as db:
+                # Sizes only fill in files known from JSON alone, never ones scanned on disk
+                db.executemany(
+                    "UPDATE files SET size_bytes = MAX(size_bytes, ?) "
+                    "WHERE ref = ? AND version = ? AND name = ? AND mtime_ns IS NULL",
+                    [(int((entry.get("size_mb") or 0) * MB), entry["dataset"], row["version"], row["name"])
+                     for row in files]
+                )
+            self.add_tags(entry["dataset"], [tag], [row["name"] for row in files] or [entry["file"]])
+
+        for entry in entries:
+            if "file" in entry or not entry.get("path"):
+                continue
+            files = None
+            if not os.path.isdir(resolve_path(entry["dataset"], entry["path"], self.cache_root)):
+                # Only the JSON knows what was there: keep its file list
+                files = [
+                    {"name": item, "size_bytes": 0} if isinstance(item, str) else
+                    {"name": os.path.basename(item.get("path") or item["file"]),
+                     "size_bytes": int((item.get("size_mb") or 0) * MB), "columns": item.get("columns")}
+                    for item in entry.get("files", [])
+                ]
+            self.record_download(entry["dataset"], entry["path"], tags=[tag], files=files)
+        for failure in failed:
+            self.record_failure(failure["dataset"], failure.get("reason", ""), [tag])
+        return len(entries) + len(failed)
+
+    # Legacy JSON export
+
+    def export_legacy(self, name: str) -> Union[Dict, List]:
+        """Rebuild one legacy JSON file (a LEGACY_FILES key) from the catalog"""
+        if name not in LEGACY_FILES:
+            raise ValueError(f"unknown legacy file: {name!r} (expected one of {', '.join(LEGACY_FILES)})")
+        if name == "kaggle-manifest":
+            return self.export_manifest()
+        if name in ("villain-datasets", "creator-datasets"):
+            return [
+                {"dataset": row["dataset"], "file": os.path.basename(row["name"]), "path": row["path"],
+                 "size_mb": size_mb(row["size_bytes"])}
+                for row in self.find_files(tag=name)
+            ]
+
+        datasets = self.datasets(tag=name)
+        if name == "kaggle-cover-datasets":
+            return {record["ref"]: record["path"] for record in datasets}
+        if name == "kaggle-downloads":
+            return [{"dataset": record["ref"], "path": record["path"]} for record in datasets]
+
+        entries = []
+        for record in datasets:
+            files = self.find_files(dataset_ref=record["ref"])
+            total_size_mb = size_mb(sum(row["size_bytes"] for row in files))
+            if name == "comic-datasets":
+                entries.append({
+                    "dataset": record["ref"],
+                    "path": record["path"],
+                    "files": [
+                        {"file": os.path.basename(row["name"]), "path": row["path"],
+                         "size_mb": size_mb(row["size_bytes"]), "columns": (row["columns"] or "")[:200]}
+                        for row in files if row["extension"] == "csv"
+                    ],
+                    "total_size_mb": total_size_mb,
+                })
+            else:
+                entry = {"dataset": record["ref"], "path": record["path"],
+                         "files": [os.path.basename(row["name"]) for row in files]}
+                entry["size_mb" if name == "anime-manga-found" else "total_size_mb"] = total_size_mb
+                entries.append(entry)
+        if name == "anime-manga-found":
+            return entries
+        failed = [{"dataset": record["ref"], "reason": record["error"]}
+                  for record in self.datasets(tag=name, status=FAILED)]
+        return {"downloaded": entries, "failed": failed, "total_datasets_found": len(entries)}
+
+    def export_manifest(self) -> Dict:
+        """The downloader manifest's dataset fields"""
+        downloaded = self.datasets()
+        by_category: Dict[str, List[str]] = {}
+        for row in self.query("SELECT c.category, c.ref FROM categories c JOIN datasets d ON d.ref = c.ref "
+                              "WHERE d.status = ? ORDER BY c.category, c.ref", (DOWNLOADED,)):
+            by_category.setdefault(row["category"], []).append(row["ref"])
+        return {
+            "downloaded": [record["ref"] for record in downloaded],
+            "dataset_paths": {record["ref"]: record["path"] for record in downloaded},
+            "dataset_versions": {record["ref"]: record["version"] for record in downloaded if record["version"]},
+            "failed": [{"dataset": record["ref"], "error": record["error"], "timestamp": record["updated_at"]}
+                       for record in self.datasets(status=FAILED)],
+            "datasets_by_category": by_category,
+        }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="SQLite dataset catalog")
+    parser.add_argument("--db", default=str(CATALOG_DB), help=f"catalog database (default: {CATALOG_DB})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    import_parser = subparsers.add_parser("import", help="load the legacy JSON manifests")
+    import_parser.add_argument("data_dir", nargs="?", default=str(DATA_DIR))
+    files_parser = subparsers.add_parser("files", help="list catalogued files")
+    files_parser.add_argument("--ext", help="file extension, e.g. csv")
+    files_parser.add_argument("--category")
+    files_parser.add_argument("--tag")
+    files_parser.add_argument("--dataset")
+    files_parser.add_argument("--min-size", type=parse_size, help="e.g. 1M")
+    files_parser.add_argument("--max-size", type=parse_size)
+    export_parser = subparsers.add_parser("export", help="rebuild a legacy JSON file")
+    export_parser.add_argument("name", choices=list(LEGACY_FILES))
+    export_parser.add_argument("out", nargs="?", help="output file (default: stdout)")
+    subparsers.add_parser("stats", help="catalog totals")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    with DatasetCatalog(args.db) as catalog:
+        if args.command == "import":
+            result = catalog.import_legacy(args.data_dir)
+        elif args.command == "files":
+            result = catalog.find_files(args.ext, args.category, args.tag, args.min_size, args.max_size, args.dataset)
+        elif args.command == "export":
+            result = catalog.export_legacy(args.name)
+            if args.out:
+                with open(args.out, "w") as f:
+                    json.dump(result, f, indent=2)
+                sys.exit(0)
+        else:
+            result = catalog.stats()
+    print(json.dumps(result, indent=2))
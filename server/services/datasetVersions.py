@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Dataset Versions
+Version-aware freshness checks for the kagglehub dataset cache: a cached
+copy is current only if it is complete and its version number matches the
+version Kaggle currently publishes
+
+kagglehub keeps each version under datasets/<owner>/<dataset>/versions/<N>
+and writes a sentinel datasets/<owner>/<dataset>/<N>.complete once the
+version is fully extracted; a version directory without its sentinel is a
+partial download. Remote versions come from one metadata lookup per dataset
+per run (search results seed the same cache, so most need no extra call).
+
+Usage:
+    python datasetVersions.py OWNER/DATASET [...]   # cached vs current version as JSON
+"""
+
+import os
+import sys
+import json
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+KAGGLE_CACHE = Path.home() / ".cache" / "kagglehub"
+FRESH, STALE, MISSING = "fresh", "stale", "missing"
+
+
+def dataset_cache_dir(dataset_ref: str, cache_root: Path = KAGGLE_CACHE) -> Path:
+    owner, dataset = dataset_ref.split("/")
+    return cache_root / "datasets" / owner / dataset
+
+
+def completion_marker(dataset_ref: str, version: int, cache_root: Path = KAGGLE_CACHE) -> Path:
+    """kagglehub's sentinel for a fully extracted dataset version"""
+    return dataset_cache_dir(dataset_ref, cache_root) / f"{version}.complete"
+
+
+def cached_versions(dataset_ref: str, cache_root: Path = KAGGLE_CACHE) -> Dict[int, Path]:
+    """Every numbered version directory in the cache, complete or not"""
+    versions_dir = dataset_cache_dir(dataset_ref, cache_root) / "versions"
+    if not versions_dir.is_dir():
+        return {}
+    return {
+        int(entry.name): entry
+        for entry in versions_dir.iterdir()
+        if entry.name.isdigit() and entry.is_dir()
+    }
+
+
+def latest_complete_version(dataset_ref: str, cache_root: Path = KAGGLE_CACHE) -> Optional[Tuple[int, Path]]:
+    """Highest cached version whose completion sentinel exists"""
+    for version, path in sorted(cached_versions(dataset_ref, cache_root).items(), reverse=True):
+        if completion_marker(dataset_ref, version, cache_root).exists():
+            return version, path
+    return None
+
+
+def mark_complete(dataset_ref: str, version: int, cache_root: Path = KAGGLE_CACHE):
+    """Write the completion sentinel for a version (idempotent)"""
+    marker = completion_marker(dataset_ref, version, cache_root)
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    marker.touch()
+
+
+def version_from_path(path: str) -> Optional[int]:
+    """Version number of a .../versions/<N> cache path"""
+    parent, name = os.path.split(os.path.normpath(path))
+    if name.isdigit() and os.path.basename(parent) == "versions":
+        return int(name)
+    return None
+
+
+class MetadataCache:
+    """Per-run memo of Kaggle dataset metadata, one lookup per dataset"""
+
+    def __init__(self, lookup: Callable[[str], Dict]):
+        self.lookup = lookup
+        self.lock = threading.Lock()
+        self.records: Dict[str, Optional[Dict]] = {}
+        self.lookups = 0
+
+    def seed(self, records: Iterable[Dict]):
+        """Remember records that already arrived with search results"""
+        with self.lock:
+            for record in records:
+                self.records.setdefault(record["ref"], record)
+
+    def get(self, dataset_ref: str) -> Optional[Dict]:
+        """Metadata record for a dataset, or None if it could not be fetched"""
+        with self.lock:
+            if dataset_ref in self.records:
+                return self.records[dataset_ref]
+        try:
+            record = self.lookup(dataset_ref)
+        except Exception as e:
+            print(f"  ⚠️  No metadata for {dataset_ref}: {str(e)[:100]}", file=sys.stderr)
+            record = None
+        with self.lock:
+            self.lookups += 1
+            return self.records.setdefault(dataset_ref, record)
+
+    def current_version(self, dataset_ref: str) -> Optional[int]:
+        record = self.get(dataset_ref)
+        return record.get("version") if record else None
+
+
+def check_freshness(dataset_ref: str, metadata: MetadataCache,
+                    cache_root: Path = KAGGLE_CACHE) -> Tuple[str, Optional[int], Optional[Path]]:
+    """Return (status, remote_version, cached_path) for one dataset.
+
+    FRESH means a complete cached copy of the current version exists (or
+    the remote version is unknown, so the cached copy is trusted); STALE
+    means Kaggle has published a newer version; MISSING means there is no
+    complete cached copy at all.
+    """
+    local = latest_complete_version(dataset_ref, cache_root)
+    if local is None:
+        return MISSING, metadata.current_version(dataset_ref), None
+    local_version, path = local
+    remote_version = metadata.current_version(dataset_ref)
+    if remote_version is None or local_version >= remote_version:
+        return FRESH, remote_version or local_version, path
+    return STALE, remote_version, path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("ERROR: at least one dataset ref required", file=sys.stderr)
+        sys.exit(1)
+
+    from kaggleClient import get_client
+    metadata = MetadataCache(get_client().view)
+    report = {}
+    for dataset_ref in sys.argv[1:]:
+        status, remote_version, path = check_freshness(dataset_ref, metadata)
+        local = latest_complete_version(dataset_ref)
+        report[dataset_ref] = {
+            "status": status,
+            "cached_version": local[0] if local else None,
+            "current_version": remote_version,
+            "path": str(path) if path else None,
+        }
+    print(json.dumps(report, indent=2))
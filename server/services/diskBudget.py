@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Disk Budget
+Pre-flight admission control for dataset downloads: each candidate's
+advertised size (Kaggle metadata) is checked against a configured byte
+budget and the free space on the target filesystem before it is fetched
+
+Candidates are ranked by value per byte, so when space runs short the
+small, popular datasets go first. A dataset that can never fit is skipped;
+one that does not fit right now is deferred to a later run. Admitted
+downloads hold a reservation until they finish, so concurrent downloads
+cannot jointly overcommit the disk.
+
+Configuration:
+    KAGGLE_DISK_BUDGET   bytes the download directories may hold (e.g. 50G; unset = no budget)
+    KAGGLE_DISK_RESERVE  free space always left untouched (default 2G)
+"""
+
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+KAGGLE_DISK_BUDGET = os.getenv("KAGGLE_DISK_BUDGET", "")
+KAGGLE_DISK_RESERVE = os.getenv("KAGGLE_DISK_RESERVE", "2G")
+# An archive and its extracted files are on disk together while unpacking
+EXTRACT_FACTOR = 2
+MIN_RANK_BYTES = 1024 * 1024  # Unknown or tiny sizes rank as if this large
+
+ADMIT, DEFER, SKIP = "admit", "defer", "skip"
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def parse_size(text: Union[str, int, None]) -> Optional[int]:
+    """Parse a byte count such as 500M, 20G or 1048576; empty means None"""
+    if text is None or text == "":
+        return None
+    if isinstance(text, int):
+        return text
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)I?B?\s*", text.upper())
+    if not match:
+        raise ValueError(f"invalid size: {text!r}")
+    return int(float(match.group(1)) * SIZE_UNITS[match.group(2)])
+
+
+def format_size(size: int) -> str:
+    if abs(size) < 1024 * 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / 1024 / 1024:.1f} MB"
+
+
+def tree_bytes(paths: Iterable[Union[str, Path]]) -> int:
+    """Bytes held by every file under paths, counting hardlinked files once"""
+    seen = set()
+    total = 0
+    for root in paths:
+        for directory, _, files in os.walk(root):
+            for name in files:
+                try:
+                    stat = os.lstat(os.path.join(directory, name))
+                except OSError:
+                    continue
+                if (stat.st_dev, stat.st_ino) not in seen:
+                    seen.add((stat.st_dev, stat.st_ino))
+                    total += stat.st_size
+    return total
+
+
+def dataset_value(record: Dict) -> float:
+    """Heuristic worth of a dataset from its Kaggle popularity and usability"""
+    popularity = 1 + (record.get("votes") or 0) + (record.get("downloads") or 0) / 100
+    return popularity * (1 + (record.get("usability") or 0))
+
+
+def rank_by_value(records: Iterable[Dict]) -> List[Dict]:
+    """Order dataset records by value per advertised byte, best first"""
+    return sorted(
+        records,
+        key=lambda record: dataset_value(record) / max(record.get("size_bytes") or 0, MIN_RANK_BYTES),
+        reverse=True,
+    )
+
+
+def existing_parent(path: Path) -> Path:
+    """Nearest existing ancestor, for free-space checks before a directory exists"""
+    path = path.absolute()
+    while not path.exists() and path != path.parent:
+        path = path.parent
+    return path
+
+
+class DiskBudget:
+    """Admits downloads only while they fit the budget and the free space"""
+
+    def __init__(self, paths: List[Union[str, Path]],
+                 budget: Optional[int] = None, reserve: Optional[int] = None):
+        self.paths = [Path(path) for path in paths]
+        self.budget = budget if budget is not None else parse_size(KAGGLE_DISK_BUDGET)
+        self.reserve = reserve if reserve is not None else parse_size(KAGGLE_DISK_RESERVE)
+        self.lock = threading.Lock()
+        # Only a budget needs to know what is already stored
+        self.used = tree_bytes(self.paths) if self.budget is not None else 0
+        self.reserved: Dict[str, int] = {}
+        self.decisions: Dict[str, List[str]] = {ADMIT: [], DEFER: [], SKIP: []}
+
+    def disk_usage(self):
+        return shutil.disk_usage(existing_parent(self.paths[0]))
+
+    def headroom(self) -> Dict:
+        """Bytes still available to new downloads under the budget and on disk"""
+        with self.lock:
+            pending = sum(self.reserved.values())
+            free = self.disk_usage().free - self.reserve - pending * EXTRACT_FACTOR
+            budget = self.budget - self.used - pending if self.budget is not None else None
+            return {"free": free, "budget": budget}
+
+    def admit(self, dataset_ref: str, size_bytes: int) -> str:
+        """Decide whether a dataset of the advertised size may be downloaded now.
+
+        Returns ADMIT (a reservation is held until release), DEFER (no room
+        now) or SKIP (it could never fit). An unknown size is admitted while
+        the free-space reserve is intact.
+        """
+        size_bytes = size_bytes or 0
+        with self.lock:
+            usage = self.disk_usage()
+            pending = sum(self.reserved.values())
+            if (self.budget is not None and size_bytes > self.budget) or \
+                    size_bytes * EXTRACT_FACTOR > usage.total - self.reserve:
+                decision = SKIP
+            elif usage.free - self.reserve - (pending + size_bytes) * EXTRACT_FACTOR < 0:
+                decision = DEFER
+            elif self.budget is not None and self.used + pending + size_bytes > self.budget:
+                decision = DEFER
+            else:
+                decision = ADMIT
+                self.reserved[dataset_ref] = size_bytes
+            self.decisions[decision].append(dataset_ref)
+            return decision
+
+    def release(self, dataset_ref: str, stored_bytes: int = 0):
+        """Drop a download's reservation, charging what it actually stored"""
+        with self.lock:
+            self.reserved.pop(dataset_ref, None)
+            self.used += stored_bytes
+
+    def report(self) -> Dict:
+        with self.lock:
+            return {
+                "budget_bytes": self.budget,
+                "used_bytes": self.used,
+                "admitted": len(self.decisions[ADMIT]),
+                "deferred": list(self.decisions[DEFER]),
+                "skipped": list(self.decisions[SKIP]),
+            }
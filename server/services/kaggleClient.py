@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Kaggle API Client
+Talks to the Kaggle REST API (the v1 endpoints the kaggle CLI is built on)
+over one shared, authenticated keep-alive session, so searches and downloads
+no longer pay for a CLI interpreter start, a credentials load and a CSV
+round-trip per call
+
+Credentials come from KAGGLE_USERNAME / KAGGLE_KEY, falling back to
+kaggle.json in KAGGLE_CONFIG_DIR (default ~/.kaggle).
+
+Usage:
+    python kaggleClient.py search TERM          # dataset records as JSON
+    python kaggleClient.py files OWNER/DATASET
+    python kaggleClient.py view OWNER/DATASET
+    python kaggleClient.py fetch OWNER/DATASET DEST [GLOB ...]   # selected files only
+"""
+
+import os
+import sys
+import json
+import itertools
+import threading
+import requests
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+from requests.adapters import HTTPAdapter
+
+from zipStream import ZIP_MAGIC, extract_stream, glob_filter
+
+KAGGLE_API_URL = os.getenv("KAGGLE_API_URL", "https://www.kaggle.com/api/v1/")
+USER_AGENT = "PanelProfits-KaggleClient/1.0"
+REQUEST_TIMEOUT = 30
+DOWNLOAD_TIMEOUT = 300  # Seconds without data before a download is abandoned
+CHUNK_SIZE = 1024 * 1024
+POOL_SIZE = 16  # Keep-alive connections; covers the discovery and download pools
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def load_credentials() -> Optional[Tuple[str, str]]:
+    """Return (username, key) from the environment or kaggle.json"""
+    username, key = os.getenv("KAGGLE_USERNAME"), os.getenv("KAGGLE_KEY")
+    if username and key:
+        return username, key
+
+    config_dir = Path(os.getenv("KAGGLE_CONFIG_DIR", Path.home() / ".kaggle"))
+    config_file = config_dir / "kaggle.json"
+    if config_file.exists():
+        with open(config_file, "r") as f:
+            config = json.load(f)
+        if config.get("username") and config.get("key"):
+            return config["username"], config["key"]
+    return None
+
+
+def dataset_record(data: Dict) -> Dict:
+    """Flatten a Kaggle dataset payload into the fields the downloaders use"""
+    return {
+        "ref": data.get("ref"),
+        "title": data.get("title"),
+        "size_bytes": data.get("totalBytes") or 0,
+        "last_updated": data.get("lastUpdated"),
+        "votes": data.get("voteCount") or 0,
+        "downloads": data.get("downloadCount") or 0,
+        "version": data.get("currentVersionNumber"),
+        "usability": data.get("usabilityRating"),
+        "license": data.get("licenseName"),
+    }
+
+
+def file_record(data: Dict) -> Dict:
+    """Flatten a Kaggle dataset file payload"""
+    return {
+        "name": data.get("name") or data.get("nameNullable"),
+        "size_bytes": data.get("totalBytes") or data.get("totalBytesNullable") or 0,
+        "created": data.get("creationDate") or data.get("creationDateNullable"),
+    }
+
+
+def select_files(files: List[Dict], include: Optional[List[str]] = None, exclude: Optional[List[str]] = None,
+                 max_file_bytes: Optional[int] = None) -> List[Dict]:
+    """File records matching any include glob, no exclude glob and the size limit"""
+    included = glob_filter(include) if include else None
+    excluded = glob_filter(exclude) if exclude else None
+    return [
+        record for record in files
+        if (included is None or included(record["name"]))
+        and (excluded is None or not excluded(record["name"]))
+        and (max_file_bytes is None or record["size_bytes"] <= max_file_bytes)
+    ]
+
+
+def write_chunks(chunks: Iterable[bytes], outfile: Path) -> int:
+    """Write chunks to outfile via a temp file; returns bytes written"""
+    outfile.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = outfile.with_name(outfile.name + ".part")
+    written = 0
+    try:
+        with open(tmp_file, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+                written += len(chunk)
+    except BaseException:
+        # Never leave a partial download behind
+        tmp_file.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_file, outfile)
+    return written
+
+
+class KaggleClient:
+    """Kaggle REST client sharing one pooled session across threads"""
+
+    def __init__(self, credentials: Optional[Tuple[str, str]] = None, api_url: str = KAGGLE_API_URL):
+        credentials = credentials or load_credentials()
+        if credentials is None:
+            raise RuntimeError("Kaggle credentials not found. Set KAGGLE_USERNAME and KAGGLE_KEY")
+        self.api_url = api_url
+        self.session = requests.Session()
+        self.session.auth = credentials
+        self.session.headers["User-Agent"] = USER_AGENT
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, path: str, params: Optional[Dict] = None, stream: bool = False,
+            timeout: int = REQUEST_TIMEOUT) -> requests.Response:
+        """GET an API path; raises requests.HTTPError on a non-2xx response"""
+        response = self.session.get(f"{self.api_url}{path}", params=params, stream=stream, timeout=timeout)
+        response.raise_for_status()
+        return response
+
+    def search(self, term: str, page: int = 1, **filters) -> List[Dict]:
+        """One page of dataset search results as dataset records"""
+        params = {"search": term, "page": page}
+        params.update(filters)
+        return [dataset_record(data) for data in self.get("datasets/list", params).json()]
+
+    def view(self, dataset_ref: str) -> Dict:
+        """Current metadata (version, size, last update) for one dataset"""
+        return dataset_record(self.get(f"datasets/view/{dataset_ref}").json())
+
+    def list_files(self, dataset_ref: str) -> List[Dict]:
+        """Every file in the current version of a dataset"""
+        files = []
+        params = {}
+        while True:
+            data = self.get(f"datasets/list/{dataset_ref}", params).json()
+            files.extend(file_record(item) for item in data.get("datasetFiles") or [])
+            token = data.get("nextPageToken")
+            if not token:
+                return files
+            params = {"pageToken": token}
+
+    def stream_to_file(self, path: str, outfile: Path, params: Optional[Dict] = None) -> int:
+        """Stream a download to outfile via a temp file; returns bytes written"""
+        with self.get(path, params, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+            return write_chunks(response.iter_content(CHUNK_SIZE), outfile)
+
+    def download(self, dataset_ref: str, path: Path, unzip: bool = True, version: Optional[int] = None) -> int:
+        """Download a whole dataset into path; returns bytes written to disk.
+
+        With unzip the archive is extracted as it streams and never stored.
+        """
+        params = {"datasetVersionNumber": version} if version else None
+        if not unzip:
+            archive = Path(path) / (dataset_ref.split("/")[-1] + ".zip")
+            return self.stream_to_file(f"datasets/download/{dataset_ref}", archive, params)
+        with self.get(f"datasets/download/{dataset_ref}", params, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+            members = extract_stream(response.iter_content(CHUNK_SIZE), path)
+        return sum(member["size_bytes"] for member in members)
+
+    def download_file(self, dataset_ref: str, name: str, path: Path) -> int:
+        """Download one file of a dataset to path/name; returns bytes written.
+
+        Kaggle sends large single files zipped; those are extracted as they stream.
+        """
+        path = Path(path)
+        with self.get(f"datasets/download/{dataset_ref}/{quote(name)}",
+                      stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+            chunks: Iterator[bytes] = response.iter_content(CHUNK_SIZE)
+            first = next(chunks, b"")
+            chunks = itertools.chain([first], chunks)
+            if first.startswith(ZIP_MAGIC) and not name.lower().endswith(".zip"):
+                members = extract_stream(chunks, (path / name).parent)
+                return sum(member["size_bytes"] for member in members)
+            return write_chunks(chunks, path / name)
+
+    def download_files(self, dataset_ref: str, path: Path, include: Optional[List[str]] = None,
+                       exclude: Optional[List[str]] = None, max_file_bytes: Optional[int] = None) -> Dict:
+        """Download only the files of a dataset that pass select_files.
+
+        Returns {"files", "selected", "bytes", "skipped_bytes"}, where
+        skipped_bytes is the advertised size of the files left out.
+        """
+        files = self.list_files(dataset_ref)
+        selected = select_files(files, include, exclude, max_file_bytes)
+        written = sum(self.download_file(dataset_ref, record["name"], path) for record in selected)
+        return {
+            "files": len(files),
+            "selected": [record["name"] for record in selected],
+            "bytes": written,
+            "skipped_bytes": sum(record["size_bytes"] for record in files) -
+                             sum(record["size_bytes"] for record in selected),
+        }
+
+
+def get_client() -> KaggleClient:
+    """Return the process-wide Kaggle client"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = KaggleClient()
+        return _client
+
+
+def search_datasets(term: str) -> List[Dict]:
+    """Search Kaggle with the shared client; raises on failure"""
+    return get_client().search(term)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] not in ("search", "files", "view", "fetch") or \
+            (sys.argv[1] == "fetch" and len(sys.argv) < 4):
+        print("Usage: kaggleClient.py search TERM | files OWNER/DATASET | view OWNER/DATASET | "
+              "fetch OWNER/DATASET DEST [GLOB ...]", file=sys.stderr)
+        sys.exit(1)
+
+    command, argument = sys.argv[1], sys.argv[2]
+    client = get_client()
+    if command == "search":
+        result = client.search(argument)
+    elif command == "files":
+        result = client.list_files(argument)
+    elif command == "fetch":
+        result = client.download_files(argument, Path(sys.argv[3]), include=sys.argv[4:] or None)
+    else:
+        result = client.view(argument)
+    print(json.dumps(result, indent=2))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Kaggle Dataset Discovery
+Runs Kaggle dataset searches concurrently under one shared rate limit and
+yields each term's results as soon as its search finishes
+
+Used by scripts/kaggle-bulk-download.py and scripts/kaggle-bulk-download-v2.py.
+
+Usage:
+    python kaggleDiscovery.py TERM [TERM ...]     # print unique datasets as JSON
+"""
+
+import os
+import sys
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from kaggleClient import search_datasets
+from rateLimiter import TokenBucket
+
+# Searches per minute shared by every discovery thread in the process
+KAGGLE_SEARCHES_PER_MINUTE = int(os.getenv("KAGGLE_SEARCHES_PER_MINUTE", "300"))
+SEARCH_WORKERS = 8
+
+
+def discover(terms: Iterable[str],
+             search: Callable[[str], List[Dict]] = search_datasets,
+             workers: int = SEARCH_WORKERS,
+             limiter: Optional[TokenBucket] = None) -> Iterator[Dict]:
+    """Search every term concurrently, yielding results in completion order.
+
+    Each result is {"term", "datasets", "refs", "seconds", "error"}, where
+    datasets are kaggleClient dataset records in search order; a failed
+    search yields no datasets and the error message instead of raising.
+    """
+    limiter = limiter or TokenBucket(KAGGLE_SEARCHES_PER_MINUTE)
+
+    def timed_search(term: str) -> Dict:
+        limiter.acquire()
+        started = time.monotonic()
+        try:
+            datasets, error = search(term), None
+        except Exception as e:
+            datasets, error = [], str(e)[:200]
+        return {
+            "term": term,
+            "datasets": datasets,
+            "refs": [dataset["ref"] for dataset in datasets],
+            "seconds": time.monotonic() - started,
+            "error": error,
+        }
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(timed_search, term) for term in terms]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def timing_summary(results: List[Dict], wall_seconds: float, slowest: int = 5) -> Dict:
+    """Summarize per-term search timings for a discovery run"""
+    ordered = sorted(results, key=lambda result: result["seconds"], reverse=True)
+    return {
+        "terms": len(results),
+        "failed": sum(1 for result in results if result["error"]),
+        "wall_seconds": round(wall_seconds, 2),
+        "search_seconds": round(sum(result["seconds"] for result in results), 2),
+        "slowest": [(result["term"], round(result["seconds"], 2)) for result in ordered[:slowest]],
+        "per_term": {result["term"]: round(result["seconds"], 3) for result in results},
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("ERROR: at least one search term required", file=sys.stderr)
+        sys.exit(1)
+
+    started = time.monotonic()
+    results = []
+    datasets = {}
+    for result in discover(sys.argv[1:]):
+        results.append(result)
+        for dataset in result["datasets"]:
+            datasets.setdefault(dataset["ref"], dict(dataset, term=result["term"]))
+    summary = timing_summary(results, time.monotonic() - started)
+    print(json.dumps({"datasets": list(datasets.values()), "timings": summary}, indent=2))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Manifest Journal
+Crash-safe persistence for JSON manifests: every change is appended to a
+JSONL journal and fsync'd, and the full JSON snapshot is only rewritten
+during compaction, via a temp file and an atomic rename
+
+Readers that only understand the snapshot (the TS importers) keep working;
+they see the state as of the last compaction. Each journal record carries a
+sequence number and the snapshot stores the last one it includes, so a crash
+between the rename and the journal truncation never replays a record twice.
+A torn final line from a crash mid-append is discarded on load.
+"""
+
+import os
+import json
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+SEQ_KEY = "journal_seq"
+
+
+def fsync_directory(path: Path):
+    """Persist a rename by syncing its directory (no-op where unsupported)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class ManifestJournal:
+    """Append-only journal plus atomically compacted JSON snapshot"""
+
+    def __init__(self, snapshot_path: Union[str, Path], journal_path: Optional[Union[str, Path]] = None):
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = Path(journal_path) if journal_path else \
+            self.snapshot_path.with_name(self.snapshot_path.stem + ".journal.jsonl")
+        self.lock = threading.Lock()
+        self.seq = 0
+        self.pending = 0  # Records appended since the last compaction
+        self.journal = None
+
+    def load(self, default: Dict) -> Tuple[Dict, List[Dict]]:
+        """Return the snapshot (or default) and the journal records newer than it"""
+        snapshot = default
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, "r") as f:
+                snapshot = json.load(f)
+        self.seq = snapshot.get(SEQ_KEY, 0)
+
+        records = []
+        if self.journal_path.exists():
+            good_bytes = 0
+            with open(self.journal_path, "rb") as f:
+                for line in f:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("unterminated record")
+                        record = json.loads(line)
+                    except ValueError:
+                        # Torn write at the tail; nothing after it was acknowledged
+                        break
+                    good_bytes += len(line)
+                    if record.get("seq", 0) > self.seq:
+                        records.append(record)
+                        self.seq = record["seq"]
+            # Cut the torn tail off so later appends start on a clean line
+            if good_bytes < self.journal_path.stat().st_size:
+                os.truncate(self.journal_path, good_bytes)
+        self.pending = len(records)
+        return snapshot, records
+
+    def append(self, record: Dict) -> Dict:
+        """Durably append one record; returns it with its sequence number"""
+        with self.lock:
+            if self.journal is None:
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                self.journal = open(self.journal_path, "ab")
+            self.seq += 1
+            record = dict(record, seq=self.seq)
+            self.journal.write(json.dumps(record, separators=(",", ":")).encode("utf-8") + b"\n")
+            self.journal.flush()
+            os.fsync(self.journal.fileno())
+            self.pending += 1
+            return record
+
+    def compact(self, snapshot: Dict):
+        """Atomically replace the snapshot with `snapshot`, then empty the journal.
+
+        `snapshot` must already reflect every appended record.
+        """
+        with self.lock:
+            snapshot[SEQ_KEY] = self.seq
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.snapshot_path.with_name(self.snapshot_path.name + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(snapshot, indent=2, fp=f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            fsync_directory(self.snapshot_path.parent)
+
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+            with open(self.journal_path, "wb") as f:
+                os.fsync(f.fileno())
+            self.pending = 0
+
+    def close(self):
+        with self.lock:
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Metron Client Benchmark
+Runs metronExpansion.py against a local stand-in server (metronFakeServer.py)
+and reports throughput and latency percentiles, entirely offline
+
+Usage:
+    python metronBenchmark.py [--modes recent,series,batch] [--iterations 5]
+                              [--days 30] [--workers N] [--shard-days N]
+                              [--issues 2000] [--series 50] [--page-size 100]
+                              [--latency-ms 20] [--jitter-ms 5] [--rate-429 0.0]
+                              [--rate-per-minute N] [--replay DIR]
+                              [--names FILE] [--output FILE]
+
+Modes:
+    recent   fetch_recent_issues over DAYS, once per iteration
+    series   one fetch_series_by_name per name, per iteration
+    batch    resolve_series_batch over every name, once per iteration
+
+The response cache is always disabled and the client rate limit is lifted
+unless --rate-per-minute is given, so the numbers measure the client and the
+simulated server latency. Results are printed as a table on stderr and as
+JSON on stdout (or --output).
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+
+from metronFakeServer import SERIES_NAMES, start_server
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (0.0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100.0 * len(ordered))
+    return ordered[min(len(ordered), max(rank, 1)) - 1]
+
+
+class LatencyRecorder:
+    """requests response hook collecting per-request latency"""
+
+    def __init__(self):
+        self.samples = []
+
+    def __call__(self, response, *args, **kwargs):
+        self.samples.append(response.elapsed.total_seconds())
+
+    def take(self):
+        samples, self.samples = self.samples, []
+        return samples
+
+
+def run_mode(name, operation, iterations, recorder):
+    """Time `operation` (returning a record count) and summarize one mode"""
+    durations = []
+    records = 0
+    recorder.take()
+    for _ in range(iterations):
+        started = time.monotonic()
+        records += operation()
+        durations.append(time.monotonic() - started)
+    requests_seen = recorder.take()
+    seconds = sum(durations)
+    return {
+        'mode': name,
+        'iterations': iterations,
+        'records': records,
+        'seconds': round(seconds, 4),
+        'records_per_sec': round(records / seconds, 2) if seconds else 0.0,
+        'requests': len(requests_seen),
+        'request_p50_ms': round(percentile(requests_seen, 50) * 1000, 2),
+        'request_p99_ms': round(percentile(requests_seen, 99) * 1000, 2),
+        'run_p50_ms': round(percentile(durations, 50) * 1000, 2),
+        'run_p99_ms': round(percentile(durations, 99) * 1000, 2),
+    }
+
+
+def print_table(results):
+    columns = ['mode', 'records', 'seconds', 'records_per_sec', 'requests',
+               'request_p50_ms', 'request_p99_ms', 'run_p50_ms', 'run_p99_ms']
+    widths = {column: max(len(column), *(len(str(result[column])) for result in results))
+              for column in columns}
+    print('  '.join(column.ljust(widths[column]) for column in columns), file=sys.stderr)
+    for result in results:
+        print('  '.join(str(result[column]).ljust(widths[column]) for column in columns), file=sys.stderr)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the Metron client against a local stand-in")
+    parser.add_argument('--modes', default='recent,series,batch', help="comma-separated: recent,series,batch")
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--days', type=int, default=30, help="store date window for recent (default: 30)")
+    parser.add_argument('--workers', type=int, help="client worker threads (default: MAX_WORKERS)")
+    parser.add_argument('--shard-days', type=int, help="client shard size (default: SHARD_DAYS)")
+    parser.add_argument('--names', help="file of series names, one per line (default: built-in list)")
+    parser.add_argument('--issues', type=int, default=2000)
+    parser.add_argument('--series', type=int, default=50)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--latency-ms', type=float, default=20)
+    parser.add_argument('--jitter-ms', type=float, default=5)
+    parser.add_argument('--rate-429', type=float, default=0.0)
+    parser.add_argument('--retry-after', type=int, default=0)
+    parser.add_argument('--rate-per-minute', type=int, help="client request budget (default: unthrottled)")
+    parser.add_argument('--replay', help="serve recorded responses instead of synthetic data")
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    modes = [mode.strip() for mode in args.modes.split(',') if mode.strip()]
+    unknown = set(modes) - {'recent', 'series', 'batch'}
+    if unknown:
+        print(f"ERROR: unknown modes: {', '.join(sorted(unknown))}", file=sys.stderr)
+        sys.exit(1)
+
+    server_options = dict(page_size=args.page_size, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                          rate_429=args.rate_429, retry_after=args.retry_after)
+    if args.replay:
+        server_options['replay'] = args.replay
+    else:
+        server_options.update(issues=args.issues, series=args.series, days=max(args.days, 1))
+    server = start_server(0, **server_options)
+
+    # metronExpansion reads its configuration at import time
+    os.environ['METRON_API_URL'] = server.base_url
+    os.environ['METRON_CACHE'] = ''
+    os.environ.setdefault('METRON_USERNAME', 'benchmark')
+    os.environ.setdefault('METRON_PASSWORD', 'benchmark')
+    os.environ['METRON_RATE_PER_MINUTE'] = str(args.rate_per_minute or 10 ** 9)
+    import metronExpansion as metron
+
+    if args.names:
+        with open(args.names, 'r') as f:
+            names = [line.strip() for line in f if line.strip()]
+    else:
+        names = SERIES_NAMES
+    workers = args.workers or metron.MAX_WORKERS
+    shard_days = args.shard_days or metron.SHARD_DAYS
+
+    recorder = LatencyRecorder()
+    metron.get_http_session().hooks['response'].append(recorder)
+
+    operations = {
+        'recent': lambda: len(metron.fetch_recent_issues(args.days, workers=workers, shard_days=shard_days)),
+        'series': lambda: sum(1 for name in names if metron.fetch_series_by_name(name)),
+        'batch': lambda: sum(1 for resolution in metron.resolve_series_batch(names, workers=workers).values()
+                             if resolution['match']),
+    }
+
+    try:
+        results = [run_mode(mode, operations[mode], args.iterations, recorder) for mode in modes]
+    finally:
+        server.shutdown()
+
+    report = {
+        'server': {key: value for key, value in server_options.items() if key != 'replay'},
+        'replay': args.replay,
+        'workers': workers,
+        'shard_days': shard_days,
+        'server_requests': server.requests,
+        'server_429s': server.throttled,
+        'results': results,
+        'metrics': metron.METRICS.snapshot(),
+    }
+    print_table(results)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
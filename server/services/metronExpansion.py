@@ -1,98 +1,1390 @@
 #!/usr/bin/env python3
 """
 Metron DB Expansion Service
-Uses mokkari Python wrapper to scrape comic metadata from Metron DB
+Scrapes comic metadata from the Metron DB REST API (the endpoints the
+mokkari wrapper uses) over one shared, rate-limited keep-alive session
+
+Usage:
+    python metronExpansion.py recent [DAYS] [--stream] [--gzip] [--output FILE]
+                                     [--format ndjson|msgpack]
+                                     [--incremental] [--state-dir DIR]
+                                     [--enrich [--entities]] [--workers N]
+                                     [--shard-days N]
+    python metronExpansion.py series NAME
+    python metronExpansion.py series-batch [FILE] [--output FILE] [--workers N]
+    python metronExpansion.py worker [--socket PATH]
+    python metronExpansion.py backfill [--by date|series] [--start DATE] [--end DATE]
+                                       [--window-days N] [--store FILE]
+    python metronExpansion.py cache-stats
+
+Lookups go through an on-disk response cache (METRON_CACHE, default
+data/metron/cache.db); pass --no-cache before the command to bypass it.
+Pass --metrics FILE (or set METRON_METRICS) to dump per-endpoint latency
+histograms, page/byte/retry counts and throttle time at exit, as JSON or,
+for *.prom paths, as a Prometheus textfile. Set METRON_RECORD_DIR to save
+every network response for replay with metronFakeServer.py --replay.
+
+The worker command keeps one interpreter and one authenticated HTTP
+session alive and answers line-delimited JSON requests, one per line:
+
+    {"id": 1, "command": "recent", "days": 7, "incremental": true}
+    {"id": 2, "command": "series", "name": "Amazing Spider-Man"}
+    {"id": 3, "command": "series-batch", "names": ["X-Men", "Saga"]}
+
+Each request gets exactly one response line:
+
+    {"id": 1, "ok": true, "result": [...]}
+    {"id": 2, "ok": false, "error": "..."}
 """
 
 import os
 import sys
+import gzip
 import json
-import mokkari
-from datetime import datetime, timedelta
+import argparse
+import re
+import time
+import hashlib
+import sqlite3
+import threading
+import socketserver
+import requests
+from difflib import SequenceMatcher
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlparse
+from datetime import datetime, timedelta, timezone
+from rateLimiter import TokenBucket
+from recordBatches import RecordBatchWriter, require_msgpack
 
 # Metron credentials from environment
 USERNAME = os.getenv('METRON_USERNAME')
 PASSWORD = os.getenv('METRON_PASSWORD')
 
-def fetch_recent_issues(days=7):
-    """Fetch recent issues from Metron DB"""
-    if not USERNAME or not PASSWORD:
-        print("ERROR: METRON_USERNAME and METRON_PASSWORD required", file=sys.stderr)
-        return []
+METRON_API_URL = os.getenv('METRON_API_URL', 'https://metron.cloud/api/')
+USER_AGENT = 'PanelProfits-MetronExpansion/1.0'
+REQUEST_TIMEOUT = 30
+
+# Incremental sync state: cursor file plus one JSON bucket per store date
+SYNC_STATE_DIR = Path(os.getenv('METRON_STATE_DIR', 'data/metron'))
+SYNC_STATE_FILE = 'sync-state.json'
+# Store dates older than this many days are settled; a bucket synced after that is never refetched
+SETTLE_DAYS = 3
+
+# Full-catalog backfill store and its default walk
+CATALOG_PATH = SYNC_STATE_DIR / 'catalog.db'
+BACKFILL_START = '1930-01-01'
+BACKFILL_WINDOW_DAYS = 30
+# Series re-listings reach this far before the previous listing started, to absorb clock skew
+SERIES_LIST_OVERLAP = timedelta(hours=1)
+
+# Response cache under every Metron request; an empty path disables it
+CACHE_PATH = os.getenv('METRON_CACHE', str(SYNC_STATE_DIR / 'cache.db'))
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Seconds to keep a response, keyed by endpoint ("<name>/detail" for single objects)
+CACHE_TTLS = {
+    'series': 7 * 24 * 3600,
+    'series/detail': 7 * 24 * 3600,
+    'issue': 3600,
+    'issue/detail': 24 * 3600,
+    'creator/detail': 30 * 24 * 3600,
+    'character/detail': 30 * 24 * 3600,
+    'arc/detail': 30 * 24 * 3600,
+}
+DEFAULT_CACHE_TTL = 24 * 3600
+# Empty results are cached too, but for less time so new series show up
+NEGATIVE_CACHE_TTL = 3600
+
+# When set, every network response is also written here for metronFakeServer.py --replay
+RECORD_DIR = os.getenv('METRON_RECORD_DIR', '')
+
+# Metron allows 30 requests a minute per account; every network call shares one bucket
+METRON_RATE_PER_MINUTE = int(os.getenv('METRON_RATE_PER_MINUTE', '30'))
+MAX_RETRIES = 3
+RETRY_DELAY = 5  # Base delay in seconds when a 429 has no Retry-After
+MAX_WORKERS = 4  # Concurrent requests for shards, enrichment and batch lookups
+# Wide store date windows are split into shards of this many days
+SHARD_DAYS = 7
+SHARD_RETRIES = 2
+# Series search result pages to read while no exact name/year match has turned up
+SERIES_SEARCH_PAGES = 10
+
+_http = None
+_cache = None
+_limiter = None
+_api_lock = threading.Lock()
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class RunMetrics:
+    """Thread-safe counters for one run: request latency, paging and throttling"""
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.endpoints = {}
+        self.throttle_seconds = 0.0
+        self.phases = {}
+    
+    def _endpoint(self, endpoint):
+        if endpoint not in self.endpoints:
+            self.endpoints[endpoint] = {
+                'requests': 0,
+                'errors': 0,
+                'retries': 0,
+                'pages': 0,
+                'bytes': 0,
+                'latency_sum': 0.0,
+                'latency_buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+            }
+        return self.endpoints[endpoint]
     
-    m = mokkari.api(username=USERNAME, passwd=PASSWORD)
+    def record_request(self, endpoint, seconds, size, ok=True):
+        with self.lock:
+            stats = self._endpoint(endpoint)
+            stats['requests'] += 1
+            stats['errors'] += 0 if ok else 1
+            stats['bytes'] += size
+            stats['latency_sum'] += seconds
+            index = next((i for i, bound in enumerate(LATENCY_BUCKETS) if seconds <= bound),
+                         len(LATENCY_BUCKETS))
+            stats['latency_buckets'][index] += 1
+    
+    def record_page(self, endpoint):
+        with self.lock:
+            self._endpoint(endpoint)['pages'] += 1
+    
+    def record_retry(self, endpoint):
+        with self.lock:
+            self._endpoint(endpoint)['retries'] += 1
+    
+    def record_throttle(self, seconds):
+        with self.lock:
+            self.throttle_seconds += seconds
+    
+    def add_phase(self, phase, seconds):
+        """Accumulate time spent outside requests, e.g. serialization"""
+        with self.lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+    
+    def snapshot(self, cache_stats=None):
+        """Return every counter as a JSON-ready dict"""
+        with self.lock:
+            endpoints = {}
+            for name, stats in self.endpoints.items():
+                cumulative = 0
+                buckets = {}
+                for bound, count in zip(LATENCY_BUCKETS + ('+Inf',), stats['latency_buckets']):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                endpoints[name] = dict(stats, latency_sum=round(stats['latency_sum'], 6), latency_buckets=buckets)
+            return {
+                'started_at': datetime.fromtimestamp(self.started).isoformat(),
+                'duration_seconds': round(time.time() - self.started, 3),
+                'throttle_seconds': round(self.throttle_seconds, 3),
+                'phases': {name: round(seconds, 3) for name, seconds in self.phases.items()},
+                'endpoints': endpoints,
+                'cache': cache_stats['session'] if cache_stats else None,
+            }
+    
+    def prometheus(self, cache_stats=None):
+        """Render the snapshot in the Prometheus text exposition format"""
+        snap = self.snapshot(cache_stats)
+        lines = [
+            '# HELP metron_request_duration_seconds Metron API request latency.',
+            '# TYPE metron_request_duration_seconds histogram',
+        ]
+        for name, stats in snap['endpoints'].items():
+            for bound, count in stats['latency_buckets'].items():
+                lines.append(f'metron_request_duration_seconds_bucket{{endpoint="{name}",le="{bound}"}} {count}')
+            lines.append(f'metron_request_duration_seconds_sum{{endpoint="{name}"}} {stats["latency_sum"]:.6f}')
+            lines.append(f'metron_request_duration_seconds_count{{endpoint="{name}"}} {stats["requests"]}')
+        for metric, key, help_text in (
+            ('metron_request_errors_total', 'errors', 'Metron API requests that failed.'),
+            ('metron_request_retries_total', 'retries', 'Metron API requests retried after a 429 or error.'),
+            ('metron_pages_total', 'pages', 'Paginated list pages fetched.'),
+            ('metron_response_bytes_total', 'bytes', 'Response bytes received.'),
+        ):
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter']
+            for name, stats in snap['endpoints'].items():
+                lines.append(f'{metric}{{endpoint="{name}"}} {stats[key]}')
+        
+        lines += [
+            '# HELP metron_throttle_seconds_total Time spent waiting on the rate limiter.',
+            '# TYPE metron_throttle_seconds_total counter',
+            f'metron_throttle_seconds_total {snap["throttle_seconds"]}',
+            '# HELP metron_phase_seconds_total Time spent in non-request phases.',
+            '# TYPE metron_phase_seconds_total counter',
+        ]
+        lines += [f'metron_phase_seconds_total{{phase="{name}"}} {seconds}'
+                  for name, seconds in snap['phases'].items()]
+        if snap['cache']:
+            lines += ['# HELP metron_cache_events_total Response cache lookups by result.',
+                      '# TYPE metron_cache_events_total counter']
+            lines += [f'metron_cache_events_total{{result="{name}"}} {value}'
+                      for name, value in snap['cache'].items()]
+        lines += [
+            '# HELP metron_run_duration_seconds Wall time of the run.',
+            '# TYPE metron_run_duration_seconds gauge',
+            f'metron_run_duration_seconds {snap["duration_seconds"]}',
+        ]
+        return '\n'.join(lines) + '\n'
+    
+    def write(self, path, cache_stats=None):
+        """Write metrics as JSON, or as a Prometheus textfile for *.prom paths"""
+        path = Path(path)
+        if path.suffix == '.prom':
+            text = self.prometheus(cache_stats)
+        else:
+            text = json.dumps(self.snapshot(cache_stats), indent=2)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        tmp_path.write_text(text)
+        os.replace(tmp_path, path)
+
+METRICS = RunMetrics()
+
+def cache_key(url, params=None):
+    """Normalize a request into the cache key format mokkari uses"""
+    if not params:
+        return url
+    return f"{url}?{urlencode(sorted(params.items()))}"
+
+def cache_endpoint(key):
+    """Map a cache key onto its CACHE_TTLS endpoint name"""
+    path = urlparse(key).path.rstrip('/')
+    segments = path.split('/api/', 1)[-1].split('/')
+    if len(segments) > 1 and segments[1].isdigit():
+        return f"{segments[0]}/detail"
+    return segments[0]
+
+class ResponseCache:
+    """SQLite response cache with per-endpoint TTLs and LRU eviction.
+    
+    Uses mokkari's key format and get/store interface, so the same file
+    can also back a mokkari session.
+    """
+    
+    def __init__(self, path=CACHE_PATH, max_bytes=CACHE_MAX_BYTES):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+        
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.con = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=NORMAL")
+        self.con.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, endpoint TEXT, json TEXT, size INTEGER, "
+            "negative INTEGER, expires_at REAL, last_access REAL)"
+        )
+        self.con.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self.con.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)")
+        # Running total of cached bytes, kept by triggers so every process sharing the file sees it
+        self.con.execute("CREATE TABLE IF NOT EXISTS cache_meta (name TEXT PRIMARY KEY, value INTEGER)")
+        self.con.executescript(
+            "CREATE TRIGGER IF NOT EXISTS responses_size_insert AFTER INSERT ON responses BEGIN "
+            "UPDATE cache_meta SET value = value + NEW.size WHERE name = 'size_bytes'; END;"
+            "CREATE TRIGGER IF NOT EXISTS responses_size_update AFTER UPDATE OF size ON responses BEGIN "
+            "UPDATE cache_meta SET value = value + NEW.size - OLD.size WHERE name = 'size_bytes'; END;"
+            "CREATE TRIGGER IF NOT EXISTS responses_size_delete AFTER DELETE ON responses BEGIN "
+            "UPDATE cache_meta SET value = value - OLD.size WHERE name = 'size_bytes'; END;"
+        )
+        # Seeded once from the table; caches created before the total existed pay one scan here
+        self.con.execute(
+            "INSERT OR IGNORE INTO cache_meta SELECT 'size_bytes', COALESCE(SUM(size), 0) FROM responses"
+        )
+        self.con.commit()
+    
+    def get(self, key):
+        """Return the cached response for key, or None on a miss"""
+        now = time.time()
+        with self.lock:
+            row = self.con.execute(
+                "SELECT json, negative, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or row[2] < now:
+                if row is not None:
+                    self.con.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    self.con.commit()
+                self.misses += 1
+                return None
+            
+            self.con.execute("UPDATE responses SET last_access = ? WHERE key = ?", (now, key))
+            self.con.commit()
+            self.hits += 1
+            if row[1]:
+                self.negative_hits += 1
+            return json.loads(row[0])
+    
+    def store(self, key, value, **kwargs):
+        """Cache a response, then evict least recently used entries over the size cap"""
+        endpoint = cache_endpoint(key)
+        negative = isinstance(value, dict) and 'results' in value and not value['results']
+        ttl = NEGATIVE_CACHE_TTL if negative else CACHE_TTLS.get(endpoint, DEFAULT_CACHE_TTL)
+        payload = json.dumps(value, separators=(',', ':'))
+        now = time.time()
+        
+        with self.lock:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete would skip the size trigger
+            self.con.execute(
+                "INSERT INTO responses VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                "endpoint = excluded.endpoint, json = excluded.json, size = excluded.size, "
+                "negative = excluded.negative, expires_at = excluded.expires_at, "
+                "last_access = excluded.last_access",
+                (key, endpoint, payload, len(payload), int(negative), now + ttl, now),
+            )
+            self._evict()
+            self.con.commit()
+    
+    def _size(self):
+        return self.con.execute("SELECT value FROM cache_meta WHERE name = 'size_bytes'").fetchone()[0]
+    
+    def _evict(self):
+        if self._size() <= self.max_bytes:
+            return
+        
+        self.con.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+        total = self._size()
+        # Walk the LRU index only as far as needed to get back under the cap
+        victims = []
+        for key, size in self.con.execute("SELECT key, size FROM responses ORDER BY last_access"):
+            if total <= self.max_bytes:
+                break
+            victims.append((key,))
+            total -= size
+        self.con.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self.evictions += len(victims)
+    
+    def stats(self):
+        """Return this session's counters alongside the lifetime totals"""
+        with self.lock:
+            entries = self.con.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            size = self._size()
+            lifetime = dict(self.con.execute("SELECT name, value FROM counters").fetchall())
+        
+        session = {
+            'hits': self.hits,
+            'misses': self.misses,
+            'negative_hits': self.negative_hits,
+            'evictions': self.evictions,
+        }
+        return {
+            'path': str(self.path),
+            'entries': entries,
+            'size_bytes': size,
+            'session': session,
+            'lifetime': {name: lifetime.get(name, 0) + value for name, value in session.items()},
+        }
+    
+    def close(self):
+        """Fold this session's counters into the lifetime totals and close"""
+        with self.lock:
+            for name, value in (('hits', self.hits), ('misses', self.misses),
+                                ('negative_hits', self.negative_hits), ('evictions', self.evictions)):
+                self.con.execute(
+                    "INSERT INTO counters VALUES (?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                    (name, value),
+                )
+            self.con.commit()
+            self.con.close()
+
+def get_cache():
+    """Return the shared response cache, or None if caching is disabled"""
+    global _cache
+    with _api_lock:
+        if _cache is None and CACHE_PATH:
+            _cache = ResponseCache(CACHE_PATH)
+        return _cache
+
+def close_cache():
+    """Flush cache counters at the end of a run"""
+    global _cache
+    with _api_lock:
+        if _cache is not None:
+            _cache.close()
+            _cache = None
+
+def get_rate_limiter():
+    """Return the token bucket shared by every Metron request in this process"""
+    global _limiter
+    with _api_lock:
+        if _limiter is None:
+            _limiter = TokenBucket(METRON_RATE_PER_MINUTE)
+        return _limiter
+
+def get_http_session():
+    """Return the shared keep-alive HTTP session for raw Metron REST calls"""
+    global _http
+    with _api_lock:
+        if _http is None:
+            _http = requests.Session()
+            _http.auth = (USERNAME, PASSWORD)
+            _http.headers['User-Agent'] = USER_AGENT
+        return _http
+
+def metron_get(url, params=None, use_cache=True):
+    """GET a Metron API URL, answering from the response cache when possible"""
+    cache = get_cache() if use_cache else None
+    key = cache_key(url, params)
+    if cache is not None:
+        data = cache.get(key)
+        if data is not None:
+            return data
     
-    # Get issues from the past week
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
+    endpoint = cache_endpoint(key)
+    limiter = get_rate_limiter()
+    for attempt in range(MAX_RETRIES + 1):
+        METRICS.record_throttle(limiter.acquire())
+        started = time.monotonic()
+        try:
+            response = get_http_session().get(url, params=params, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException:
+            METRICS.record_request(endpoint, time.monotonic() - started, 0, ok=False)
+            raise
+        METRICS.record_request(endpoint, time.monotonic() - started, len(response.content), ok=response.ok)
+        if response.status_code != 429 or attempt == MAX_RETRIES:
+            break
+        METRICS.record_retry(endpoint)
+        limiter.drain()
+        retry_after = response.headers.get('Retry-After', '')
+        delay = int(retry_after) if retry_after.isdigit() else RETRY_DELAY * (2 ** attempt)
+        time.sleep(delay)
+        METRICS.record_throttle(delay)
+    response.raise_for_status()
+    started = time.monotonic()
+    data = response.json()
+    METRICS.add_phase('decode', time.monotonic() - started)
+    if 'results' in data:
+        METRICS.record_page(endpoint)
+    if RECORD_DIR:
+        record_response(response, data)
     
+    if cache is not None:
+        cache.store(key, data)
+    return data
+
+def record_response(response, data):
+    """Save a response for replay, keyed by path and sorted query string"""
+    url = urlparse(response.url)
+    query = sorted(parse_qsl(url.query))
+    name = hashlib.sha1(f"{url.path}?{urlencode(query)}".encode('utf-8')).hexdigest()
+    _write_json_atomic(Path(RECORD_DIR) / f"{name}.json", {
+        'path': url.path,
+        'query': query,
+        'status': response.status_code,
+        'body': data,
+    })
+
+def iter_pages(endpoint, params):
+    """Yield the results of a paginated Metron list endpoint one page at a time.
+    
+    mokkari's *_list helpers only return once every page has been fetched,
+    so paging is done here so callers can act on each page as it arrives.
+    """
+    url = f"{METRON_API_URL}{endpoint}/"
+    query = dict(params)
+    
+    while url:
+        data = metron_get(url, query)
+        yield data.get('results', [])
+        
+        # The next link already carries the full query string
+        url = data.get('next')
+        query = None
+
+def _name(value):
+    """Flatten a nested {id, name} resource into its name"""
+    if isinstance(value, dict):
+        return value.get('name')
+    return value
+
+def issue_record(issue):
+    """Convert a raw Metron issue payload into our issue record"""
+    return {
+        'id': issue.get('id'),
+        'issue_name': issue.get('issue') or issue.get('name'),
+        'series_name': _name(issue.get('series')),
+        'number': issue.get('number'),
+        'publisher': _name(issue.get('publisher')),
+        'store_date': str(issue.get('store_date')),
+        'cover_date': str(issue.get('cover_date')),
+        'description': issue.get('desc', ''),
+        'cover_url': issue.get('image', ''),
+        'modified': issue.get('modified'),
+    }
+
+class ShardError(Exception):
+    """Raised after a sharded fetch has yielded every shard that succeeded"""
+    
+    def __init__(self, failed):
+        self.failed = failed
+        ranges = ', '.join(f"{first.isoformat()}..{last.isoformat()}" for first, last in failed)
+        super().__init__(f"{len(failed)} shard(s) failed: {ranges}")
+
+def date_shards(start, end, shard_days=SHARD_DAYS):
+    """Split an inclusive date range into consecutive (first, last) shards"""
+    shards = []
+    first = start
+    while first <= end:
+        last = min(end, first + timedelta(days=max(1, shard_days) - 1))
+        shards.append((first, last))
+        first = last + timedelta(days=1)
+    return shards
+
+def fetch_issue_shard(first, last):
+    """Fetch every issue record with a store date in [first, last], retrying the shard"""
     params = {
-        "store_date_range_after": start_date.strftime("%Y-%m-%d"),
-        "store_date_range_before": end_date.strftime("%Y-%m-%d"),
+        "store_date_range_after": first.isoformat(),
+        "store_date_range_before": last.isoformat(),
     }
+    for attempt in range(SHARD_RETRIES + 1):
+        try:
+            records = []
+            for page in iter_pages('issue', params):
+                records.extend(issue_record(issue) for issue in page)
+            return records
+        except Exception:
+            if attempt == SHARD_RETRIES:
+                raise
+            METRICS.record_retry('issue')
+            # Pages that already succeeded come back from the response cache
+            time.sleep(RETRY_DELAY * (2 ** attempt))
+
+def iter_sharded_issue_pages(start, end, shard_days=SHARD_DAYS, workers=MAX_WORKERS):
+    """Fetch a store date window as parallel shards, yielding one page per shard.
     
+    Shards are yielded as they finish and deduped by issue id. A shard that
+    still fails after its retries is skipped; once every other shard has
+    been yielded a ShardError names the failed ranges.
+    """
+    shards = date_shards(start, end, shard_days)
+    seen = set()
+    failed = []
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(fetch_issue_shard, first, last): (first, last) for first, last in shards}
+        for future in as_completed(futures):
+            try:
+                records = future.result()
+            except Exception as e:
+                first, last = futures[future]
+                print(f"ERROR fetching shard {first}..{last}: {e}", file=sys.stderr)
+                failed.append(futures[future])
+                continue
+            
+            page = [record for record in records if record['id'] not in seen]
+            seen.update(record['id'] for record in page)
+            yield page
+    
+    if failed:
+        raise ShardError(sorted(failed))
+
+def iter_recent_issue_pages(days=7, shard_days=SHARD_DAYS, workers=MAX_WORKERS):
+    """Yield pages of recent issue records as they arrive from Metron"""
+    end = datetime.now().date()
+    yield from iter_sharded_issue_pages(end - timedelta(days=days), end, shard_days, workers)
+
+def _write_json_atomic(path, data):
+    """Write compact JSON to a temp file and rename it into place"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+
+def load_sync_state(state_dir=SYNC_STATE_DIR):
+    """Load the incremental sync cursor, or an empty state on first run"""
+    path = Path(state_dir) / SYNC_STATE_FILE
+    if path.exists():
+        with open(path, 'r') as f:
+            return json.load(f)
+    return {"cursor": {"store_date": None, "modified": None}, "synced": {}, "last_run": None}
+
+def _bucket_path(state_dir, day):
+    return Path(state_dir) / 'days' / f"{day.isoformat()}.json"
+
+def _parse_day(value):
+    """Parse a YYYY-MM-DD store date, returning None for missing dates"""
     try:
-        issues = m.issues_list(params=params)
-        results = []
-        
-        for issue in issues:
-            results.append({
-                'id': issue.id,
-                'issue_name': issue.issue_name,
-                'series_name': issue.series,
-                'number': issue.number,
-                'publisher': issue.publisher,
-                'store_date': str(issue.store_date),
-                'cover_date': str(issue.cover_date),
-                'description': getattr(issue, 'desc', ''),
-                'cover_url': getattr(issue, 'image', ''),
-            })
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+def _date_runs(days):
+    """Group sorted dates into contiguous (first, last) runs"""
+    runs = []
+    for day in days:
+        if runs and day - runs[-1][1] == timedelta(days=1):
+            runs[-1][1] = day
+        else:
+            runs.append([day, day])
+    return [(first, last) for first, last in runs]
+
+def iter_incremental_issue_pages(days=7, state_dir=SYNC_STATE_DIR, shard_days=SHARD_DAYS, workers=MAX_WORKERS):
+    """Yield pages of recent issue records, fetching only the unsynced tail.
+    
+    Days whose bucket was last synced after the day settled are served
+    from disk without a request. Other days that have a bucket only ask
+    Metron for issues modified since the cursor (so a bucket synced before
+    its day settled picks up late changes even after missed runs); days
+    with no bucket are fetched in full. Buckets, their sync dates and the
+    cursor are written once the whole window has synced.
+    """
+    state_dir = Path(state_dir)
+    state = load_sync_state(state_dir)
+    cursor = state.get("cursor") or {}
+    synced = state.get("synced") or {}
+    
+    today = datetime.now().date()
+    window = [today - timedelta(days=offset) for offset in range(days, -1, -1)]
+    
+    full_fetch = []
+    changed_only = {}
+    for day in window:
+        path = _bucket_path(state_dir, day)
+        # A bucket is final only if it was synced once its day had settled
+        synced_on = _parse_day(synced.get(day.isoformat()))
+        if not path.exists():
+            full_fetch.append(day)
+        elif synced_on and day < synced_on - timedelta(days=SETTLE_DAYS):
+            with open(path, 'r') as f:
+                yield json.load(f)
+        elif cursor.get("modified"):
+            with open(path, 'r') as f:
+                changed_only[day] = {record['id']: record for record in json.load(f)}
+        else:
+            full_fetch.append(day)
+    
+    buckets = {day: {} for day in full_fetch}
+    
+    for first, last in _date_runs(full_fetch):
+        for records in iter_sharded_issue_pages(first, last, shard_days, workers):
+            for record in records:
+                bucket = buckets.get(_parse_day(record['store_date']))
+                if bucket is not None:
+                    bucket[record['id']] = record
+            yield records
+    
+    if changed_only:
+        params = {
+            "store_date_range_after": min(changed_only).isoformat(),
+            "store_date_range_before": max(changed_only).isoformat(),
+            "modified_gt": cursor["modified"],
+        }
+        for page in iter_pages('issue', params):
+            for issue in page:
+                record = issue_record(issue)
+                bucket = changed_only.get(_parse_day(record['store_date']))
+                if bucket is not None:
+                    bucket[record['id']] = record
+        for day in sorted(changed_only):
+            yield list(changed_only[day].values())
+        buckets.update(changed_only)
+    
+    # Persist only after every request succeeded, so a failed run resyncs
+    for day, records in buckets.items():
+        ordered = sorted(records.values(), key=lambda record: record['id'])
+        _write_json_atomic(_bucket_path(state_dir, day), ordered)
+        synced[day.isoformat()] = today.isoformat()
+        for record in ordered:
+            if record['store_date'] > (cursor.get("store_date") or ''):
+                cursor["store_date"] = record['store_date']
+            if record.get('modified') and record['modified'] > (cursor.get("modified") or ''):
+                cursor["modified"] = record['modified']
+    
+    state["cursor"] = cursor
+    state["synced"] = synced
+    state["last_run"] = datetime.now().isoformat()
+    _write_json_atomic(state_dir / SYNC_STATE_FILE, state)
+
+def _resources(items):
+    return [{'id': item.get('id'), 'name': item.get('name')} for item in items or []]
+
+class EntityMemo:
+    """Per-run memo so each creator or character is fetched at most once.
+    
+    Concurrent requests for the same entity wait on the first fetch
+    instead of issuing their own. Failures are not memoized: the waiters
+    of a failed fetch see its error, and the next request tries again.
+    """
+    
+    def __init__(self):
+        self.futures = {}
+        self.lock = threading.Lock()
+    
+    def get(self, kind, entity_id, fetch):
+        key = (kind, entity_id)
+        with self.lock:
+            future = self.futures.get(key)
+            owner = future is None
+            if owner:
+                future = self.futures[key] = Future()
         
-        return results
+        if owner:
+            try:
+                future.set_result(fetch())
+            except Exception as e:
+                with self.lock:
+                    del self.futures[key]
+                future.set_exception(e)
+        return future.result()
+
+def fetch_entity(kind, entity_id):
+    """Fetch a creator or character and keep the fields we store"""
+    data = metron_get(f"{METRON_API_URL}{kind}/{entity_id}/")
+    return {
+        'id': data.get('id'),
+        'name': data.get('name'),
+        'alias': data.get('alias', []),
+        'image': data.get('image', ''),
+    }
+
+def enrich_issue(record, memo=None):
+    """Add credits, characters, story arcs and variants from the issue detail.
+    
+    With a memo, full creator and character records are attached as well.
+    """
+    detail = metron_get(f"{METRON_API_URL}issue/{record['id']}/")
+    
+    enriched = dict(record)
+    enriched['publisher'] = _name(detail.get('publisher')) or record.get('publisher')
+    enriched['description'] = detail.get('desc') or record.get('description', '')
+    enriched['credits'] = [
+        {
+            'creator_id': credit.get('id'),
+            'creator': credit.get('creator'),
+            'roles': [_name(role) for role in credit.get('role', [])],
+        }
+        for credit in detail.get('credits', [])
+    ]
+    enriched['characters'] = _resources(detail.get('characters'))
+    enriched['story_arcs'] = _resources(detail.get('arcs'))
+    enriched['variants'] = [
+        {
+            'name': variant.get('name'),
+            'sku': variant.get('sku'),
+            'upc': variant.get('upc'),
+            'cover_url': variant.get('image', ''),
+        }
+        for variant in detail.get('variants', [])
+    ]
+    
+    if memo is not None:
+        # A failed entity fetch leaves only that credit or character unenriched
+        for credit in enriched['credits']:
+            if credit['creator_id'] is not None:
+                try:
+                    credit['creator_detail'] = memo.get(
+                        'creator', credit['creator_id'],
+                        lambda: fetch_entity('creator', credit['creator_id']))
+                except Exception as e:
+                    print(f"ERROR fetching creator {credit['creator_id']}: {e}", file=sys.stderr)
+        for character in enriched['characters']:
+            if character['id'] is not None:
+                try:
+                    character.update(memo.get(
+                        'character', character['id'],
+                        lambda: fetch_entity('character', character['id'])))
+                except Exception as e:
+                    print(f"ERROR fetching character {character['id']}: {e}", file=sys.stderr)
+    
+    return enriched
+
+def iter_enriched_pages(pages, workers=MAX_WORKERS, entities=False):
+    """Enrich each page of issue records with a bounded pool of detail fetches.
+    
+    Every fetch goes through the shared token bucket, so adding workers
+    only helps up to Metron's rate limit. An issue whose detail fetch
+    fails is passed through with its list-level fields.
+    """
+    memo = EntityMemo() if entities else None
+    
+    def enrich(record):
+        try:
+            return enrich_issue(record, memo)
+        except Exception as e:
+            print(f"ERROR enriching issue {record.get('id')}: {e}", file=sys.stderr)
+            return record
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for page in pages:
+            yield list(pool.map(enrich, page))
+
+def _recent_pages(days, incremental=False, state_dir=SYNC_STATE_DIR, enrich=False,
+                  workers=MAX_WORKERS, entities=False, shard_days=SHARD_DAYS):
+    """Pick the page source for a recent-issues run and layer enrichment on top"""
+    if incremental:
+        pages = iter_incremental_issue_pages(days, state_dir, shard_days, workers)
+    else:
+        pages = iter_recent_issue_pages(days, shard_days, workers)
+    if enrich:
+        pages = iter_enriched_pages(pages, workers, entities)
+    return pages
+
+def fetch_recent_issues(days=7, **options):
+    """Fetch recent issues from Metron DB (options as for _recent_pages).
+    
+    On failure the error goes to stderr and whatever was fetched before it
+    is still returned.
+    """
+    if not USERNAME or not PASSWORD:
+        print("ERROR: METRON_USERNAME and METRON_PASSWORD required", file=sys.stderr)
+        return []
+    
+    results = []
+    try:
+        for page in _recent_pages(days, **options):
+            results.extend(page)
     except Exception as e:
         print(f"ERROR fetching issues: {e}", file=sys.stderr)
-        return []
+    return results
 
-def fetch_series_by_name(series_name):
-    """Fetch series information by name"""
+def stream_recent_issues(days=7, output=None, compress=False, fmt='ndjson', **options):
+    """Write recent issues as NDJSON or record batches, flushing after every page.
+    
+    Returns the number of records written, or None if the crawl failed
+    part way (records already written stay valid lines or batches).
+    """
     if not USERNAME or not PASSWORD:
         print("ERROR: METRON_USERNAME and METRON_PASSWORD required", file=sys.stderr)
         return None
     
-    m = mokkari.api(username=USERNAME, passwd=PASSWORD)
+    raw = open(output, 'wb') if output else sys.stdout.buffer
+    out = gzip.GzipFile(fileobj=raw, mode='wb') if compress else raw
+    batches = RecordBatchWriter(out, 'metron-issues') if fmt == 'msgpack' else None
+    written = 0
+    try:
+        for page in _recent_pages(days, **options):
+            started = time.monotonic()
+            if batches is not None:
+                batches.write_batch(page)
+            else:
+                for record in page:
+                    out.write(json.dumps(record, separators=(',', ':')).encode('utf-8') + b'\n')
+            written += len(page)
+            # Sync-flush so consumers can decode everything sent so far
+            out.flush()
+            METRICS.add_phase('serialize', time.monotonic() - started)
+        if batches is not None:
+            batches.close()
+        return written
+    except Exception as e:
+        print(f"ERROR fetching issues: {e}", file=sys.stderr)
+        return None
+    finally:
+        if compress:
+            # Writes the gzip trailer without closing the underlying stream
+            out.close()
+        if output:
+            raw.close()
+        else:
+            raw.flush()
+
+class CatalogStore:
+    """SQLite store for backfilled issues plus the crawl checkpoints.
+    
+    Each page of records is written in the same transaction as the
+    checkpoint that points past it, so an interrupted crawl never loses
+    or repeats more than the page in flight.
+    """
+    
+    DONE = 'done'
+    
+    def __init__(self, path=CATALOG_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.con = sqlite3.connect(str(self.path))
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute(
+            "CREATE TABLE IF NOT EXISTS issues ("
+            "id INTEGER PRIMARY KEY, series_name TEXT, store_date TEXT, modified TEXT, record TEXT)"
+        )
+        self.con.execute("CREATE INDEX IF NOT EXISTS issues_store_date ON issues (store_date)")
+        self.con.execute("CREATE TABLE IF NOT EXISTS series (id INTEGER PRIMARY KEY, name TEXT, record TEXT)")
+        self.con.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints (key TEXT PRIMARY KEY, position TEXT, updated_at TEXT)"
+        )
+        self.con.commit()
+    
+    def checkpoint(self, key):
+        row = self.con.execute("SELECT position FROM checkpoints WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+    
+    def save_page(self, key, position, issues=(), series=()):
+        """Upsert a page of records and move the checkpoint in one transaction"""
+        with self.con:
+            self.con.executemany(
+                "INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?)",
+                [(record['id'], record['series_name'], record['store_date'], record.get('modified'),
+                  json.dumps(record, separators=(',', ':'))) for record in issues],
+            )
+            self.con.executemany(
+                "INSERT OR REPLACE INTO series VALUES (?, ?, ?)",
+                [(record['id'], record['name'], json.dumps(record, separators=(',', ':')))
+                 for record in series],
+            )
+            self.con.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)",
+                (key, position, datetime.now().isoformat()),
+            )
+    
+    def series_ids(self):
+        return [row[0] for row in self.con.execute("SELECT id FROM series ORDER BY id")]
+    
+    def counts(self):
+        issues = self.con.execute("SELECT COUNT(*) FROM issues").fetchone()[0]
+        series = self.con.execute("SELECT COUNT(*) FROM series").fetchone()[0]
+        return {'issues': issues, 'series': series}
+    
+    def close(self):
+        self.con.close()
+
+def crawl_pages(store, key, endpoint, params, kind='issue', final=True):
+    """Walk one paginated query, resuming from and checkpointing after every page.
+    
+    With final=False the query is never marked done, so it is walked again
+    on the next run (used for windows that are still receiving issues).
+    """
+    position = store.checkpoint(key)
+    if position == CatalogStore.DONE:
+        return 0
     
+    url, query = (position, None) if position else (f"{METRON_API_URL}{endpoint}/", dict(params))
+    fetched = 0
+    while url:
+        for attempt in range(SHARD_RETRIES + 1):
+            try:
+                # Catalog pages are read once, so keep them out of the response cache
+                data = metron_get(url, query, use_cache=False)
+                break
+            except Exception:
+                if attempt == SHARD_RETRIES:
+                    raise
+                METRICS.record_retry(endpoint)
+                time.sleep(RETRY_DELAY * (2 ** attempt))
+        
+        results = data.get('results', [])
+        next_url = data.get('next')
+        done = CatalogStore.DONE if final else None
+        if kind == 'series':
+            store.save_page(key, next_url or done, series=[series_record(item) for item in results])
+        else:
+            store.save_page(key, next_url or done, issues=[issue_record(item) for item in results])
+        
+        fetched += len(results)
+        print(f"  {key}: {fetched} {kind} records", file=sys.stderr)
+        url, query = next_url, None
+    return fetched
+
+def list_series(store):
+    """List series into the catalog store, resuming an interrupted listing.
+    
+    The first run lists every series; later runs list only the series
+    modified since the previous listing started, so series created after
+    the first backfill are picked up too.
+    """
+    if store.checkpoint('series-list') != CatalogStore.DONE:
+        key, params = 'series-list', {}
+    else:
+        # Stores listed before the cursor existed re-list everything once
+        since = store.checkpoint('series-list:since') or BACKFILL_START
+        key, params = f"series-list:modified>{since}", {'modified_gt': since}
+    if store.checkpoint(key) is None:
+        started = datetime.now(timezone.utc) - SERIES_LIST_OVERLAP
+        store.save_page('series-list:started', started.isoformat())
+    crawl_pages(store, key, 'series', params, kind='series')
+    # Only a finished listing moves the cursor; an interrupted one resumes under the same key
+    store.save_page('series-list:since', store.checkpoint('series-list:started'))
+
+def backfill_catalog(by='date', start=BACKFILL_START, end=None,
+                     window_days=BACKFILL_WINDOW_DAYS, store_path=CATALOG_PATH):
+    """Mirror the Metron issue catalog into the local catalog store.
+    
+    by='date' walks store date windows from start to end; by='series'
+    lists series (only new or modified ones after the first run), then
+    walks the issues of each series not walked yet. Rerunning picks up at
+    the last saved page.
+    """
+    store = CatalogStore(store_path)
     try:
-        series_list = m.series_list(params={'name': series_name})
-        if series_list:
-            return {
-                'id': series_list[0].id,
-                'name': series_list[0].name,
-                'publisher': series_list[0].publisher,
-                'year_began': series_list[0].year_began,
-                'issue_count': series_list[0].issue_count,
-                'volume': series_list[0].volume,
-            }
+        if by == 'series':
+            list_series(store)
+            for series_id in store.series_ids():
+                crawl_pages(store, f"series:{series_id}", 'issue', {'series_id': series_id})
+        else:
+            first = datetime.strptime(start, "%Y-%m-%d").date()
+            last = datetime.strptime(end, "%Y-%m-%d").date() if end else datetime.now().date()
+            settled_before = datetime.now().date() - timedelta(days=SETTLE_DAYS)
+            for window_start, window_end in date_shards(first, last, window_days):
+                params = {
+                    "store_date_range_after": window_start.isoformat(),
+                    "store_date_range_before": window_end.isoformat(),
+                }
+                crawl_pages(store, f"date:{window_start}..{window_end}", 'issue', params,
+                            final=window_end < settled_before)
+        return store.counts()
+    finally:
+        store.close()
+
+def series_record(series):
+    """Convert a raw Metron series payload into our series record"""
+    return {
+        'id': series.get('id'),
+        'name': series.get('name') or series.get('series'),
+        'publisher': _name(series.get('publisher')),
+        'year_began': series.get('year_began'),
+        'issue_count': series.get('issue_count'),
+        'volume': series.get('volume'),
+    }
+
+def normalize_series_name(name):
+    """Split a raw series name into a comparable key and an optional year hint.
+    
+    "The Amazing Spider-Man (1963)" -> ("amazing spider man", 1963)
+    """
+    year = None
+    match = re.search(r'\((\d{4})\)\s*$', name)
+    if match:
+        year = int(match.group(1))
+        name = name[:match.start()]
+    
+    key = re.sub(r'[^a-z0-9]+', ' ', name.lower()).strip()
+    key = re.sub(r'^the ', '', key)
+    return key, year
+
+def is_exact_match(query_key, year, series):
+    """True when a series has the same normalized name and, if a year was given, began that year"""
+    candidate_key, candidate_year = normalize_series_name(series['name'] or '')
+    return candidate_key == query_key and (not year or (series.get('year_began') or candidate_year) == year)
+
+def match_confidence(query_key, year, series):
+    """Score how well a Metron series matches a normalized query, 0.0 to 1.0"""
+    candidate_key, candidate_year = normalize_series_name(series['name'] or '')
+    score = SequenceMatcher(None, query_key, candidate_key).ratio()
+    
+    candidate_year = series.get('year_began') or candidate_year
+    if year and candidate_year:
+        score = min(1.0, score + 0.1) if year == candidate_year else score * 0.8
+    return round(score, 3)
+
+def resolve_series(name):
+    """Find the best Metron match for a series name.
+    
+    Returns {"query", "match", "confidence", "candidates"}; ties on
+    confidence go to the series with more issues.
+    """
+    query_key, year = normalize_series_name(name)
+    resolution = {'query': query_key, 'match': None, 'confidence': 0.0, 'candidates': 0}
+    if not query_key:
+        return resolution
+    
+    # Search without the year hint (used for scoring instead) or a leading article, which
+    # normalization drops too: "The Amazing Spider-Man (1970)" searches "Amazing Spider-Man"
+    search = re.sub(r'^the\s+', '', re.sub(r'\(\d{4}\)\s*$', '', name).strip(), flags=re.IGNORECASE)
+    candidates = []
+    for page_number, page in enumerate(iter_pages('series', {'name': search}), 1):
+        candidates.extend(series_record(series) for series in page)
+        # Stop paging once a candidate matches the normalized name (and year, when given)
+        if any(is_exact_match(query_key, year, series) for series in candidates) or \
+                page_number >= SERIES_SEARCH_PAGES:
+            break
+    resolution['candidates'] = len(candidates)
+    
+    scored = [(match_confidence(query_key, year, series), series.get('issue_count') or 0, series)
+              for series in candidates]
+    if scored:
+        confidence, _, best = max(scored, key=lambda item: (item[0], item[1]))
+        resolution['match'] = best
+        resolution['confidence'] = confidence
+    return resolution
+
+def fetch_series_by_name(series_name):
+    """Fetch series information by name"""
+    if not USERNAME or not PASSWORD:
+        print("ERROR: METRON_USERNAME and METRON_PASSWORD required", file=sys.stderr)
         return None
+    
+    try:
+        return resolve_series(series_name)['match']
     except Exception as e:
         print(f"ERROR fetching series: {e}", file=sys.stderr)
         return None
 
-if __name__ == '__main__':
-    command = sys.argv[1] if len(sys.argv) > 1 else 'recent'
+def resolve_series_batch(names, workers=MAX_WORKERS):
+    """Resolve many series names at once, looking each normalized name up once.
     
-    if command == 'recent':
-        days = int(sys.argv[2]) if len(sys.argv) > 2 else 7
-        issues = fetch_recent_issues(days)
-        print(json.dumps(issues, indent=2))
+    Returns a mapping of every input name to its resolution; names that
+    normalize to the same key share one lookup.
+    """
+    if not USERNAME or not PASSWORD:
+        print("ERROR: METRON_USERNAME and METRON_PASSWORD required", file=sys.stderr)
+        return {}
     
-    elif command == 'series':
-        if len(sys.argv) < 3:
-            print("ERROR: series name required", file=sys.stderr)
-            sys.exit(1)
-        series_name = sys.argv[2]
-        series = fetch_series_by_name(series_name)
-        print(json.dumps(series, indent=2))
+    by_key = {}
+    for name in names:
+        name = name.strip()
+        if name:
+            by_key.setdefault(normalize_series_name(name), name)
+    
+    def resolve(name):
+        try:
+            return resolve_series(name)
+        except Exception as e:
+            print(f"ERROR fetching series '{name}': {e}", file=sys.stderr)
+            return {'query': normalize_series_name(name)[0], 'match': None,
+                    'confidence': 0.0, 'candidates': 0, 'error': str(e)}
+    
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        resolved = dict(zip(by_key, pool.map(resolve, by_key.values())))
+    
+    return {name.strip(): resolved[normalize_series_name(name.strip())]
+            for name in names if name.strip()}
+
+def handle_request(request):
+    """Answer a single worker request dict with a response dict"""
+    request_id = request.get('id')
+    command = request.get('command')
     
+    # Lookups here raise instead of printing and returning partial results (as the one-shot
+    # CLI helpers do), so failures reach serve_lines and come back as ok: false
+    if command == 'recent':
+        pages = _recent_pages(
+            int(request.get('days', 7)),
+            incremental=bool(request.get('incremental')),
+            enrich=bool(request.get('enrich')),
+            entities=bool(request.get('entities')),
+        )
+        result = [record for page in pages for record in page]
+    elif command == 'series':
+        if not request.get('name'):
+            return {'id': request_id, 'ok': False, 'error': 'series name required'}
+        result = resolve_series(request['name'])['match']
+    elif command == 'series-batch':
+        result = resolve_series_batch(request.get('names') or [])
+    elif command == 'cache-stats':
+        cache = get_cache()
+        result = cache.stats() if cache is not None else None
+    elif command == 'metrics':
+        cache = get_cache()
+        result = METRICS.snapshot(cache.stats() if cache is not None else None)
+    elif command == 'ping':
+        result = 'pong'
     else:
-        print(f"ERROR: Unknown command '{command}'", file=sys.stderr)
+        return {'id': request_id, 'ok': False, 'error': f"Unknown command '{command}'"}
+    
+    return {'id': request_id, 'ok': True, 'result': result}
+
+def serve_lines(infile, outfile):
+    """Read JSON requests line by line and write one JSON response per line"""
+    for line in infile:
+        line = line.strip()
+        if not line:
+            continue
+        # Errors echo the request id so clients can match them; only unparseable lines get None
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+            request_id = request.get('id')
+            response = handle_request(request)
+        except Exception as e:
+            response = {'id': request_id, 'ok': False, 'error': str(e)}
+        outfile.write(json.dumps(response) + '\n')
+        outfile.flush()
+
+class _SocketWriter:
+    """Text adapter over a socket's binary write file"""
+    def __init__(self, wfile):
+        self.wfile = wfile
+
+    def write(self, text):
+        self.wfile.write(text.encode('utf-8'))
+
+    def flush(self):
+        self.wfile.flush()
+
+class _WorkerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        reader = (line.decode('utf-8') for line in self.rfile)
+        serve_lines(reader, _SocketWriter(self.wfile))
+
+def run_worker(socket_path=None):
+    """Serve requests on stdin/stdout, or on a Unix socket if a path is given"""
+    if not USERNAME or not PASSWORD:
+        print("ERROR: METRON_USERNAME and METRON_PASSWORD required", file=sys.stderr)
         sys.exit(1)
+    
+    # Open the session and cache up front so the first request doesn't pay for it
+    get_http_session()
+    get_cache()
+    
+    if socket_path is None:
+        serve_lines(sys.stdin, sys.stdout)
+        return
+    
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    with socketserver.ThreadingUnixStreamServer(socket_path, _WorkerHandler) as server:
+        print(f"Metron worker listening on {socket_path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.unlink(socket_path)
+
+def build_parser():
+    """Build the command line parser"""
+    parser = argparse.ArgumentParser(description="Metron DB expansion service")
+    parser.add_argument('--no-cache', action='store_true', help="bypass the response cache")
+    parser.add_argument('--metrics', default=os.getenv('METRON_METRICS'),
+                        help="write run metrics to this file at exit (Prometheus textfile if *.prom)")
+    commands = parser.add_subparsers(dest='command')
+    
+    recent = commands.add_parser('recent', help="issues released in the past N days")
+    recent.add_argument('days', nargs='?', type=int, default=7)
+    recent.add_argument('--stream', action='store_true',
+                        help="write one compact JSON object per line as pages arrive")
+    recent.add_argument('--gzip', action='store_true', help="gzip the streamed output")
+    recent.add_argument('--format', choices=('ndjson', 'msgpack'), default='ndjson',
+                        help="streamed output format; msgpack writes record batches (see recordBatches.py)")
+    recent.add_argument('--output', help="write streamed output to a file instead of stdout")
+    recent.add_argument('--incremental', action='store_true',
+                        help="only fetch days not already synced into the state directory")
+    recent.add_argument('--state-dir', type=Path, default=SYNC_STATE_DIR,
+                        help=f"incremental sync state directory (default: {SYNC_STATE_DIR})")
+    recent.add_argument('--enrich', action='store_true',
+                        help="add credits, characters, story arcs and variants from issue details")
+    recent.add_argument('--entities', action='store_true',
+                        help="with --enrich, also fetch each creator and character once")
+    recent.add_argument('--workers', type=int, default=MAX_WORKERS,
+                        help=f"concurrent shard and detail fetches (default: {MAX_WORKERS})")
+    recent.add_argument('--shard-days', type=int, default=SHARD_DAYS,
+                        help=f"split the window into shards of this many days (default: {SHARD_DAYS})")
+    
+    series = commands.add_parser('series', help="look up a series by name")
+    series.add_argument('name')
+    
+    batch = commands.add_parser('series-batch', help="resolve many series names, one per line")
+    batch.add_argument('file', nargs='?', default='-', help="file of series names (default: stdin)")
+    batch.add_argument('--output', help="write the name mapping to a file instead of stdout")
+    batch.add_argument('--workers', type=int, default=MAX_WORKERS,
+                       help=f"concurrent lookups (default: {MAX_WORKERS})")
+    
+    worker = commands.add_parser('worker', help="serve line-delimited JSON requests")
+    worker.add_argument('--socket', help="listen on a Unix socket instead of stdin/stdout")
+    
+    backfill = commands.add_parser('backfill', help="mirror the full issue catalog, resumably")
+    backfill.add_argument('--by', choices=('date', 'series'), default='date',
+                          help="walk store date windows or every series (default: date)")
+    backfill.add_argument('--start', default=BACKFILL_START,
+                          help=f"first store date for --by date (default: {BACKFILL_START})")
+    backfill.add_argument('--end', help="last store date for --by date (default: today)")
+    backfill.add_argument('--window-days', type=int, default=BACKFILL_WINDOW_DAYS,
+                          help=f"days per store date window (default: {BACKFILL_WINDOW_DAYS})")
+    backfill.add_argument('--store', type=Path, default=CATALOG_PATH,
+                          help=f"catalog database (default: {CATALOG_PATH})")
+    
+    commands.add_parser('cache-stats', help="print response cache size and hit/miss counters")
+    
+    return parser
+
+def main(argv=None):
+    """Main entry point"""
+    global CACHE_PATH
+    argv = sys.argv[1:] if argv is None else argv
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args = parser.parse_args(argv + ['recent'])
+    if args.no_cache:
+        CACHE_PATH = ''
+    
+    try:
+        run_command(args)
+    finally:
+        if args.metrics:
+            cache = get_cache() if CACHE_PATH else None
+            METRICS.write(args.metrics, cache.stats() if cache is not None else None)
+        close_cache()
+
+def emit_json(data, output=None):
+    """Print pretty JSON (or write it to a file), timing the serialization"""
+    started = time.monotonic()
+    text = json.dumps(data, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    METRICS.add_phase('serialize', time.monotonic() - started)
+
+def run_command(args):
+    """Dispatch a parsed command line"""
+    if args.command == 'recent':
+        options = {
+            'incremental': args.incremental,
+            'state_dir': args.state_dir,
+            'enrich': args.enrich or args.entities,
+            'workers': args.workers,
+            'entities': args.entities,
+            'shard_days': args.shard_days,
+        }
+        if args.stream or args.gzip or args.output or args.format != 'ndjson':
+            if args.format == 'msgpack':
+                try:
+                    require_msgpack()
+                except RuntimeError as e:
+                    print(f"ERROR: {e}", file=sys.stderr)
+                    sys.exit(1)
+            if stream_recent_issues(args.days, args.output, args.gzip, args.format, **options) is None:
+                sys.exit(1)
+        else:
+            issues = fetch_recent_issues(args.days, **options)
+            emit_json(issues)
+    
+    elif args.command == 'series':
+        series = fetch_series_by_name(args.name)
+        emit_json(series)
+    
+    elif args.command == 'series-batch':
+        if args.file == '-':
+            names = sys.stdin.read().splitlines()
+        else:
+            with open(args.file, 'r', encoding='utf-8') as f:
+                names = f.read().splitlines()
+        mapping = resolve_series_batch(names, args.workers)
+        emit_json(mapping, args.output)
+    
+    elif args.command == 'backfill':
+        if not USERNAME or not PASSWORD:
+            print("ERROR: METRON_USERNAME and METRON_PASSWORD required", file=sys.stderr)
+            sys.exit(1)
+        try:
+            counts = backfill_catalog(args.by, args.start, args.end, args.window_days, args.store)
+        except KeyboardInterrupt:
+            print("Backfill interrupted; progress saved, run again to resume", file=sys.stderr)
+            sys.exit(0)
+        except Exception as e:
+            print(f"ERROR during backfill: {e}; progress saved, run again to resume", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(counts, indent=2))
+    
+    elif args.command == 'worker':
+        run_worker(args.socket)
+    
+    elif args.command == 'cache-stats':
+        cache = get_cache()
+        print(json.dumps(cache.stats() if cache is not None else None, indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Metron Stand-in Server
+Serves Metron-shaped REST responses locally so the Metron client can be
+load-tested and benchmarked without touching the real API quota
+
+Usage:
+    python metronFakeServer.py [--port 8000] [--issues 2000] [--series 50]
+                               [--page-size 100] [--latency-ms 0] [--jitter-ms 0]
+                               [--rate-429 0.0] [--retry-after 1]
+    python metronFakeServer.py --replay DIR     # serve recorded responses
+
+Point the client at it with METRON_API_URL=http://127.0.0.1:PORT/api/.
+
+Synthetic mode generates a deterministic catalog (seeded) and supports the
+filters metronExpansion.py uses: store_date_range_after/before, modified_gt,
+series_id and name. Replay mode serves responses captured by running
+metronExpansion.py with METRON_RECORD_DIR set; requests that were never
+recorded get a 404.
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+from pathlib import Path
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+SERIES_NAMES = [
+    "Amazing Spider-Man", "Batman", "Detective Comics", "X-Men", "Fantastic Four",
+    "Action Comics", "Wonder Woman", "Avengers", "Saga", "Hellboy",
+    "Daredevil", "Green Lantern", "Flash", "Iron Man", "Superman",
+    "Teenage Mutant Ninja Turtles", "Invincible", "Thor", "Captain America", "Nightwing",
+]
+CREATOR_NAMES = ["Stan Lee", "Jack Kirby", "Steve Ditko", "Chris Claremont", "Frank Miller",
+                 "Jim Lee", "Grant Morrison", "Brian K. Vaughan", "Fiona Staples", "Mike Mignola"]
+CHARACTER_NAMES = ["Spider-Man", "Batman", "Wolverine", "Storm", "Wonder Woman",
+                   "Superman", "Hellboy", "Alana", "Daredevil", "Thor"]
+ROLES = ["Writer", "Artist", "Penciller", "Inker", "Colorist", "Letterer", "Cover"]
+
+
+def normalize_request(path, query):
+    """Key a request by path and sorted query, ignoring host and parameter order"""
+    pairs = sorted(query.items()) if isinstance(query, dict) else sorted(tuple(pair) for pair in query)
+    return f"{path}?{urlencode(pairs)}" if pairs else path
+
+
+class SyntheticCatalog:
+    """Deterministic fake Metron catalog"""
+
+    def __init__(self, issues=2000, series=50, days=365, seed=42):
+        rng = random.Random(seed)
+        today = date.today()
+        self.series = {}
+        for series_id in range(1, series + 1):
+            name = SERIES_NAMES[(series_id - 1) % len(SERIES_NAMES)]
+            year = 1960 + rng.randrange(64)
+            self.series[series_id] = {
+                "id": series_id,
+                "name": name,
+                "series": f"{name} ({year})",
+                "year_began": year,
+                "volume": 1 + (series_id - 1) // len(SERIES_NAMES),
+                "issue_count": 0,
+                "publisher": {"id": 1 + series_id % 3, "name": ["Marvel", "DC Comics", "Image"][series_id % 3]},
+                "modified": f"{today.isoformat()}T00:00:00Z",
+            }
+
+        self.issues = []
+        for issue_id in range(1, issues + 1):
+            series = self.series[1 + (issue_id - 1) % len(self.series)]
+            series["issue_count"] += 1
+            store_date = today - timedelta(days=rng.randrange(days))
+            modified = datetime.combine(store_date, datetime.min.time()) + timedelta(hours=rng.randrange(72))
+            self.issues.append({
+                "id": issue_id,
+                "series": {"id": series["id"], "name": series["name"],
+                           "volume": series["volume"], "year_began": series["year_began"]},
+                "number": str(series["issue_count"]),
+                "issue": f"{series['series']} #{series['issue_count']}",
+                "cover_date": (store_date + timedelta(days=60)).replace(day=1).isoformat(),
+                "store_date": store_date.isoformat(),
+                "image": f"https://static.example/issue/{issue_id}.jpg",
+                "cover_hash": f"{issue_id:016x}",
+                "modified": modified.isoformat() + "Z",
+                "_series_id": series["id"],
+                "_seed": rng.randrange(1 << 30),
+            })
+        self.issues.sort(key=lambda issue: (issue["store_date"], issue["id"]))
+        self.issues_by_id = {issue["id"]: issue for issue in self.issues}
+
+    @staticmethod
+    def public(issue):
+        return {key: value for key, value in issue.items() if not key.startswith("_")}
+
+    def issue_list(self, query):
+        after = query.get("store_date_range_after")
+        before = query.get("store_date_range_before")
+        modified_gt = query.get("modified_gt")
+        series_id = query.get("series_id")
+        results = []
+        for issue in self.issues:
+            if after and issue["store_date"] < after:
+                continue
+            if before and issue["store_date"] > before:
+                continue
+            if modified_gt and issue["modified"] <= modified_gt:
+                continue
+            if series_id and str(issue["_series_id"]) != series_id:
+                continue
+            results.append(self.public(issue))
+        return results
+
+    def issue_detail(self, issue_id):
+        issue = self.issues_by_id.get(issue_id)
+        if issue is None:
+            return None
+        rng = random.Random(issue["_seed"])
+        series = self.series[issue["_series_id"]]
+        detail = self.public(issue)
+        detail.update({
+            "publisher": series["publisher"],
+            "desc": f"Synthetic issue {issue_id}.",
+            "credits": [
+                {"id": creator_id, "creator": CREATOR_NAMES[creator_id - 1],
+                 "role": [{"id": 1 + ROLES.index(role), "name": role}]}
+                for creator_id, role in zip(rng.sample(range(1, len(CREATOR_NAMES) + 1), 3),
+                                            rng.sample(ROLES, 3))
+            ],
+            "characters": [{"id": character_id, "name": CHARACTER_NAMES[character_id - 1]}
+                           for character_id in rng.sample(range(1, len(CHARACTER_NAMES) + 1), 2)],
+            "arcs": [{"id": issue["_series_id"], "name": f"{series['name']} Saga"}] if rng.random() < 0.3 else [],
+            "variants": [{"name": "Variant Cover", "sku": f"V{issue_id}", "upc": "",
+                          "image": f"https://static.example/variant/{issue_id}.jpg"}] if rng.random() < 0.2 else [],
+        })
+        return detail
+
+    def series_list(self, query):
+        name = query.get("name", "").lower()
+        modified_gt = query.get("modified_gt")
+        return [
+            {key: series[key] for key in ("id", "series", "year_began", "issue_count", "volume", "modified")}
+            for series in self.series.values()
+            if name in series["series"].lower() and not (modified_gt and series["modified"] <= modified_gt)
+        ]
+
+    def series_detail(self, series_id):
+        return self.series.get(series_id)
+
+    def entity(self, kind, entity_id):
+        names = CREATOR_NAMES if kind == "creator" else CHARACTER_NAMES
+        if not 1 <= entity_id <= len(names):
+            return None
+        return {"id": entity_id, "name": names[entity_id - 1], "alias": [],
+                "image": f"https://static.example/{kind}/{entity_id}.jpg",
+                "modified": f"{date.today().isoformat()}T00:00:00Z"}
+
+
+def load_recordings(directory):
+    """Load recorded responses keyed by normalized request"""
+    recordings = {}
+    for path in Path(directory).glob("*.json"):
+        with open(path, "r") as f:
+            recording = json.load(f)
+        recordings[normalize_request(recording["path"], recording["query"])] = recording
+    return recordings
+
+
+class FakeMetronServer(ThreadingHTTPServer):
+    """Threaded HTTP server carrying the catalog and fault-injection settings"""
+
+    daemon_threads = True
+
+    def __init__(self, address, catalog=None, recordings=None, page_size=100,
+                 latency_ms=0, jitter_ms=0, rate_429=0.0, retry_after=1, seed=42):
+        super().__init__(address, FakeMetronHandler)
+        self.catalog = catalog
+        self.recordings = recordings
+        self.page_size = page_size
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.rng = random.Random(seed)
+        self.rng_lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+
+    @property
+    def origin(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self):
+        return f"{self.origin}/api/"
+
+    def roll(self):
+        """Return (delay seconds, inject 429) for the next request"""
+        with self.rng_lock:
+            self.requests += 1
+            jitter = self.rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+            throttle = self.rng.random() < self.rate_429
+            if throttle:
+                self.throttled += 1
+        return max(0.0, (self.latency_ms + jitter) / 1000.0), throttle
+
+
+class FakeMetronHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status, body, headers=None):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        server = self.server
+        delay, throttle = server.roll()
+        if delay:
+            time.sleep(delay)
+        if throttle:
+            self.send_json(429, {"detail": "Request was throttled."},
+                           {"Retry-After": str(server.retry_after)})
+            return
+
+        url = urlparse(self.path)
+        query = dict(parse_qsl(url.query))
+        if server.recordings is not None:
+            self.replay(url.path, query)
+        else:
+            self.synthesize(url.path, query)
+
+    def replay(self, path, query):
+        recording = self.server.recordings.get(normalize_request(path, query))
+        if recording is None:
+            self.send_json(404, {"detail": "Not found."})
+            return
+        body = recording["body"]
+        # Recorded next links point at the recording host; keep clients on this server
+        if isinstance(body, dict) and body.get("next"):
+            next_url = urlparse(body["next"])
+            body = dict(body, next=f"{self.server.origin}{next_url.path}?{next_url.query}")
+        self.send_json(recording.get("status", 200), body)
+
+    def synthesize(self, path, query):
+        catalog = self.server.catalog
+        segments = [segment for segment in path.split("/") if segment]
+        if len(segments) < 2 or segments[0] != "api":
+            self.send_json(404, {"detail": "Not found."})
+            return
+
+        resource = segments[1]
+        if len(segments) == 3 and segments[2].isdigit():
+            entity_id = int(segments[2])
+            if resource == "issue":
+                body = catalog.issue_detail(entity_id)
+            elif resource == "series":
+                body = catalog.series_detail(entity_id)
+            elif resource in ("creator", "character"):
+                body = catalog.entity(resource, entity_id)
+            else:
+                body = None
+            if body is None:
+                self.send_json(404, {"detail": "Not found."})
+            else:
+                self.send_json(200, body)
+            return
+
+        if resource == "issue":
+            results = catalog.issue_list(query)
+        elif resource == "series":
+            results = catalog.series_list(query)
+        else:
+            self.send_json(404, {"detail": "Not found."})
+            return
+        self.send_page(path, query, results)
+
+    def send_page(self, path, query, results):
+        page_size = self.server.page_size
+        page = int(query.get("page", 1))
+        start = (page - 1) * page_size
+
+        def link(number):
+            return f"{self.server.origin}{path}?{urlencode(dict(query, page=number))}"
+
+        self.send_json(200, {
+            "count": len(results),
+            "next": link(page + 1) if start + page_size < len(results) else None,
+            "previous": link(page - 1) if page > 1 else None,
+            "results": results[start:start + page_size],
+        })
+
+
+def start_server(port=0, **options):
+    """Start a stand-in server on a background thread and return it"""
+    replay_dir = options.pop("replay", None)
+    catalog_options = {key: options.pop(key) for key in ("issues", "series", "days", "seed") if key in options}
+    if replay_dir:
+        server = FakeMetronServer(("127.0.0.1", port), recordings=load_recordings(replay_dir), **options)
+    else:
+        server = FakeMetronServer(("127.0.0.1", port), catalog=SyntheticCatalog(**catalog_options), **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Local Metron stand-in server")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--issues", type=int, default=2000, help="synthetic issues (default: 2000)")
+    parser.add_argument("--series", type=int, default=50, help="synthetic series (default: 50)")
+    parser.add_argument("--days", type=int, default=365, help="store dates spread over this many days")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=0, help="added latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="+/- random latency per request")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--replay", help="serve responses recorded with METRON_RECORD_DIR")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    options = dict(page_size=args.page_size, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                   rate_429=args.rate_429, retry_after=args.retry_after, seed=args.seed)
+    if args.replay:
+        options["replay"] = args.replay
+    else:
+        options.update(issues=args.issues, series=args.series, days=args.days)
+
+    server = start_server(args.port, **options)
+    print(f"Fake Metron API listening on {server.base_url}", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Parquet Table Cache
+Converts the CSV and JSON tables of a downloaded dataset into typed,
+zstd-compressed Parquet files once, at download time, so readers get
+column projection and fast, low-memory loads instead of re-parsing text
+
+Tables land under data/kaggle-parquet/<owner>/<dataset>/<file>.parquet.
+CSV schemas are inferred by pyarrow from the leading rows; if a later block
+contradicts them the file is re-read as text and each column narrowed to
+the tightest type every value fits (int64, float64, timestamp, else
+string). JSON files convert when they are a top-level array of objects.
+A table whose Parquet file is newer than its source is not converted again.
+
+Requires the optional pyarrow package (pip install pyarrow).
+
+Usage:
+    python parquetCache.py OWNER/DATASET DATASET_DIR     # convert, print tables as JSON
+"""
+
+import os
+import sys
+import json
+from pathlib import Path
+from typing import Dict, List, Union
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from recordCounter import is_json_array
+
+PARQUET_ROOT = Path("data/kaggle-parquet")
+COMPRESSION = "zstd"
+CSV_BLOCK_SIZE = 4 * 1024 * 1024  # The first block's rows drive type inference
+JSON_MAX_BYTES = 256 * 1024 * 1024  # JSON arrays are parsed in memory; larger ones are left as-is
+
+
+def require_pyarrow():
+    """Fail with an install hint when the optional pyarrow package is missing"""
+    if pa is None:
+        raise RuntimeError("pyarrow not installed. Run: pip install pyarrow")
+
+
+def schema_record(schema) -> List[Dict]:
+    return [{"name": field.name, "type": str(field.type)} for field in schema]
+
+
+def narrow_columns(table):
+    """Cast each string column to the tightest of int64, float64 or timestamp it fits"""
+    columns = []
+    for column in table.columns:
+        if pa.types.is_string(column.type):
+            for target in (pa.int64(), pa.float64(), pa.timestamp("s")):
+                try:
+                    column = pc.cast(column, target)
+                    break
+                except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+                    continue
+        columns.append(column)
+    return pa.table(columns, names=table.column_names)
+
+
+def write_atomic(target: Path, write):
+    """Run write(tmp_path), then move the finished file into place"""
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(target.name + ".tmp")
+    try:
+        write(tmp_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    os.replace(tmp_path, target)
+
+
+def convert_csv(source: Path, target: Path):
+    """Stream a CSV into Parquet batch by batch; returns the written schema"""
+    read_options = pa_csv.ReadOptions(block_size=CSV_BLOCK_SIZE)
+    convert_options = pa_csv.ConvertOptions(strings_can_be_null=True)
+
+    def write_streaming(tmp_path: Path):
+        reader = pa_csv.open_csv(source, read_options=read_options, convert_options=convert_options)
+        with pq.ParquetWriter(tmp_path, reader.schema, compression=COMPRESSION) as writer:
+            for batch in reader:
+                writer.write_batch(batch)
+
+    try:
+        write_atomic(target, write_streaming)
+        return pq.read_schema(target)
+    except pa.ArrowInvalid:
+        pass
+
+    # A later block broke the inferred types: read everything as text and narrow per column
+    names = pa_csv.open_csv(source, read_options=read_options).schema.names
+    as_text = pa_csv.ConvertOptions(strings_can_be_null=True, column_types={name: pa.string() for name in names})
+    table = narrow_columns(pa_csv.read_csv(source, read_options=read_options, convert_options=as_text))
+    write_atomic(target, lambda tmp_path: pq.write_table(table, tmp_path, compression=COMPRESSION))
+    return table.schema
+
+
+def convert_json(source: Path, target: Path):
+    """Convert a top-level JSON array of objects; returns the schema or None if not tabular"""
+    if source.stat().st_size > JSON_MAX_BYTES or not is_json_array(source):
+        return None
+    with open(source, "rb") as f:
+        records = [record for record in json.load(f) if isinstance(record, dict)]
+    if not records:
+        return None
+    # Every key seen in any record becomes a column, typed from all of its values
+    names = list(dict.fromkeys(key for record in records for key in record))
+    try:
+        table = pa.table({name: [record.get(name) for record in records] for name in names})
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed value types: keep scalars as text, nested values as JSON, then narrow
+        table = narrow_columns(pa.table({
+            name: pa.array([
+                None if record.get(name) is None else
+                record[name] if isinstance(record[name], str) else
+                json.dumps(record[name]) for record in records
+            ], type=pa.string())
+            for name in names
+        }))
+    write_atomic(target, lambda tmp_path: pq.write_table(table, tmp_path, compression=COMPRESSION))
+    return table.schema
+
+
+def convert_dataset(dataset_ref: str, dataset_path: Union[str, Path],
+                    root: Union[str, Path] = PARQUET_ROOT) -> List[Dict]:
+    """Convert every CSV/JSON table of a dataset; returns one entry per table.
+
+    Entries are {"source", "parquet", "rows", "columns", "size_bytes"}, or
+    {"source", "error"} for a table that could not be converted.
+    """
+    require_pyarrow()
+    dataset_path = Path(dataset_path)
+    tables = []
+    sources = sorted(list(dataset_path.rglob("*.csv")) + list(dataset_path.rglob("*.json")))
+    for source in sources:
+        relative = source.relative_to(dataset_path)
+        target = Path(root) / dataset_ref / relative.with_name(relative.name + ".parquet")
+        try:
+            if target.exists() and target.stat().st_mtime_ns >= source.stat().st_mtime_ns:
+                schema = pq.read_schema(target)
+            elif source.suffix.lower() == ".csv":
+                schema = convert_csv(source, target)
+            else:
+                schema = convert_json(source, target)
+                if schema is None:
+                    continue
+            tables.append({
+                "source": str(relative),
+                "parquet": str(target),
+                "rows": pq.ParquetFile(target).metadata.num_rows,
+                "columns": schema_record(schema),
+                "size_bytes": target.stat().st_size,
+            })
+        except (OSError, ValueError, pa.ArrowException) as e:
+            tables.append({"source": str(relative), "error": str(e)[:200]})
+    return tables
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: parquetCache.py OWNER/DATASET DATASET_DIR", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        require_pyarrow()
+    except RuntimeError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    print(json.dumps(convert_dataset(sys.argv[1], sys.argv[2]), indent=2))
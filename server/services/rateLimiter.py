@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Rate Limiting
+Token bucket shared by the Python API clients (Metron, Kaggle) so every
+thread in a process draws from one per-minute request budget
+"""
+
+import time
+import threading
+
+
+class TokenBucket:
+    """Thread-safe token bucket pacing requests to a per-minute budget"""
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or max(1, rate_per_minute // 6)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def drain(self):
+        """Empty the bucket after the server pushed back with a 429"""
+        with self.lock:
+            self.tokens = 0.0
+            self.updated = time.monotonic()
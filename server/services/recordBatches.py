@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Record Batch Interchange Format
+Compact binary output for the Python data pipelines (Metron, Kaggle)
+
+A record batch file is a plain concatenation of MessagePack objects, so any
+MessagePack stream decoder (msgpack.Unpacker, @msgpack/msgpack's
+decodeMultiStream) can read it one object at a time:
+
+    1. Header:  {"format": "pp-record-batches", "version": 1,
+                 "source": "metron-issues",
+                 "schema": [{"name": "id", "type": "int"}, ...]}
+    2. Batches: {"count": 100, "columns": {"id": [...], "number": [...]}}
+    3. Trailer: {"end": true, "batches": 12, "records": 1200}
+
+Batches are columnar: every column holds exactly `count` values, with None
+where a record lacked the field. The header schema describes the columns of
+the first batch; later batches may add columns, which readers should accept.
+A file without a trailer was cut short, but every batch before the cut is
+still readable.
+
+Requires the optional msgpack package (pip install msgpack).
+
+Usage:
+    python recordBatches.py FILE          # print records as NDJSON (gzip ok)
+"""
+
+import sys
+import gzip
+import json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+FORMAT_NAME = "pp-record-batches"
+FORMAT_VERSION = 1
+
+
+def require_msgpack():
+    """Fail with an install hint when the optional msgpack package is missing"""
+    if msgpack is None:
+        raise RuntimeError("msgpack not installed. Run: pip install msgpack")
+
+
+def value_type(value):
+    """Name the schema type of a single value"""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, str):
+        return "str"
+    if isinstance(value, (list, tuple)):
+        return "list"
+    if isinstance(value, dict):
+        return "map"
+    return "str"
+
+
+def infer_schema(records):
+    """Build a schema from the field order and first non-null value of each field"""
+    fields = {}
+    for record in records:
+        for name, value in record.items():
+            if fields.get(name, "null") == "null":
+                fields[name] = value_type(value)
+    return [{"name": name, "type": field_type} for name, field_type in fields.items()]
+
+
+class RecordBatchWriter:
+    """Write dict records to a binary stream as columnar MessagePack batches"""
+
+    def __init__(self, stream, source):
+        require_msgpack()
+        self.stream = stream
+        self.source = source
+        self.packer = msgpack.Packer(use_bin_type=True, default=str)
+        self.columns = None
+        self.batches = 0
+        self.records = 0
+
+    def write_batch(self, records):
+        """Write one batch; the first non-empty batch also fixes the header schema"""
+        if not records:
+            return
+        if self.columns is None:
+            schema = infer_schema(records)
+            self.columns = [field["name"] for field in schema]
+            self.stream.write(self.packer.pack({
+                "format": FORMAT_NAME,
+                "version": FORMAT_VERSION,
+                "source": self.source,
+                "schema": schema,
+            }))
+
+        names = list(self.columns)
+        for record in records:
+            for name in record:
+                if name not in names:
+                    names.append(name)
+
+        self.stream.write(self.packer.pack({
+            "count": len(records),
+            "columns": {name: [record.get(name) for record in records] for name in names},
+        }))
+        self.batches += 1
+        self.records += len(records)
+
+    def close(self):
+        """Write the trailer that marks the file as complete"""
+        if self.columns is None:
+            # Still emit a header so empty outputs are valid files
+            self.stream.write(self.packer.pack({
+                "format": FORMAT_NAME,
+                "version": FORMAT_VERSION,
+                "source": self.source,
+                "schema": [],
+            }))
+            self.columns = []
+        self.stream.write(self.packer.pack({
+            "end": True,
+            "batches": self.batches,
+            "records": self.records,
+        }))
+
+
+def write_record_batches(path, records, source, batch_size=1000):
+    """Write a list of records to a record batch file"""
+    with open(path, "wb") as f:
+        writer = RecordBatchWriter(f, source)
+        for start in range(0, len(records), batch_size):
+            writer.write_batch(records[start:start + batch_size])
+        writer.close()
+
+
+def iter_record_batches(stream):
+    """Yield (header, records) for each batch of a record batch stream"""
+    require_msgpack()
+    unpacker = msgpack.Unpacker(stream, raw=False)
+    header = next(unpacker, None)
+    if not isinstance(header, dict) or header.get("format") != FORMAT_NAME:
+        raise ValueError("not a record batch stream")
+
+    for item in unpacker:
+        if item.get("end"):
+            return
+        columns = item["columns"]
+        names = list(columns)
+        yield header, [
+            {name: columns[name][index] for name in names}
+            for index in range(item["count"])
+        ]
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("ERROR: record batch file required", file=sys.stderr)
+        sys.exit(1)
+
+    with open(sys.argv[1], "rb") as f:
+        if f.peek(2)[:2] == b"\x1f\x8b":
+            f = gzip.GzipFile(fileobj=f)
+        for _, batch in iter_record_batches(f):
+            for record in batch:
+                print(json.dumps(record, default=str))
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Record Counter
+Counts records in large CSV and JSON files in constant memory by scanning
+fixed-size binary buffers instead of decoding lines or parsing documents
+
+CSV rows are counted as newlines outside double-quoted fields, so quoted
+multi-line values count once. JSON files are counted as the number of
+top-level array elements (a document that is not an array counts as one
+record). Both work on raw UTF-8 bytes: multi-byte sequences never contain
+the ASCII bytes being scanned for.
+
+CountCache remembers counts per file fingerprint (size, mtime, inode) in a
+JSON file, so unchanged files are never read twice.
+
+Usage:
+    python recordCounter.py FILE [FILE ...]     # print "<records>\t<file>"
+"""
+
+import os
+import re
+import sys
+import json
+import threading
+from pathlib import Path
+from typing import Callable, Union
+
+CHUNK_SIZE = 1024 * 1024
+UTF8_BOM = b"\xef\xbb\xbf"
+WHITESPACE = b" \t\r\n"
+# A complete quoted CSV field; an escaped quote ("") reads as two adjacent fields
+CSV_QUOTED = re.compile(rb'"[^"]*"')
+# An innermost JSON array or object (strings are already gone by then)
+JSON_GROUP = re.compile(rb'\[[^\[\]{}"]*\]|\{[^\[\]{}"]*\}')
+
+
+def count_csv_rows(path: Union[str, Path], chunk_size: int = CHUNK_SIZE) -> int:
+    """Count CSV rows (header included), ignoring newlines inside quoted fields"""
+    rows = 0
+    in_quotes = False
+    last_byte = b"\n"
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            last_byte = chunk[-1:]
+            if in_quotes:
+                # Still inside a field opened in an earlier chunk
+                close = chunk.find(b'"')
+                if close < 0:
+                    continue
+                chunk = chunk[close + 1:]
+                in_quotes = False
+            if b'"' in chunk:
+                chunk = CSV_QUOTED.sub(b"", chunk)
+                unclosed = chunk.find(b'"')
+                if unclosed >= 0:
+                    chunk = chunk[:unclosed]
+                    in_quotes = True
+            rows += chunk.count(b"\n")
+    # A final row without a trailing newline still counts
+    if last_byte != b"\n":
+        rows += 1
+    return rows
+
+
+def count_json_records(path: Union[str, Path], chunk_size: int = CHUNK_SIZE) -> int:
+    """Count the elements of a top-level JSON array, or 1 for any other document.
+    
+    Each buffer is reduced in C-level passes: escapes are neutralized,
+    strings collapse to a placeholder, then complete innermost arrays and
+    objects do too until only the top-level separators are left. Whatever is still open at the end of a
+    buffer (an unfinished element or string) is carried into the next one.
+    """
+    records = 0
+    non_empty = False
+    carry = b""
+    started = False
+
+    with open(path, "rb") as f:
+        if f.read(len(UTF8_BOM)) != UTF8_BOM:
+            f.seek(0)
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+
+            if not started:
+                chunk = chunk.lstrip(WHITESPACE)
+                if not chunk:
+                    continue
+                if chunk[:1] != b"[":
+                    return 1
+                started = True
+                chunk = chunk[1:]
+
+            # A run of backslashes cut by the buffer end waits for the rest of it
+            buffer = carry + chunk
+            unpaired = buffer.rstrip(b"\\")
+            held, buffer = buffer[len(unpaired):], unpaired
+            # With escapes neutralized every quote delimits a string, so the
+            # even segments of a split are exactly what lies outside strings
+            parts = buffer.replace(b"\\\\", b"__").replace(b'\\"', b"__").split(b'"')
+            # An unterminated string runs to the end of the buffer; keep it whole
+            open_string = b'"' + parts.pop() + held if len(parts) % 2 == 0 else held
+            head = b"0".join(parts[0::2])
+            while True:
+                reduced = JSON_GROUP.sub(b"0", head)
+                if len(reduced) == len(head):
+                    break
+                head = reduced
+
+            # What is left is top-level content, an unfinished element opened by
+            # the first remaining bracket, or the closing bracket of the array
+            openers = [index for index in (head.find(b"["), head.find(b"{")) if index >= 0]
+            closer = head.find(b"]")
+            if closer >= 0 and (not openers or closer < min(openers)):
+                settled = head[:closer]
+                records += settled.count(b",")
+                non_empty = non_empty or bool(settled.strip(WHITESPACE))
+                return records + 1 if non_empty else 0
+
+            settled, unfinished = (head[:min(openers)], head[min(openers):]) if openers else (head, b"")
+            last_comma = settled.rfind(b",")
+            records += settled.count(b",")
+            non_empty = non_empty or bool(settled.strip(WHITESPACE))
+            # Only the brackets of an unfinished element matter from here on
+            carry = settled[last_comma + 1:] + re.sub(rb"[^\[\]{}]", b"", unfinished) + open_string
+    return records + 1 if non_empty else 0
+
+
+def is_json_array(path: Union[str, Path]) -> bool:
+    """Whether a JSON document's top-level value is an array"""
+    with open(path, "rb") as f:
+        if f.read(len(UTF8_BOM)) != UTF8_BOM:
+            f.seek(0)
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return False
+            chunk = chunk.lstrip(WHITESPACE)
+            if chunk:
+                return chunk[:1] == b"["
+
+
+def count_records(path: Union[str, Path]) -> int:
+    """Count data records in a CSV (rows minus header) or JSON file"""
+    if str(path).lower().endswith(".json"):
+        return count_json_records(path)
+    return max(count_csv_rows(path) - 1, 0)
+
+
+class CountCache:
+    """Persistent record counts keyed by path and (size, mtime, inode)"""
+
+    VERSION = 1
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        self.files = {}
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+        if self.path.exists():
+            try:
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+                if data.get("version") == self.VERSION:
+                    self.files = data.get("files", {})
+            except (OSError, ValueError):
+                # A damaged cache only costs a recount
+                self.files = {}
+
+    def count(self, path: Union[str, Path], counter: Callable[[Union[str, Path]], int]) -> int:
+        """Return counter(path), reusing the cached value while the file is unchanged"""
+        stat = os.stat(path)
+        fingerprint = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+        key = f"{counter.__name__}:{os.path.abspath(path)}"
+        with self.lock:
+            entry = self.files.get(key)
+            if entry is not None and entry[:3] == fingerprint:
+                self.hits += 1
+                return entry[3]
+
+        records = counter(path)
+        with self.lock:
+            self.files[key] = fingerprint + [records]
+            self.dirty = True
+            self.misses += 1
+        return records
+
+    def save(self):
+        """Write the cache atomically if anything changed"""
+        with self.lock:
+            if not self.dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            with open(tmp_path, "w") as f:
+                json.dump({"version": self.VERSION, "files": self.files}, f, separators=(",", ":"))
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("ERROR: at least one file required", file=sys.stderr)
+        sys.exit(1)
+
+    for name in sys.argv[1:]:
+        print(f"{count_records(name)}\t{name}")
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Streaming Zip Extraction
+Extracts a zip archive while it downloads, reading local file headers in
+order instead of seeking to the central directory, so no temporary copy of
+the archive ever touches the disk
+
+Members can be filtered by name; skipped members of known size are passed
+over without being inflated. Stored and deflated members are supported,
+including deflated members whose sizes follow in a data descriptor (as
+streamed archives write them) and Zip64 sizes. Every extracted member is
+CRC-checked and written via a temp file, so a cut-off download never
+leaves a truncated file under its real name.
+
+Usage:
+    python zipStream.py ARCHIVE DEST [GLOB ...]   # extract (matching) members
+"""
+
+import os
+import sys
+import zlib
+import struct
+from fnmatch import fnmatchcase
+from pathlib import Path, PurePosixPath
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+CHUNK_SIZE = 1024 * 1024
+ZIP_MAGIC = b"PK\x03\x04"
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+LOCAL_SIGNATURE = 0x04034B50
+END_SIGNATURES = (0x02014B50, 0x06054B50, 0x06064B50)  # Central directory, end records
+DESCRIPTOR_SIGNATURE = b"PK\x07\x08"
+ZIP64_EXTRA = 0x0001
+FLAG_ENCRYPTED = 0x0001
+FLAG_DESCRIPTOR = 0x0008
+FLAG_UTF8 = 0x0800
+STORED, DEFLATED = 0, 8
+
+
+class ChunkReader:
+    """File-like reads over an iterator of byte chunks, with push-back"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.buffer = b""
+        self.offset = 0
+
+    def read_some(self, limit: int) -> bytes:
+        """Up to limit bytes without waiting for more than one chunk; b"" at the end"""
+        while self.offset >= len(self.buffer):
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                return b""
+            self.buffer, self.offset = chunk, 0
+        data = self.buffer[self.offset:self.offset + limit]
+        self.offset += len(data)
+        return data
+
+    def read(self, size: int) -> bytes:
+        """Exactly size bytes, or fewer only at the end of the stream"""
+        parts = []
+        while size > 0:
+            data = self.read_some(size)
+            if not data:
+                break
+            parts.append(data)
+            size -= len(data)
+        return b"".join(parts)
+
+    def read_exact(self, size: int) -> bytes:
+        data = self.read(size)
+        if len(data) != size:
+            raise ValueError("zip stream ended mid-record")
+        return data
+
+    def unread(self, data: bytes):
+        self.buffer = data + self.buffer[self.offset:]
+        self.offset = 0
+
+
+def glob_filter(patterns: Iterable[str]) -> Callable[[str], bool]:
+    """Case-insensitive match of a member's path or base name against any pattern"""
+    patterns = [pattern.lower() for pattern in patterns]
+
+    def select(name: str) -> bool:
+        name = name.lower()
+        base = name.rsplit("/", 1)[-1]
+        return any(fnmatchcase(name, pattern) or fnmatchcase(base, pattern) for pattern in patterns)
+
+    return select
+
+
+def safe_target(dest: Path, name: str) -> Path:
+    """Destination of a member, refusing absolute paths and .. components"""
+    parts = PurePosixPath(name.replace("\\", "/")).parts
+    if not parts or parts[0] == "/" or ".." in parts or ":" in parts[0]:
+        raise ValueError(f"unsafe path in zip archive: {name!r}")
+    return dest.joinpath(*parts)
+
+
+def zip64_sizes(extra: bytes, compressed: int, size: int):
+    """Replace 0xFFFFFFFF sizes with the Zip64 extra field values"""
+    offset = 0
+    while offset + 4 <= len(extra):
+        tag, length = struct.unpack_from("<HH", extra, offset)
+        if tag == ZIP64_EXTRA:
+            values = extra[offset + 4:offset + 4 + length]
+            fields = list(struct.unpack_from(f"<{len(values) // 8}Q", values))
+            if size == 0xFFFFFFFF and fields:
+                size = fields.pop(0)
+            if compressed == 0xFFFFFFFF and fields:
+                compressed = fields.pop(0)
+            return compressed, size, True
+        offset += 4 + length
+    return compressed, size, False
+
+
+def extract_stream(chunks: Iterable[bytes], dest: Union[str, Path],
+                   select: Optional[Callable[[str], bool]] = None) -> List[Dict]:
+    """Extract the members of a streamed zip archive into dest.
+
+    Returns [{"name", "size_bytes"}] for every member written; raises
+    ValueError on a malformed, truncated or unsupported archive.
+    """
+    dest = Path(dest)
+    reader = ChunkReader(chunks)
+    extracted = []
+    while True:
+        signature = reader.read(4)
+        if not signature:
+            break
+        if len(signature) < 4:
+            raise ValueError("zip stream ended mid-record")
+        (magic,) = struct.unpack("<I", signature)
+        if magic in END_SIGNATURES:
+            break
+        if magic != LOCAL_SIGNATURE:
+            raise ValueError("not a zip stream (bad local header signature)")
+
+        header = LOCAL_HEADER.unpack(signature + reader.read_exact(LOCAL_HEADER.size - 4))
+        _, _, flags, method, _, _, crc, compressed, size, name_length, extra_length = header
+        raw_name = reader.read_exact(name_length)
+        extra = reader.read_exact(extra_length)
+        name = raw_name.decode("utf-8" if flags & FLAG_UTF8 else "cp437")
+        compressed, size, zip64 = zip64_sizes(extra, compressed, size)
+        descriptor = bool(flags & FLAG_DESCRIPTOR)
+
+        if flags & FLAG_ENCRYPTED:
+            raise ValueError(f"encrypted zip member: {name}")
+        if method not in (STORED, DEFLATED):
+            raise ValueError(f"unsupported compression method {method} for {name}")
+        if descriptor and method == STORED and not name.endswith("/"):
+            raise ValueError(f"stored member with unknown size cannot be streamed: {name}")
+
+        keep = not name.endswith("/") and (select is None or select(name))
+        if not keep and not descriptor:
+            # Known size: pass over the compressed bytes without inflating them
+            remaining = compressed
+            while remaining:
+                data = reader.read_some(min(CHUNK_SIZE, remaining))
+                if not data:
+                    raise ValueError("zip stream ended mid-member")
+                remaining -= len(data)
+            continue
+
+        target = safe_target(dest, name) if keep else None
+        tmp_path = target.with_name(target.name + ".part") if keep else None
+        out = None
+        checksum = 0
+        written = 0
+        try:
+            if keep:
+                target.parent.mkdir(parents=True, exist_ok=True)
+                out = open(tmp_path, "wb")
+
+            def emit(data: bytes):
+                nonlocal checksum, written
+                if out is not None and data:
+                    out.write(data)
+                    checksum = zlib.crc32(data, checksum)
+                    written += len(data)
+
+            if method == STORED:
+                # A directory entry with a data descriptor has no data
+                remaining = 0 if descriptor else compressed
+                while remaining:
+                    data = reader.read_some(min(CHUNK_SIZE, remaining))
+                    if not data:
+                        raise ValueError("zip stream ended mid-member")
+                    remaining -= len(data)
+                    emit(data)
+            else:
+                inflater = zlib.decompressobj(-zlib.MAX_WBITS)
+                remaining = None if descriptor else compressed
+                pending = b""
+                while not inflater.eof:
+                    if not pending and remaining != 0:
+                        limit = CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining)
+                        pending = reader.read_some(limit)
+                        if not pending:
+                            raise ValueError("zip stream ended mid-member")
+                        if remaining is not None:
+                            remaining -= len(pending)
+                    # Bound each output block so a highly compressed member stays in constant memory
+                    block = inflater.decompress(pending, CHUNK_SIZE)
+                    if not block and not pending and not inflater.eof:
+                        raise ValueError("zip stream ended mid-member")
+                    emit(block)
+                    pending = inflater.unconsumed_tail
+                if inflater.unused_data:
+                    reader.unread(inflater.unused_data)
+
+            if descriptor:
+                # Optional signature, then CRC and sizes (8-byte sizes for Zip64)
+                field = reader.read_exact(4)
+                if field == DESCRIPTOR_SIGNATURE:
+                    field = reader.read_exact(4)
+                (crc,) = struct.unpack("<I", field)
+                reader.read_exact(16 if zip64 else 8)
+
+            if out is not None:
+                out.close()
+                out = None
+                if checksum != crc:
+                    raise ValueError(f"CRC mismatch for {name}")
+                os.replace(tmp_path, target)
+                extracted.append({"name": name, "size_bytes": written})
+        except BaseException:
+            if out is not None:
+                out.close()
+            if tmp_path is not None:
+                tmp_path.unlink(missing_ok=True)
+            raise
+    return extracted
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3:
+        print("Usage: zipStream.py ARCHIVE DEST [GLOB ...]", file=sys.stderr)
+        sys.exit(1)
+
+    with open(sys.argv[1], "rb") as f:
+        members = extract_stream(iter(lambda: f.read(CHUNK_SIZE), b""), sys.argv[2],
+                                 glob_filter(sys.argv[3:]) if len(sys.argv) > 3 else None)
+    for member in members:
+        print(f"{member['size_bytes']}\t{member['name']}")